@@ -0,0 +1,470 @@
+"""
+Headless batch transcription: `python -m buzz batch <glob|list-file>...`
+
+Runs without a QApplication, database or widgets. Files are transcribed on a
+pool of worker processes, which load each model once and reuse it for all the
+files they transcribe. Progress and results are printed to stdout as JSON
+lines, one event per line.
+"""
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from buzz.cli import CommandLineError, CommandLineModelType, join_values
+from buzz.thread_budget import get_total_threads, limit_process_threads
+from buzz.model_loader import (
+    ModelType,
+    WhisperModelSize,
+    TranscriptionModel,
+    ModelDownloader,
+)
+from buzz.transcriber.transcriber import (
+    Task,
+    FileTranscriptionTask,
+    FileTranscriptionOptions,
+    TranscriptionOptions,
+    LANGUAGES,
+    OutputFormat,
+    Segment,
+)
+
+# Inputs with these extensions are read as lists of files, one per line
+LIST_FILE_EXTENSIONS = {".txt", ".lst", ".list"}
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+PROGRESS_REGEX = re.compile(r"(\d+(?:\.\d+)?)%")
+
+print_lock = threading.Lock()
+
+
+def print_event(event: dict):
+    with print_lock:
+        sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="buzz batch",
+        description="Transcribe files without the user interface. Progress and "
+        "results are printed to stdout as JSON lines.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="glob|list-file",
+        help="Input files, glob patterns or text files that list one input file per line.",
+    )
+    add_transcription_arguments(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes. Each worker loads its own copy of the model. Default: 1.",
+    )
+    return parser
+
+
+def add_transcription_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "-t",
+        "--task",
+        default=Task.TRANSCRIBE.value,
+        help=f"The task to perform. Allowed: {join_values(Task)}. Default: {Task.TRANSCRIBE.value}.",
+    )
+    parser.add_argument(
+        "-m",
+        "--model-type",
+        default=CommandLineModelType.WHISPER.value,
+        help=f"Model type. Allowed: {join_values(CommandLineModelType)}. Default: {CommandLineModelType.WHISPER.value}.",
+    )
+    parser.add_argument(
+        "-s",
+        "--model-size",
+        default=WhisperModelSize.TINY.value,
+        help=f"Model size. Use only when --model-type is whisper, whispercpp, or fasterwhisper. Allowed: {join_values(WhisperModelSize)}. Default: {WhisperModelSize.TINY.value}.",
+    )
+    parser.add_argument(
+        "--hfid",
+        default="",
+        help='Hugging Face model ID. Use only when --model-type is huggingface. Example: "openai/whisper-tiny"',
+    )
+    parser.add_argument(
+        "-l", "--language", default="", help="Language code. Leave empty to detect language."
+    )
+    parser.add_argument("-p", "--prompt", default="", help="Initial prompt.")
+    parser.add_argument(
+        "-wt",
+        "--word-timestamps",
+        dest="word_timestamps",
+        action="store_true",
+        help="Generate word-level timestamps.",
+    )
+    parser.add_argument(
+        "--openai-token",
+        default="",
+        help=f"OpenAI access token. Use only when --model-type is {CommandLineModelType.OPEN_AI_WHISPER_API.value}. Defaults to your previously saved access token, if one exists.",
+    )
+    parser.add_argument(
+        "-d",
+        "--output-directory",
+        default="",
+        help="Output directory. Defaults to the directory of each input file.",
+    )
+    parser.add_argument("--srt", action="store_true", help="Output result in an SRT file.")
+    parser.add_argument("--vtt", action="store_true", help="Output result in a VTT file.")
+    parser.add_argument("--txt", action="store_true", help="Output result in a TXT file.")
+
+
+def get_output_formats(args: argparse.Namespace) -> typing.Set[OutputFormat]:
+    output_formats: typing.Set[OutputFormat] = set()
+    if args.srt:
+        output_formats.add(OutputFormat.SRT)
+    if args.vtt:
+        output_formats.add(OutputFormat.VTT)
+    if args.txt:
+        output_formats.add(OutputFormat.TXT)
+    return output_formats
+
+
+def expand_inputs(inputs: typing.List[str]) -> typing.List[str]:
+    """Returns the files matched by the inputs, in order and without duplicates"""
+    file_paths = []
+    for value in inputs:
+        extension = os.path.splitext(value)[1].lower()
+        if os.path.isfile(value) and extension in LIST_FILE_EXTENSIONS:
+            with open(value, encoding="utf-8") as file:
+                lines = [line.strip() for line in file]
+            file_paths.extend(
+                line for line in lines if line != "" and not line.startswith("#")
+            )
+            continue
+
+        matches = sorted(glob.glob(value, recursive=True))
+        if len(matches) == 0:
+            raise CommandLineError(f"No files match {value}")
+        file_paths.extend(path for path in matches if os.path.isfile(path))
+
+    missing = [path for path in file_paths if not os.path.isfile(path)]
+    if len(missing) > 0:
+        raise CommandLineError(f"File not found: {missing[0]}")
+
+    return list(dict.fromkeys(file_paths))
+
+
+def parse_enum(value: str, enum_class: typing.Type, option: str):
+    try:
+        return enum_class(value)
+    except ValueError:
+        raise CommandLineError(f"Invalid value for --{option} option.")
+
+
+def create_tasks(args: argparse.Namespace) -> typing.List[FileTranscriptionTask]:
+    file_paths = expand_inputs(args.inputs)
+    if len(file_paths) == 0:
+        raise CommandLineError("No input files")
+
+    task = parse_enum(args.task, Task, "task")
+    model_type = parse_enum(args.model_type, CommandLineModelType, "model-type")
+    model_size = parse_enum(args.model_size, WhisperModelSize, "model-size")
+
+    if args.hfid == "" and model_type == CommandLineModelType.HUGGING_FACE:
+        raise CommandLineError("--hfid is required when --model-type is huggingface")
+
+    language = args.language or None
+    if language is not None and LANGUAGES.get(language) is None:
+        raise CommandLineError("Invalid language option")
+
+    if args.workers < 1:
+        raise CommandLineError("Invalid value for --workers option.")
+
+    model = TranscriptionModel(
+        model_type=ModelType[model_type.name],
+        whisper_model_size=model_size,
+        hugging_face_model_id=args.hfid,
+    )
+
+    openai_access_token = args.openai_token
+    if model.model_type == ModelType.OPEN_AI_WHISPER_API and openai_access_token == "":
+        from buzz.store.keyring_store import get_password, Key
+
+        openai_access_token = get_password(key=Key.OPENAI_API_KEY)
+        if openai_access_token == "":
+            raise CommandLineError("No OpenAI access token found")
+
+    model_path = model.get_local_model_path()
+    if model_path is None:
+        ModelDownloader(model=model).run()
+        model_path = model.get_local_model_path()
+    if model_path is None:
+        raise CommandLineError("Model not found")
+
+    output_formats = get_output_formats(args)
+
+    transcription_options = TranscriptionOptions(
+        model=model,
+        task=task,
+        language=language,
+        initial_prompt=args.prompt,
+        word_level_timings=args.word_timestamps,
+        openai_access_token=openai_access_token,
+    )
+
+    return [
+        FileTranscriptionTask(
+            file_path=file_path,
+            model_path=model_path,
+            transcription_options=transcription_options,
+            file_transcription_options=FileTranscriptionOptions(
+                file_paths=[file_path], output_formats=output_formats
+            ),
+            output_directory=args.output_directory or None,
+        )
+        for file_path in file_paths
+    ]
+
+
+# State of a worker process
+_events: typing.Optional[multiprocessing.Queue] = None
+_models: typing.Dict[tuple, typing.Any] = {}
+
+
+def init_worker(events: multiprocessing.Queue, cpu_threads: int):
+    global _events
+    _events = events
+    # Set before the engines are imported, so their runtimes read it
+    limit_process_threads(cpu_threads)
+
+    # stdout of the batch command only has the events, send anything the
+    # engines and native libraries print to stderr instead
+    os.dup2(sys.__stderr__.fileno(), sys.__stdout__.fileno())
+
+
+class ProgressWriter:
+    """
+    Stands in for stderr in a worker, the engines write their progress to it
+    as percentages, and forwards each new percentage as a progress event
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.last_progress = None
+
+    def write(self, text: str):
+        # Segments written by the engines may have percentages in their text
+        if text.lstrip().startswith(("segments = ", "new_segments = ")):
+            return
+        match = PROGRESS_REGEX.search(text)
+        if match is None:
+            return
+        progress = round(float(match.group(1)) / 100, 2)
+        if progress != self.last_progress:
+            self.last_progress = progress
+            emit_progress(self.file_path, progress)
+
+    def flush(self):
+        pass
+
+
+def emit_progress(file_path: str, progress: float):
+    if _events is not None:
+        _events.put({"event": "progress", "file": file_path, "progress": progress})
+
+
+def get_model(key: tuple, load: typing.Callable[[], typing.Any]):
+    """Returns the model loaded by an earlier task of this worker, or loads it"""
+    if key not in _models:
+        # Only one model is kept, so a worker never holds two in memory
+        _models.clear()
+        _models[key] = load()
+    return _models[key]
+
+
+def transcribe(task: FileTranscriptionTask) -> typing.List[Segment]:
+    # The engines are imported in the workers only, as they load torch
+    from buzz.transcriber.whisper_file_transcriber import WhisperFileTranscriber
+
+    model = task.transcription_options.model
+    key = (model.model_type, model.whisper_model_size, model.hugging_face_model_id)
+
+    if model.model_type == ModelType.WHISPER_CPP:
+        from buzz.transcriber.whisper_cpp import WhisperCpp
+        from buzz.transcriber.whisper_cpp_file_transcriber import (
+            WhisperCppFileTranscriber,
+        )
+
+        transcriber = WhisperCppFileTranscriber(
+            task=task, model=get_model(key, lambda: WhisperCpp(model=task.model_path))
+        )
+        transcriber.progress.connect(
+            lambda progress: emit_progress(
+                task.file_path, round(progress[0] / progress[1], 2)
+            )
+        )
+        return transcriber.transcribe()
+
+    if model.model_type == ModelType.OPEN_AI_WHISPER_API:
+        from buzz.transcriber.openai_whisper_api_file_transcriber import (
+            OpenAIWhisperAPIFileTranscriber,
+        )
+
+        transcriber = OpenAIWhisperAPIFileTranscriber(task=task)
+        transcriber.progress.connect(
+            lambda progress: emit_progress(
+                task.file_path, round(progress[0] / progress[1], 2)
+            )
+        )
+        return transcriber.transcribe()
+
+    if model.model_type == ModelType.FASTER_WHISPER:
+        return WhisperFileTranscriber.transcribe_faster_whisper(
+            task,
+            model=get_model(
+                key, lambda: WhisperFileTranscriber.load_faster_whisper_model(task)
+            ),
+        )
+
+    if model.model_type == ModelType.WHISPER:
+        return WhisperFileTranscriber.transcribe_openai_whisper(
+            task,
+            model=get_model(
+                key, lambda: WhisperFileTranscriber.load_openai_whisper_model(task)
+            ),
+        )
+
+    if model.model_type == ModelType.HUGGING_FACE:
+        from buzz.transformers_whisper import TransformersWhisper
+
+        return WhisperFileTranscriber.transcribe_hugging_face(
+            task, model=get_model(key, lambda: TransformersWhisper(task.model_path))
+        )
+
+    raise Exception(f"Unknown model type: {model.model_type}")
+
+
+def run_task(task: FileTranscriptionTask) -> dict:
+    """
+    Transcribes the file of the task in a worker. The result event is sent
+    after the progress events of the task and also returned.
+    """
+    result = transcribe_and_write(task)
+    if _events is not None:
+        _events.put(result)
+    return result
+
+
+def transcribe_and_write(task: FileTranscriptionTask) -> dict:
+    from buzz.transcriber.file_transcriber import write_task_outputs
+
+    if _events is not None:
+        _events.put({"event": "started", "file": task.file_path})
+
+    time_started = time.monotonic()
+    stderr = sys.stderr
+    sys.stderr = ProgressWriter(task.file_path)
+    try:
+        segments = transcribe(task)
+        for segment in segments:
+            segment.text = segment.text.strip()
+        output_paths = write_task_outputs(task, segments)
+    except Exception as exc:
+        sys.stderr = stderr
+        logging.exception("")
+        return {"event": "failed", "file": task.file_path, "error": str(exc)}
+    finally:
+        sys.stderr = stderr
+
+    return {
+        "event": "completed",
+        "file": task.file_path,
+        "outputs": output_paths,
+        "segments": [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ],
+        "time_taken": round(time.monotonic() - time_started, 3),
+    }
+
+
+def forward_events(events: multiprocessing.Queue):
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        print_event(event)
+
+
+def run(tasks: typing.List[FileTranscriptionTask], workers: int) -> int:
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    forwarder = threading.Thread(target=forward_events, args=(events,), daemon=True)
+    forwarder.start()
+
+    # The workers share the cores, instead of each engine using all of them
+    workers = min(workers, len(tasks))
+    cpu_threads = max(1, get_total_threads() // workers)
+    for task in tasks:
+        task.cpu_threads = cpu_threads
+
+    completed = 0
+    failed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(events, cpu_threads),
+    ) as executor:
+        futures = {executor.submit(run_task, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as exc:
+                # The worker could not send an event for it
+                result = {
+                    "event": "failed",
+                    "file": futures[future].file_path,
+                    "error": f"Worker process exited unexpectedly: {exc}",
+                }
+                print_event(result)
+
+            if result["event"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+
+    # The workers have exited, so all their events are in the queue
+    events.put(None)
+    forwarder.join()
+
+    print_event({"event": "summary", "completed": completed, "failed": failed})
+    return EXIT_OK if failed == 0 else EXIT_FAILED
+
+
+def main(argv: typing.List[str]) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = create_tasks(args)
+    except CommandLineError as exc:
+        print(f"Error: {str(exc)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        return run(tasks, args.workers)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
@@ -52,6 +52,22 @@ def main():
         format=log_format,
     )
 
+    # Runs without the Qt application, stdout is kept for its JSON lines
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from buzz.batch import main as batch_main
+
+        sys.exit(batch_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "spool":
+        from buzz.spool import main as spool_main
+
+        sys.exit(spool_main(sys.argv[2:]))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        from buzz.search import main as search_main
+
+        sys.exit(search_main(sys.argv[2:]))
+
     if getattr(sys, "frozen", False) is False:
         stdout_handler = logging.StreamHandler(sys.stdout)
         stdout_handler.setLevel(logging.DEBUG)
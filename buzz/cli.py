@@ -20,7 +20,11 @@ from buzz.transcriber.transcriber import (
     LANGUAGES,
     OutputFormat,
 )
-from buzz.widgets.application import Application
+
+if typing.TYPE_CHECKING:
+    # Not imported at runtime, so the batch command can use this module
+    # without loading the widgets
+    from buzz.widgets.application import Application
 
 
 class CommandLineError(Exception):
@@ -36,7 +40,7 @@ class CommandLineModelType(enum.Enum):
     OPEN_AI_WHISPER_API = "openaiapi"
 
 
-def parse_command_line(app: Application):
+def parse_command_line(app: "Application"):
     parser = QCommandLineParser()
     try:
         parse(app, parser)
@@ -49,8 +53,8 @@ def is_url(path: str) -> bool:
     parsed = urllib.parse.urlparse(path)
     return all([parsed.scheme, parsed.netloc])
 
-def parse(app: Application, parser: QCommandLineParser):
-    parser.addPositionalArgument("<command>", "One of the following commands:\n- add")
+def parse(app: "Application", parser: QCommandLineParser):
+    parser.addPositionalArgument("<command>", "One of the following commands:\n- add\n- batch\n- search\n- spool")
     parser.parse(app.arguments())
 
     args = parser.positionalArguments()
@@ -114,6 +118,12 @@ def parse(app: Application, parser: QCommandLineParser):
         vtt_option = QCommandLineOption(["vtt"], "Output result in a VTT file.")
         txt_option = QCommandLineOption("txt", "Output result in a TXT file.")
         hide_gui_option = QCommandLineOption("hide-gui", "Hide the main application window.")
+        priority_option = QCommandLineOption(
+            "priority",
+            "Queue priority. Tasks with a higher priority are transcribed first. Default: 0.",
+            "priority",
+            "0",
+        )
 
         parser.addOptions(
             [
@@ -130,6 +140,7 @@ def parse(app: Application, parser: QCommandLineParser):
                 vtt_option,
                 txt_option,
                 hide_gui_option,
+                priority_option,
             ]
         )
 
@@ -199,6 +210,11 @@ def parse(app: Application, parser: QCommandLineParser):
 
         output_directory = parser.value(output_directory_option)
 
+        try:
+            priority = int(parser.value(priority_option))
+        except ValueError:
+            raise CommandLineError("Invalid value for --priority option.")
+
         transcription_options = TranscriptionOptions(
             model=model,
             task=task,
@@ -225,6 +241,7 @@ def parse(app: Application, parser: QCommandLineParser):
                 transcription_options=transcription_options,
                 file_transcription_options=file_transcription_options,
                 output_directory=output_directory if output_directory != "" else None,
+                priority=priority,
             )
             app.add_task(transcription_task, quit_on_complete=True)
 
@@ -1,13 +1,34 @@
 # Adapted from https://github.com/zhiyiYo/Groove
 from abc import ABC
-from typing import TypeVar, Generic, Any, Type, List
+from contextlib import contextmanager
+from typing import TypeVar, Generic, Any, Type, List, Dict
 
+from PyQt6.QtCore import QByteArray
 from PyQt6.QtSql import QSqlDatabase, QSqlQuery, QSqlRecord
 
 from buzz.db.entity.entity import Entity
 
 T = TypeVar("T", bound=Entity)
 
+# Lowest limit on the values bound to one statement of the SQLite builds we run on
+MAX_BOUND_VALUES = 999
+
+# Open transactions by connection name, a connection is only used by one thread
+_transaction_depths: Dict[str, int] = {}
+
+
+def to_bind_value(value: Any) -> Any:
+    # Bound as is, bytes would be saved as the text of their repr
+    if isinstance(value, bytes):
+        return QByteArray(value)
+    return value
+
+
+def from_record_value(value: Any) -> Any:
+    if isinstance(value, QByteArray):
+        return value.data()
+    return value
+
 
 class DAO(ABC, Generic[T]):
     entity: Type[T]
@@ -29,11 +50,108 @@ class DAO(ABC, Generic[T]):
         """
         )
         for field in fields:
-            query.bindValue(f":{field}", getattr(record, field))
+            query.bindValue(f":{field}", to_bind_value(getattr(record, field)))
 
         if not query.exec():
             raise Exception(query.lastError().text())
 
+    def insert_all(self, records: List[T]):
+        """
+        Inserts the records with multi-row INSERT statements, up to
+        MAX_BOUND_VALUES values each. Run it in a transaction, so the records
+        are committed together.
+
+        Inserting many rows per statement also keeps the full-text index fast
+        to update, as FTS5 flushes its pending changes after every statement
+        that runs its triggers.
+        """
+        if len(records) == 0:
+            return
+
+        fields = [
+            field for field in records[0].__dict__.keys() if field not in self.ignore_fields
+        ]
+        rows_per_statement = max(1, MAX_BOUND_VALUES // len(fields))
+        columns = [
+            [to_bind_value(getattr(record, field)) for record in records]
+            for field in fields
+        ]
+
+        full_statements_end = len(records) - len(records) % rows_per_statement
+        self._insert_rows(fields, columns, 0, full_statements_end, rows_per_statement)
+        if full_statements_end < len(records):
+            self._insert_rows(
+                fields,
+                columns,
+                full_statements_end,
+                len(records),
+                len(records) - full_statements_end,
+            )
+
+    def _insert_rows(
+        self,
+        fields: List[str],
+        columns: List[List[Any]],
+        start: int,
+        end: int,
+        rows_per_statement: int,
+    ):
+        """Inserts rows start to end, rows_per_statement at a time, as one batch"""
+        row_placeholders = f"({', '.join(['?'] * len(fields))})"
+        query = self._create_query()
+        query.prepare(
+            f"""
+            INSERT INTO {self.table} ({", ".join(fields)})
+            VALUES {", ".join([row_placeholders] * rows_per_statement)}
+        """
+        )
+        # The values of each placeholder in all the statements of the batch
+        for row in range(rows_per_statement):
+            for column in columns:
+                query.addBindValue(column[start + row : end : rows_per_statement])
+
+        if not query.execBatch():
+            raise Exception(query.lastError().text())
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commits the writes made in the block together, or rolls them all back.
+        Nested in another transaction of the connection, e.g. in a batch of
+        the database writer, the block runs in a savepoint.
+        """
+        name = self.db.connectionName()
+        depth = _transaction_depths.get(name, 0)
+        if depth == 0:
+            if not self.db.transaction():
+                raise Exception(self.db.lastError().text())
+        else:
+            self._exec(f"SAVEPOINT savepoint_{depth}")
+
+        _transaction_depths[name] = depth + 1
+        try:
+            yield
+        except BaseException:
+            if depth == 0:
+                self.db.rollback()
+            else:
+                self._exec(f"ROLLBACK TO savepoint_{depth}")
+                self._exec(f"RELEASE savepoint_{depth}")
+            raise
+        finally:
+            _transaction_depths[name] = depth
+
+        if depth == 0:
+            if not self.db.commit():
+                raise Exception(self.db.lastError().text())
+        else:
+            self._exec(f"RELEASE savepoint_{depth}")
+
+    def _exec(self, sql: str):
+        query = self._create_query()
+        if not query.exec(sql):
+            raise Exception(query.lastError().text())
+
     def find_by_id(self, id: Any) -> T | None:
         query = self._create_query()
         query.prepare(f"SELECT * FROM {self.table} WHERE id = :id")
@@ -41,7 +159,10 @@ class DAO(ABC, Generic[T]):
         return self._execute(query)
 
     def to_entity(self, record: QSqlRecord) -> T:
-        kwargs = {record.fieldName(i): record.value(i) for i in range(record.count())}
+        kwargs = {
+            record.fieldName(i): from_record_value(record.value(i))
+            for i in range(record.count())
+        }
         return self.entity(**kwargs)
 
     def _execute(self, query: QSqlQuery) -> T | None:
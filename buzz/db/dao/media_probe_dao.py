@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from PyQt6.QtSql import QSqlDatabase
+
+from buzz.db.dao.dao import DAO
+from buzz.db.entity.media_probe import MediaProbe
+
+
+class MediaProbeDAO(DAO[MediaProbe]):
+    entity = MediaProbe
+
+    def __init__(self, db: QSqlDatabase):
+        super().__init__("media_probe", db)
+
+    def find_by_file(self, path: str, size: int, mtime: int) -> MediaProbe | None:
+        """Returns the probe of the file, if it has not changed since it was probed"""
+        query = self._create_query()
+        query.prepare(
+            f"""
+            SELECT * FROM {self.table}
+            WHERE path = :path AND size = :size AND mtime = :mtime
+        """
+        )
+        query.bindValue(":path", path)
+        query.bindValue(":size", size)
+        query.bindValue(":mtime", mtime)
+        return self._execute(query)
+
+    def save(self, probe: MediaProbe):
+        query = self._create_query()
+        query.prepare(
+            f"""
+            INSERT OR REPLACE INTO {self.table} (
+                path, size, mtime, has_audio, duration_ms, audio_codec,
+                sample_rate, channels, format_name, time_probed
+            ) VALUES (
+                :path, :size, :mtime, :has_audio, :duration_ms, :audio_codec,
+                :sample_rate, :channels, :format_name, :time_probed
+            )
+        """
+        )
+        query.bindValue(":path", probe.path)
+        query.bindValue(":size", probe.size)
+        query.bindValue(":mtime", probe.mtime)
+        query.bindValue(":has_audio", probe.has_audio)
+        query.bindValue(":duration_ms", probe.duration_ms)
+        query.bindValue(":audio_codec", probe.audio_codec)
+        query.bindValue(":sample_rate", probe.sample_rate)
+        query.bindValue(":channels", probe.channels)
+        query.bindValue(":format_name", probe.format_name)
+        query.bindValue(":time_probed", probe.time_probed or datetime.now().isoformat())
+        if not query.exec():
+            raise Exception(query.lastError().text())
@@ -1,4 +1,6 @@
+import json
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from PyQt6.QtSql import QSqlDatabase
@@ -31,7 +33,10 @@ class TranscriptionDAO(DAO[Transcription]):
                 time_queued,
                 url,
                 whisper_model_size,
-                hugging_face_model_id
+                hugging_face_model_id,
+                duration_ms,
+                priority,
+                transcription_options
             ) VALUES (
                 :id,
                 :export_formats,
@@ -45,7 +50,10 @@ class TranscriptionDAO(DAO[Transcription]):
                 :time_queued,
                 :url,
                 :whisper_model_size,
-                :hugging_face_model_id
+                :hugging_face_model_id,
+                :duration_ms,
+                :priority,
+                :transcription_options
             )
         """
         )
@@ -82,6 +90,50 @@ class TranscriptionDAO(DAO[Transcription]):
             if task.transcription_options.model.hugging_face_model_id
             else None,
         )
+        query.bindValue(":duration_ms", task.duration_ms)
+        query.bindValue(":priority", task.priority)
+        # Kept so the task can be queued again after a restart
+        options = task.transcription_options
+        query.bindValue(
+            ":transcription_options",
+            json.dumps(
+                {
+                    "word_level_timings": options.word_level_timings,
+                    "temperature": list(options.temperature),
+                    "initial_prompt": options.initial_prompt,
+                    "enable_llm_translation": options.enable_llm_translation,
+                    "llm_prompt": options.llm_prompt,
+                    "llm_model": options.llm_model,
+                }
+            ),
+        )
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+    def get_queued_transcriptions(self) -> List[Transcription]:
+        query = self._create_query()
+        query.prepare(
+            """
+            SELECT * FROM transcription
+            WHERE status = :status
+            ORDER BY time_queued ASC, rowid ASC
+        """
+        )
+        query.bindValue(":status", FileTranscriptionTask.Status.QUEUED.value)
+        return self._execute_all(query)
+
+    def update_transcription_as_queued(self, id: UUID):
+        query = self._create_query()
+        query.prepare(
+            """
+            UPDATE transcription
+            SET status = :status, time_ended = NULL, error_message = NULL
+            WHERE id = :id
+        """
+        )
+
+        query.bindValue(":id", str(id))
+        query.bindValue(":status", FileTranscriptionTask.Status.QUEUED.value)
         if not query.exec():
             raise Exception(query.lastError().text())
 
@@ -165,3 +217,33 @@ class TranscriptionDAO(DAO[Transcription]):
         query.bindValue(":time_ended", datetime.now().isoformat())
         if not query.exec():
             raise Exception(query.lastError().text())
+
+    def update_transcription_duration(self, id: UUID, duration_ms: int):
+        query = self._create_query()
+        query.prepare(
+            """
+            UPDATE transcription
+            SET duration_ms = :duration_ms
+            WHERE id = :id
+        """
+        )
+
+        query.bindValue(":id", str(id))
+        query.bindValue(":duration_ms", duration_ms)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+    def update_transcription_priority(self, id: UUID, priority: int):
+        query = self._create_query()
+        query.prepare(
+            """
+            UPDATE transcription
+            SET priority = :priority
+            WHERE id = :id
+        """
+        )
+
+        query.bindValue(":id", str(id))
+        query.bindValue(":priority", priority)
+        if not query.exec():
+            raise Exception(query.lastError().text())
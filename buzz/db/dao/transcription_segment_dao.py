@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Tuple, Dict
 from uuid import UUID
 
-from PyQt6.QtSql import QSqlDatabase
+from PyQt6.QtSql import QSqlDatabase, QSqlRecord
 
-from buzz.db.dao.dao import DAO
+from buzz.db.dao.dao import DAO, to_bind_value, from_record_value
+from buzz.db.entity.segment_search_result import SegmentSearchResult
 from buzz.db.entity.transcription_segment import TranscriptionSegment
+from buzz.db.word_timings import count_words, unpack_words, pack_words, join_words
 
 
 class TranscriptionSegmentDAO(DAO[TranscriptionSegment]):
@@ -14,6 +16,13 @@ class TranscriptionSegmentDAO(DAO[TranscriptionSegment]):
     def __init__(self, db: QSqlDatabase):
         super().__init__("transcription_segment", db)
 
+    def to_entity(self, record: QSqlRecord) -> TranscriptionSegment:
+        segment = super().to_entity(record)
+        # NULL blobs are read as empty strings
+        if not segment.words:
+            segment.words = None
+        return segment
+
     def get_segments(self, transcription_id: UUID) -> List[TranscriptionSegment]:
         query = self._create_query()
         query.prepare(
@@ -37,6 +46,47 @@ class TranscriptionSegmentDAO(DAO[TranscriptionSegment]):
         if not query.exec():
             raise Exception(query.lastError().text())
 
+    def search(self, match_query: str, limit: int) -> List[SegmentSearchResult]:
+        """
+        Segments whose text or translation match the FTS5 query, newest first.
+        The index is read in rowid order, so the query stops after limit
+        matches instead of ranking all of them.
+        """
+        query = self._create_query()
+        query.prepare(
+            f"""
+            SELECT segment.id, segment.transcription_id, segment.start_time,
+                segment.end_time, segment.text, segment.translation,
+                transcription.file, transcription.url
+            FROM {self.table}_fts
+            JOIN {self.table} AS segment ON segment.id = {self.table}_fts.rowid
+            JOIN transcription ON transcription.id = segment.transcription_id
+            WHERE {self.table}_fts MATCH :match_query
+            ORDER BY {self.table}_fts.rowid DESC
+            LIMIT :limit
+        """
+        )
+        query.bindValue(":match_query", match_query)
+        query.bindValue(":limit", limit)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+        results = []
+        while query.next():
+            results.append(
+                SegmentSearchResult(
+                    id=query.value("id"),
+                    transcription_id=query.value("transcription_id"),
+                    start_time=query.value("start_time"),
+                    end_time=query.value("end_time"),
+                    text=query.value("text"),
+                    translation=query.value("translation") or "",
+                    file=query.value("file") or "",
+                    url=query.value("url") or "",
+                )
+            )
+        return results
+
     def update_segment_translation(self, segment_id: int, translation: str):
         query = self._create_query()
         query.prepare(
@@ -51,3 +101,90 @@ class TranscriptionSegmentDAO(DAO[TranscriptionSegment]):
         query.bindValue(":translation", translation)
         if not query.exec():
             raise Exception(query.lastError().text())
+
+    def update_segment_text(self, segment_id: int, text: str):
+        query = self._create_query()
+        query.prepare(
+            f"""
+            UPDATE {self.table}
+            SET text = :text
+            WHERE id = :id
+        """
+        )
+
+        query.bindValue(":id", segment_id)
+        query.bindValue(":text", text)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+    def update_segment_words(self, segment_id: int, translation: str, words: bytes):
+        query = self._create_query()
+        query.prepare(
+            f"""
+            UPDATE {self.table}
+            SET translation = :translation, words = :words
+            WHERE id = :id
+        """
+        )
+
+        query.bindValue(":id", segment_id)
+        query.bindValue(":translation", translation)
+        query.bindValue(":words", to_bind_value(words))
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+    def update_segment_translations(
+        self, transcription_id: UUID, translations: List[Tuple[int, str]]
+    ):
+        """
+        Updates translations by the position of the segment in the
+        transcription. The segments of word-level transcriptions are
+        sentences, there the positions are those of the words.
+        """
+        query = self._create_query()
+        query.prepare(
+            f"""
+            SELECT id, words FROM {self.table}
+            WHERE transcription_id = :transcription_id
+            ORDER BY id
+        """
+        )
+        query.bindValue(":transcription_id", str(transcription_id))
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+        # The segment and the position in its words of each word
+        positions: List[Tuple[int, int]] = []
+        packed_words: Dict[int, bytes] = {}
+        while query.next():
+            segment_id = query.value(0)
+            words = from_record_value(query.value(1))
+            count = count_words(words)
+            if count == 0:
+                positions.append((segment_id, -1))
+                continue
+            packed_words[segment_id] = words
+            positions.extend((segment_id, position) for position in range(count))
+
+        word_translations: Dict[int, List[Tuple[int, str]]] = {}
+        with self.transaction():
+            for index, translation in translations:
+                if index >= len(positions):
+                    continue
+                segment_id, position = positions[index]
+                if position == -1:
+                    self.update_segment_translation(segment_id, translation)
+                else:
+                    word_translations.setdefault(segment_id, []).append(
+                        (position, translation)
+                    )
+
+            for segment_id, updates in word_translations.items():
+                words = unpack_words(packed_words[segment_id])
+                for position, translation in updates:
+                    words[position].translation = translation
+                self.update_segment_words(
+                    segment_id,
+                    join_words([word.translation for word in words]),
+                    pack_words(words),
+                )
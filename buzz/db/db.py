@@ -2,6 +2,7 @@ import logging
 import os
 import sqlite3
 import tempfile
+from typing import Optional
 
 from PyQt6.QtSql import QSqlDatabase
 from platformdirs import user_data_dir
@@ -10,16 +11,35 @@ from buzz.assets import get_data_path
 from buzz.db.helpers import (
     run_sqlite_migrations,
     copy_transcriptions_from_json_to_sqlite,
-    mark_in_progress_and_queued_transcriptions_as_canceled,
+    requeue_interrupted_transcriptions,
+    has_column,
+    pack_word_level_segments,
 )
 
+# Applied to every connection. WAL lets the GUI read while the database writer
+# commits, and with WAL a commit only needs to sync at checkpoints.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    # 32 MB page cache
+    "PRAGMA cache_size = -32000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    # Waits for the other connection to finish writing instead of failing
+    "PRAGMA busy_timeout = 5000",
+)
 
-def setup_app_db() -> QSqlDatabase:
+
+def get_app_db_path() -> str:
     #data_dir = user_data_dir("Buzz")
-    data_dir = get_data_path()
-    os.makedirs(data_dir, exist_ok=True)
-    logging.debug("Database directory: %s", data_dir)
-    return _setup_db(os.path.join(data_dir, "Buzz.sqlite"))
+    return os.path.join(get_data_path(), "Buzz.sqlite")
+
+
+def setup_app_db() -> QSqlDatabase:
+    path = get_app_db_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    logging.debug("Database directory: %s", os.path.dirname(path))
+    return _setup_db(path)
 
 
 def setup_test_db() -> QSqlDatabase:
@@ -29,15 +49,40 @@ def setup_test_db() -> QSqlDatabase:
 def _setup_db(path: str) -> QSqlDatabase:
     # Run migrations
     db = sqlite3.connect(path)
+    # Stored in the database file, so it applies to all later connections
+    db.execute("PRAGMA journal_mode = WAL")
+    # Word-level transcriptions saved before the words column was added have
+    # a row for each word, they are packed once
+    pack_words = not has_column(db, "transcription_segment", "words")
     run_sqlite_migrations(db)
+    if pack_words:
+        pack_word_level_segments(db)
     copy_transcriptions_from_json_to_sqlite(db)
-    mark_in_progress_and_queued_transcriptions_as_canceled(db)
+    requeue_interrupted_transcriptions(db)
     db.close()
 
-    db = QSqlDatabase.addDatabase("QSQLITE")
+    return open_connection(path)
+
+
+def open_connection(
+    path: str, connection_name: Optional[str] = None, read_only: bool = False
+) -> QSqlDatabase:
+    """
+    Opens a connection to the database, for use on the thread that opens it.
+    Opens the default connection if connection_name is None. A read-only
+    connection does not migrate the database, for commands that only read it
+    while the app may be running.
+    """
+    if connection_name is None:
+        db = QSqlDatabase.addDatabase("QSQLITE")
+    else:
+        db = QSqlDatabase.addDatabase("QSQLITE", connection_name)
     db.setDatabaseName(path)
+    if read_only:
+        db.setConnectOptions("QSQLITE_OPEN_READONLY")
     if not db.open():
         raise RuntimeError(f"Failed to open database connection: {db.databaseName()}")
-    db.exec('PRAGMA foreign_keys = ON')
+    for pragma in CONNECTION_PRAGMAS:
+        db.exec(pragma)
     logging.debug("Database connection opened: %s", db.databaseName())
     return db
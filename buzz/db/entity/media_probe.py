@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+from buzz.db.entity.entity import Entity
+
+
+@dataclass
+class MediaProbe(Entity):
+    path: str
+    size: int
+    mtime: int
+    has_audio: bool = False
+    duration_ms: int | None = None
+    audio_codec: str | None = None
+    sample_rate: int | None = None
+    channels: int | None = None
+    format_name: str | None = None
+    time_probed: str | None = None
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+from buzz.db.entity.entity import Entity
+
+
+@dataclass
+class SegmentSearchResult(Entity):
+    """A segment that matches a search, with the file or URL it was transcribed from"""
+
+    id: int
+    transcription_id: str
+    start_time: int
+    end_time: int
+    text: str
+    translation: str
+    file: str
+    url: str
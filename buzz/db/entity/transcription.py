@@ -1,12 +1,19 @@
 import datetime
+import json
 import os
 import uuid
 from dataclasses import dataclass, field
 
 from buzz.db.entity.entity import Entity
-from buzz.model_loader import ModelType
+from buzz.model_loader import ModelType, TranscriptionModel, WhisperModelSize
 from buzz.settings.settings import Settings
-from buzz.transcriber.transcriber import OutputFormat, Task, FileTranscriptionTask
+from buzz.transcriber.transcriber import (
+    OutputFormat,
+    Task,
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+)
 
 
 @dataclass
@@ -28,6 +35,10 @@ class Transcription(Entity):
     output_folder: str | None = None
     source: str | None = None
     url: str | None = None
+    duration_ms: int | None = None
+    priority: int = 0
+    # Options that have no column of their own, as JSON
+    transcription_options: str | None = None
 
     @property
     def id_as_uuid(self):
@@ -37,6 +48,52 @@ class Transcription(Entity):
     def status_as_status(self):
         return FileTranscriptionTask.Status(self.status)
 
+    def to_task(self, openai_access_token: str = "") -> FileTranscriptionTask:
+        """Rebuilds the task of a transcription that was queued before a restart"""
+        options = json.loads(self.transcription_options or "{}")
+        if "temperature" in options:
+            options["temperature"] = tuple(options["temperature"])
+
+        model = TranscriptionModel(
+            model_type=ModelType(self.model_type),
+            whisper_model_size=WhisperModelSize(self.whisper_model_size)
+            if self.whisper_model_size
+            else None,
+            hugging_face_model_id=self.hugging_face_model_id or "",
+        )
+        transcription_options = TranscriptionOptions(
+            language=self.language or None,
+            task=Task(self.task),
+            model=model,
+            openai_access_token=openai_access_token,
+            **options,
+        )
+        file_transcription_options = FileTranscriptionOptions(
+            file_paths=[self.file] if self.file else None,
+            url=self.url or None,
+            output_formats={
+                OutputFormat(output_format.strip())
+                for output_format in (self.export_formats or "").split(",")
+                if output_format.strip() != ""
+            },
+        )
+
+        return FileTranscriptionTask(
+            uid=self.id_as_uuid,
+            transcription_options=transcription_options,
+            file_transcription_options=file_transcription_options,
+            model_path=model.get_local_model_path(),
+            status=FileTranscriptionTask.Status.QUEUED,
+            output_directory=self.output_folder or None,
+            source=FileTranscriptionTask.Source(
+                self.source or FileTranscriptionTask.Source.FILE_IMPORT.value
+            ),
+            file_path=self.file or None,
+            url=self.url or None,
+            priority=self.priority or 0,
+            duration_ms=self.duration_ms or None,
+        )
+
     def get_output_file_path(
         self,
         output_format: OutputFormat,
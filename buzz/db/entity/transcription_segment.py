@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from buzz.db.entity.entity import Entity
 
@@ -11,3 +12,5 @@ class TranscriptionSegment(Entity):
     translation: str
     transcription_id: str
     id: int = -1
+    # Packed timings of the words of the sentence, see buzz.db.word_timings
+    words: Optional[bytes] = None
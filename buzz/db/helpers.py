@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import datetime
 from sqlite3 import Connection
@@ -5,6 +6,8 @@ from sqlite3 import Connection
 from buzz.assets import get_path
 from buzz.cache import TasksCache
 from buzz.db.migrator import dumb_migrate_db
+from buzz.db.word_timings import group_words, to_sentence
+from buzz.transcriber.transcriber import Segment
 
 
 def copy_transcriptions_from_json_to_sqlite(conn: Connection):
@@ -76,14 +79,91 @@ def run_sqlite_migrations(db: Connection):
         dumb_migrate_db(db=db, schema=schema)
 
 
-def mark_in_progress_and_queued_transcriptions_as_canceled(conn: Connection):
+def requeue_interrupted_transcriptions(conn: Connection):
+    """
+    Queues the transcriptions that were in progress when the app last exited,
+    so they run again with the ones that were still queued. Transcriptions
+    saved without their options cannot be rebuilt and are marked as canceled.
+    """
     cursor = conn.cursor()
+    cursor.execute(
+        """
+        UPDATE transcription
+        SET status = 'queued', progress = 0.0, time_started = NULL
+        WHERE status = 'in_progress' AND transcription_options IS NOT NULL;
+        """
+    )
     cursor.execute(
         """
         UPDATE transcription
         SET status = 'canceled', time_ended = ?
-        WHERE status = 'in_progress' OR status = 'queued';
+        WHERE (status = 'in_progress' OR status = 'queued')
+            AND transcription_options IS NULL;
         """,
         (datetime.now().isoformat(),),
     )
     conn.commit()
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
+
+
+def pack_word_level_segments(conn: Connection):
+    """
+    Packs the words of the word-level transcriptions saved with a row for
+    each word into sentences, as they are now saved. Transcriptions saved
+    without their options are word-level if all their segments are words.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, transcription_options FROM transcription WHERE status = 'completed'"
+    )
+    for transcription_id, options in cursor.fetchall():
+        if options is not None and not json.loads(options).get("word_level_timings"):
+            continue
+
+        cursor.execute(
+            """
+            SELECT start_time, end_time, text, translation FROM transcription_segment
+            WHERE transcription_id = ?
+            ORDER BY id
+            """,
+            (transcription_id,),
+        )
+        words = [
+            Segment(start=start, end=end, text=text, translation=translation or "")
+            for start, end, text, translation in cursor.fetchall()
+        ]
+        if len(words) < 2:
+            continue
+        if options is None and any(len(word.text.split()) > 1 for word in words):
+            continue
+
+        cursor.execute(
+            "DELETE FROM transcription_segment WHERE transcription_id = ?",
+            (transcription_id,),
+        )
+        sentences = [
+            to_sentence(sentence_words, transcription_id)
+            for sentence_words in group_words(words)
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO transcription_segment (start_time, end_time, text, translation, transcription_id, words)
+            VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            [
+                (
+                    sentence.start_time,
+                    sentence.end_time,
+                    sentence.text,
+                    sentence.translation,
+                    sentence.transcription_id,
+                    sentence.words,
+                )
+                for sentence in sentences
+            ],
+        )
+    conn.commit()
@@ -116,13 +116,7 @@ class DBMigrator:
         # In CI the database schema may be changing all the time.  This checks
         # the current db and if it doesn't match database.sql we will
         # modify it so it does match where possible.
-        pristine_tables = dict(
-            self.pristine.execute(
-                """\
-            SELECT name, sql FROM sqlite_master
-            WHERE type = \"table\" AND name != \"sqlite_sequence\""""
-            ).fetchall()
-        )
+        pristine_tables = _get_tables(self.pristine)
         pristine_indices = dict(
             self.pristine.execute(
                 """\
@@ -131,13 +125,7 @@ class DBMigrator:
             ).fetchall()
         )
 
-        tables = dict(
-            self.db.execute(
-                """\
-            SELECT name, sql FROM sqlite_master
-            WHERE type = \"table\" AND name != \"sqlite_sequence\""""
-            ).fetchall()
-        )
+        tables = _get_tables(self.db)
 
         new_tables = set(pristine_tables.keys()) - set(tables.keys())
         removed_tables = set(tables.keys()) - set(pristine_tables.keys())
@@ -161,6 +149,29 @@ class DBMigrator:
         for tbl_name in removed_tables:
             self.log_execute("Drop table %s" % tbl_name, "DROP TABLE %s" % tbl_name)
 
+        # Virtual tables, e.g. full-text indexes, hold no data of their own and
+        # are created again, then rebuilt once their content tables are migrated
+        recreated_tables = set()
+        for tbl_name in set(modified_tables):
+            if not _is_virtual(pristine_tables[tbl_name]):
+                continue
+            modified_tables.remove(tbl_name)
+            if tbl_name in tables:
+                recreated_tables.add(tbl_name)
+                self.log_execute(
+                    "Virtual table %s changed: Dropping old version" % tbl_name,
+                    "DROP TABLE %s" % tbl_name,
+                )
+                self.log_execute(
+                    "Virtual table %s changed: Creating updated version" % tbl_name,
+                    pristine_tables[tbl_name],
+                )
+        rebuilt_tables = [
+            tbl_name
+            for tbl_name in new_tables | recreated_tables
+            if _is_external_content_fts(pristine_tables[tbl_name])
+        ]
+
         for tbl_name in modified_tables:
             # The SQLite documentation insists that we create the new table and
             # rename it over the old rather than moving the old out of the way
@@ -223,6 +234,12 @@ class DBMigrator:
                 "ALTER TABLE %s_migration_new RENAME TO %s" % (tbl_name, tbl_name),
             )
 
+        for tbl_name in rebuilt_tables:
+            self.log_execute(
+                "Rebuild full-text index %s" % tbl_name,
+                "INSERT INTO %s(%s) VALUES ('rebuild')" % (tbl_name, tbl_name),
+            )
+
         # Migrate the indices
         indices = dict(
             self.db.execute(
@@ -248,6 +265,39 @@ class DBMigrator:
                     sql,
                 )
 
+        # Migrate the triggers, after the tables as dropping a table drops
+        # its triggers
+        pristine_triggers = dict(
+            self.pristine.execute(
+                """\
+            SELECT name, sql FROM sqlite_master
+            WHERE type = \"trigger\""""
+            ).fetchall()
+        )
+        triggers = dict(
+            self.db.execute(
+                """\
+            SELECT name, sql FROM sqlite_master
+            WHERE type = \"trigger\""""
+            ).fetchall()
+        )
+        for name in set(triggers.keys()) - set(pristine_triggers.keys()):
+            self.log_execute(
+                "Dropping obsolete trigger %s" % name, "DROP TRIGGER %s" % name
+            )
+        for name, sql in pristine_triggers.items():
+            if name not in triggers:
+                self.log_execute("Creating new trigger %s" % name, sql)
+            elif sql != triggers[name]:
+                self.log_execute(
+                    "Trigger %s changed: Dropping old version" % name,
+                    "DROP TRIGGER %s" % name,
+                )
+                self.log_execute(
+                    "Trigger %s changed: Creating updated version in its place" % name,
+                    sql,
+                )
+
         self._migrate_pragma("user_version")
 
         if self.pristine.execute("PRAGMA foreign_keys").fetchone()[0]:
@@ -267,6 +317,36 @@ class DBMigrator:
         return pristine_val
 
 
+def _get_tables(db):
+    """Tables by name, without the shadow tables that store virtual tables"""
+    tables = dict(
+        db.execute(
+            """\
+        SELECT name, sql FROM sqlite_master
+        WHERE type = \"table\" AND name != \"sqlite_sequence\""""
+        ).fetchall()
+    )
+    virtual_tables = [name for name, sql in tables.items() if _is_virtual(sql)]
+    return {
+        name: sql
+        for name, sql in tables.items()
+        if not any(name.startswith(virtual + "_") for virtual in virtual_tables)
+    }
+
+
+def _is_virtual(sql):
+    return normalise_sql(sql).upper().startswith("CREATE VIRTUAL TABLE")
+
+
+def _is_external_content_fts(sql):
+    sql = normalise_sql(sql).lower()
+    return (
+        _is_virtual(sql)
+        and "using fts5" in sql
+        and re.search(r"\bcontent\s*=\s*'[^']+'", sql) is not None
+    )
+
+
 def _left_pad(text, indent="    "):
     """Maybe I can find a package in pypi for this?"""
     return "\n".join(indent + line for line in text.split("\n"))
@@ -1,10 +1,29 @@
-from typing import List
+from typing import List, Tuple, Optional
 from uuid import UUID
 
+from buzz.db.dao.media_probe_dao import MediaProbeDAO
 from buzz.db.dao.transcription_dao import TranscriptionDAO
 from buzz.db.dao.transcription_segment_dao import TranscriptionSegmentDAO
+from buzz.db.entity.media_probe import MediaProbe
+from buzz.db.entity.segment_search_result import SegmentSearchResult
 from buzz.db.entity.transcription_segment import TranscriptionSegment
-from buzz.transcriber.transcriber import Segment
+from buzz.db.word_timings import group_words, to_sentence, expand_words
+from buzz.media_probe import MediaInfo
+from buzz.transcriber.transcriber import Segment, FileTranscriptionTask
+
+DEFAULT_SEARCH_LIMIT = 100
+
+
+def to_match_query(text: str) -> str:
+    """
+    FTS5 query that matches segments with all the words, the last one as a
+    prefix so results show while typing. The words are quoted, so search text
+    is never read as FTS5 syntax.
+    """
+    words = ['"%s"' % word.replace('"', '""') for word in text.split()]
+    if len(words) > 0:
+        words[-1] += "*"
+    return " ".join(words)
 
 
 class TranscriptionService:
@@ -12,13 +31,28 @@ class TranscriptionService:
         self,
         transcription_dao: TranscriptionDAO,
         transcription_segment_dao: TranscriptionSegmentDAO,
+        media_probe_dao: Optional[MediaProbeDAO] = None,
     ):
         self.transcription_dao = transcription_dao
         self.transcription_segment_dao = transcription_segment_dao
+        self.media_probe_dao = media_probe_dao or MediaProbeDAO(transcription_dao.db)
 
     def create_transcription(self, task):
         self.transcription_dao.create_transcription(task)
 
+    def get_queued_tasks(self, openai_access_token: str = "") -> List[FileTranscriptionTask]:
+        """Tasks of the queued transcriptions, in the order they were queued"""
+        return [
+            transcription.to_task(openai_access_token=openai_access_token)
+            for transcription in self.transcription_dao.get_queued_transcriptions()
+        ]
+
+    def update_transcription_priority(self, id: UUID, priority: int):
+        self.transcription_dao.update_transcription_priority(id, priority)
+
+    def update_transcription_as_queued(self, id: UUID):
+        self.transcription_dao.update_transcription_as_queued(id)
+
     def update_transcription_as_started(self, id: UUID):
         self.transcription_dao.update_transcription_as_started(id)
 
@@ -31,34 +65,106 @@ class TranscriptionService:
     def update_transcription_progress(self, id: UUID, progress: float):
         self.transcription_dao.update_transcription_progress(id, progress)
 
-    def update_transcription_as_completed(self, id: UUID, segments: List[Segment]):
-        self.transcription_dao.update_transcription_as_completed(id)
-        for segment in segments:
-            self.transcription_segment_dao.insert(
+    def update_transcription_as_completed(
+        self, id: UUID, segments: List[Segment], word_level_timings: bool = False
+    ):
+        """
+        Saves the segments of the completed transcription. With word-level
+        timings the segments are words, they are saved as sentences with the
+        timings of their words packed in each.
+        """
+        if word_level_timings:
+            records = [
+                to_sentence(words, str(id)) for words in group_words(segments)
+            ]
+        else:
+            records = [
                 TranscriptionSegment(
                     start_time=segment.start,
                     end_time=segment.end,
                     text=segment.text,
-                    translation='',
+                    translation=segment.translation,
                     transcription_id=str(id),
                 )
-            )
+                for segment in segments
+            ]
+
+        with self.transcription_dao.transaction():
+            self.transcription_dao.update_transcription_as_completed(id)
+            self.transcription_segment_dao.insert_all(records)
 
     def replace_transcription_segments(self, id: UUID, segments: List[Segment]):
-        self.transcription_segment_dao.delete_segments(id)
-        for segment in segments:
-            self.transcription_segment_dao.insert(
-                TranscriptionSegment(
-                    start_time=segment.start,
-                    end_time=segment.end,
-                    text=segment.text,
-                    translation='',
-                    transcription_id=str(id),
-                )
+        with self.transcription_segment_dao.transaction():
+            self.transcription_segment_dao.delete_segments(id)
+            self.transcription_segment_dao.insert_all(
+                [
+                    TranscriptionSegment(
+                        start_time=segment.start,
+                        end_time=segment.end,
+                        text=segment.text,
+                        translation='',
+                        transcription_id=str(id),
+                    )
+                    for segment in segments
+                ]
             )
 
     def get_transcription_segments(self, transcription_id: UUID):
         return self.transcription_segment_dao.get_segments(transcription_id)
 
+    def get_transcription_words(self, transcription_id: UUID) -> List[Segment]:
+        """Segments to export, word-level transcriptions have one for each word"""
+        return expand_words(self.transcription_segment_dao.get_segments(transcription_id))
+
+    def search_segments(
+        self, text: str, limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[SegmentSearchResult]:
+        """Segments of all transcriptions whose text or translation contain the words"""
+        match_query = to_match_query(text)
+        if match_query == "":
+            return []
+        return self.transcription_segment_dao.search(match_query, limit)
+
+    def update_segment_text(self, segment_id: int, text: str):
+        self.transcription_segment_dao.update_segment_text(segment_id, text)
+
     def update_segment_translation(self, segment_id: int, translation: str):
         return self.transcription_segment_dao.update_segment_translation(segment_id, translation)
+
+    def update_segment_translations(
+        self, transcription_id: UUID, translations: List[Tuple[int, str]]
+    ):
+        return self.transcription_segment_dao.update_segment_translations(
+            transcription_id, translations
+        )
+
+    def update_transcription_duration(self, id: UUID, duration_ms: int):
+        self.transcription_dao.update_transcription_duration(id, duration_ms)
+
+    def get_media_info(self, path: str, size: int, mtime: int) -> Optional[MediaInfo]:
+        probe = self.media_probe_dao.find_by_file(path, size, mtime)
+        if probe is None:
+            return None
+        return MediaInfo(
+            duration_ms=probe.duration_ms or None,
+            has_audio=bool(probe.has_audio),
+            audio_codec=probe.audio_codec or None,
+            sample_rate=probe.sample_rate or None,
+            channels=probe.channels or None,
+            format_name=probe.format_name or None,
+        )
+
+    def save_media_info(self, path: str, size: int, mtime: int, info: MediaInfo):
+        self.media_probe_dao.save(
+            MediaProbe(
+                path=path,
+                size=size,
+                mtime=mtime,
+                has_audio=info.has_audio,
+                duration_ms=info.duration_ms,
+                audio_codec=info.audio_codec,
+                sample_rate=info.sample_rate,
+                channels=info.channels,
+                format_name=info.format_name,
+            )
+        )
@@ -0,0 +1,145 @@
+import struct
+from typing import List, Optional, Sequence
+
+from buzz.db.entity.transcription_segment import TranscriptionSegment
+from buzz.transcriber.transcriber import Segment
+
+# Words of a sentence are stored in one blob on its segment instead of a row
+# each. Little-endian, with n words:
+#   uint32 n
+#   int32[n] start times, int32[n] end times
+#   uint32[2n + 1] offsets into the UTF-8 strings of the word texts, then of
+#       the word translations
+#   UTF-8 strings
+HEADER = struct.Struct("<I")
+
+SENTENCE_ENDINGS = (".", "?", "!", "…", "。", "？", "！")
+# A pause this long ends a sentence even without punctuation, the same pause
+# starts a new paragraph in TXT exports
+MAX_PAUSE_MS = 2000
+# Keeps the rows short when there is no punctuation at all
+MAX_SENTENCE_WORDS = 50
+
+
+def pack_words(words: Sequence[Segment]) -> bytes:
+    count = len(words)
+    strings = [word.text.encode("utf-8") for word in words] + [
+        word.translation.encode("utf-8") for word in words
+    ]
+    offsets = [0]
+    for string in strings:
+        offsets.append(offsets[-1] + len(string))
+    return b"".join(
+        [
+            HEADER.pack(count),
+            struct.pack(f"<{count}i", *[word.start for word in words]),
+            struct.pack(f"<{count}i", *[word.end for word in words]),
+            struct.pack(f"<{2 * count + 1}I", *offsets),
+        ]
+        + strings
+    )
+
+
+def count_words(data: Optional[bytes]) -> int:
+    """Number of words in the blob, without unpacking them"""
+    if not data:
+        return 0
+    return HEADER.unpack_from(data)[0]
+
+
+def unpack_words(data: Optional[bytes]) -> List[Segment]:
+    if not data:
+        return []
+
+    (count,) = HEADER.unpack_from(data)
+    position = HEADER.size
+    starts = struct.unpack_from(f"<{count}i", data, position)
+    position += 4 * count
+    ends = struct.unpack_from(f"<{count}i", data, position)
+    position += 4 * count
+    offsets = struct.unpack_from(f"<{2 * count + 1}I", data, position)
+    strings = memoryview(data)[position + 4 * (2 * count + 1):]
+
+    def get_string(index: int) -> str:
+        return str(strings[offsets[index]:offsets[index + 1]], "utf-8")
+
+    return [
+        Segment(
+            start=starts[i],
+            end=ends[i],
+            text=get_string(i),
+            translation=get_string(count + i),
+        )
+        for i in range(count)
+    ]
+
+
+def join_words(texts: Sequence[str]) -> str:
+    """
+    Text of a sentence. Some engines keep the space before each word, the
+    words of the others are joined with spaces.
+    """
+    if any(text[:1].isspace() for text in texts[1:]):
+        return "".join(texts).strip()
+    return " ".join(text.strip() for text in texts if text.strip() != "")
+
+
+def group_words(words: Sequence[Segment]) -> List[List[Segment]]:
+    """Groups the words into sentences, at punctuation and long pauses"""
+    sentences: List[List[Segment]] = []
+    sentence: List[Segment] = []
+    for word in words:
+        if len(sentence) > 0 and (
+            word.start - sentence[-1].end >= MAX_PAUSE_MS
+            or len(sentence) == MAX_SENTENCE_WORDS
+        ):
+            sentences.append(sentence)
+            sentence = []
+
+        sentence.append(word)
+        if word.text.strip().endswith(SENTENCE_ENDINGS):
+            sentences.append(sentence)
+            sentence = []
+
+    if len(sentence) > 0:
+        sentences.append(sentence)
+    return sentences
+
+
+def to_sentence(words: Sequence[Segment], transcription_id: str) -> TranscriptionSegment:
+    return TranscriptionSegment(
+        start_time=words[0].start,
+        end_time=words[-1].end,
+        text=join_words([word.text for word in words]),
+        translation=join_words([word.translation for word in words]),
+        transcription_id=transcription_id,
+        words=pack_words(words),
+    )
+
+
+def get_words(segment: TranscriptionSegment) -> List[Segment]:
+    """
+    Words of the segment, or the segment itself if it has no words. Once the
+    text or translation of the segment is edited, its words no longer match
+    and are ignored.
+    """
+    words = unpack_words(segment.words)
+    if (
+        len(words) > 0
+        and join_words([word.text for word in words]) == segment.text
+        and join_words([word.translation for word in words]) == segment.translation
+    ):
+        return words
+    return [
+        Segment(
+            start=segment.start_time,
+            end=segment.end_time,
+            text=segment.text,
+            translation=segment.translation,
+        )
+    ]
+
+
+def expand_words(segments: Sequence[TranscriptionSegment]) -> List[Segment]:
+    """Segments to export, with a segment for each word of word-level transcriptions"""
+    return [word for segment in segments for word in get_words(segment)]
@@ -0,0 +1,123 @@
+import logging
+import queue
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional, List, Any
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase
+
+from buzz.db.dao.media_probe_dao import MediaProbeDAO
+from buzz.db.dao.transcription_dao import TranscriptionDAO
+from buzz.db.dao.transcription_segment_dao import TranscriptionSegmentDAO
+from buzz.db.db import open_connection
+from buzz.db.service.transcription_service import TranscriptionService
+
+# Most writes committed in one transaction
+MAX_BATCH_SIZE = 500
+
+
+@dataclass
+class Write:
+    function: Callable[[TranscriptionService], Any]
+    on_committed: Optional[Callable[[], None]] = None
+
+
+class DatabaseWriter(QObject):
+    """
+    Runs the writes to the database on a background thread with its own
+    connection, so the GUI thread never waits for a commit. Reads stay on the
+    connection of the GUI thread, which sees each batch once it is committed.
+
+    Writes run in the order they are submitted. The writes submitted while a
+    batch commits are committed together in the next one, each in its own
+    savepoint, so a failed write does not roll back the others.
+    """
+
+    # Callbacks of the writes in a committed batch, called on the thread the
+    # writer lives on
+    committed = pyqtSignal(list)
+
+    def __init__(self, path: str, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.path = path
+        self.queue: "queue.Queue[Optional[Write]]" = queue.Queue()
+        self.commits = 0
+        self.committed.connect(self.on_committed)
+        # Writes are committed by stop(), which the main window calls on close,
+        # a window that is never closed does not keep the process alive
+        self.thread = threading.Thread(
+            target=self.run, name="database-writer", daemon=True
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def submit(
+        self,
+        function: Callable[[TranscriptionService], Any],
+        on_committed: Optional[Callable[[], None]] = None,
+    ):
+        """Runs function with the writer's service, then on_committed on this thread"""
+        self.queue.put(Write(function=function, on_committed=on_committed))
+
+    def stop(self):
+        """Commits the writes submitted so far and stops the writer"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def run(self):
+        connection_name = f"database-writer-{uuid.uuid4()}"
+        db = open_connection(self.path, connection_name)
+        try:
+            self.write_batches(db)
+        finally:
+            db.close()
+            del db
+            QSqlDatabase.removeDatabase(connection_name)
+
+    def write_batches(self, db: QSqlDatabase):
+        service = TranscriptionService(
+            TranscriptionDAO(db), TranscriptionSegmentDAO(db), MediaProbeDAO(db)
+        )
+        dao = service.transcription_dao
+
+        stopped = False
+        while not stopped:
+            batch: List[Write] = []
+            write = self.queue.get()
+            while write is not None:
+                batch.append(write)
+                if len(batch) == MAX_BATCH_SIZE:
+                    break
+                try:
+                    write = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopped = write is None
+
+            if len(batch) == 0:
+                continue
+
+            try:
+                with dao.transaction():
+                    for write in batch:
+                        try:
+                            with dao.transaction():
+                                write.function(service)
+                        except Exception:
+                            logging.exception("Database write failed")
+            except Exception:
+                logging.exception("Failed to commit %s database writes", len(batch))
+                continue
+
+            self.commits += 1
+            self.committed.emit(
+                [write.on_committed for write in batch if write.on_committed is not None]
+            )
+
+    def on_committed(self, callbacks: List[Callable[[], None]]):
+        for callback in callbacks:
+            callback()
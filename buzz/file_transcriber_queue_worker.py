@@ -1,23 +1,29 @@
 import logging
-import multiprocessing
-import queue
-from typing import Optional, Tuple, List, Set
+from typing import Optional, Tuple, List, Set, Dict
 from uuid import UUID
 
-from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import QObject, QThread, Qt, pyqtSignal, pyqtSlot
 
 from buzz.model_loader import ModelType
-from buzz.transcriber.file_transcriber import FileTranscriber
+from buzz.segment_translator import SegmentTranslator
+from buzz.task_coalescer import TaskCoalescer
+from buzz.thread_budget import get_thread_budget
+from buzz.transcriber.file_transcriber import (
+    FileTranscriber,
+    write_task_outputs,
+    move_watched_file,
+)
 from buzz.transcriber.openai_whisper_api_file_transcriber import (
     OpenAIWhisperAPIFileTranscriber,
 )
 from buzz.transcriber.transcriber import FileTranscriptionTask, Segment
 from buzz.transcriber.whisper_cpp_file_transcriber import WhisperCppFileTranscriber
 from buzz.transcriber.whisper_file_transcriber import WhisperFileTranscriber
+from buzz.transcription_scheduler import TaskScheduler
 
 
 class FileTranscriberQueueWorker(QObject):
-    tasks_queue: multiprocessing.Queue
+    tasks_queue: TaskScheduler
     current_task: Optional[FileTranscriptionTask] = None
     current_transcriber: Optional[FileTranscriber] = None
     current_transcriber_thread: Optional[QThread] = None
@@ -27,13 +33,22 @@ class FileTranscriberQueueWorker(QObject):
     task_download_progress = pyqtSignal(FileTranscriptionTask, float)
     task_completed = pyqtSignal(FileTranscriptionTask, list)
     task_error = pyqtSignal(FileTranscriptionTask, str)
+    # Segments of the current task as they are transcribed
+    task_segments = pyqtSignal(FileTranscriptionTask, list)
+    # Translations of completed segments, as (segment index, translation) pairs
+    task_translations = pyqtSignal(FileTranscriptionTask, list)
 
     completed = pyqtSignal()
 
     def __init__(self, parent: Optional[QObject] = None):
         super().__init__(parent)
-        self.tasks_queue = queue.Queue()
+        self.tasks_queue = TaskScheduler()
         self.canceled_tasks: Set[UUID] = set()
+        # Duplicate tasks share the result of a single transcription
+        self.coalescer = TaskCoalescer()
+        # Translators keep running after their transcription completes,
+        # while the next task is already being transcribed
+        self.segment_translators: Dict[UUID, SegmentTranslator] = {}
 
     @pyqtSlot()
     def run(self):
@@ -51,10 +66,22 @@ class FileTranscriberQueueWorker(QObject):
             if self.current_task.uid in self.canceled_tasks:
                 continue
 
+            segments = self.coalescer.get_result(self.current_task)
+            if segments is not None:
+                self.complete_duplicate_task(self.current_task, segments)
+                continue
+
             break
 
         logging.debug("Starting next transcription task")
 
+        # Recorded before the transcription, a watched file is moved away after it
+        self.coalescer.add_file(self.current_task, self.tasks_queue.tasks())
+
+        self.current_task.cpu_threads = get_thread_budget().acquire(
+            self.current_task.uid
+        )
+
         model_type = self.current_task.transcription_options.model.model_type
         if model_type == ModelType.WHISPER_CPP:
             self.current_transcriber = WhisperCppFileTranscriber(task=self.current_task)
@@ -90,9 +117,13 @@ class FileTranscriberQueueWorker(QObject):
             self.on_task_download_progress
         )
         self.current_transcriber.error.connect(self.on_task_error)
+        self.current_transcriber.new_segments.connect(self.on_task_new_segments)
 
         self.current_transcriber.completed.connect(self.on_task_completed)
 
+        if self.current_task.transcription_options.enable_llm_translation:
+            self.start_segment_translator(self.current_task)
+
         # Wait for next item on the queue
         self.current_transcriber.error.connect(self.run)
         self.current_transcriber.completed.connect(self.run)
@@ -100,17 +131,63 @@ class FileTranscriberQueueWorker(QObject):
         self.task_started.emit(self.current_task)
         self.current_transcriber_thread.start()
 
+    def start_segment_translator(self, task: FileTranscriptionTask):
+        translator = SegmentTranslator(transcription_options=task.transcription_options)
+        translator_thread = QThread(self)
+
+        translator.moveToThread(translator_thread)
+
+        translator_thread.started.connect(translator.run)
+        translator.finished.connect(translator_thread.quit)
+        translator.finished.connect(translator.deleteLater)
+        translator_thread.finished.connect(translator_thread.deleteLater)
+
+        translator.translations.connect(
+            lambda translations: self.task_translations.emit(task, translations)
+        )
+        translator.finished.connect(
+            lambda: self.segment_translators.pop(task.uid, None)
+        )
+
+        # The translator thread is busy in its own loop, add_segments
+        # only puts the segments on its queue
+        self.current_transcriber.new_segments.connect(
+            translator.add_segments, Qt.ConnectionType.DirectConnection
+        )
+
+        self.segment_translators[task.uid] = translator
+        translator_thread.start()
+
+    def stop_segment_translator(self, task_id: UUID):
+        translator = self.segment_translators.pop(task_id, None)
+        if translator is not None:
+            translator.stop()
+
     def add_task(self, task: FileTranscriptionTask):
+        # A canceled task can be added again to continue it
+        self.canceled_tasks.discard(task.uid)
         self.tasks_queue.put(task)
 
+    def move_task_to_front(self, task_id: UUID):
+        self.tasks_queue.move_to_front(task_id)
+
+    def set_task_duration(self, task_id: UUID, duration_ms: int):
+        self.tasks_queue.set_duration(task_id, duration_ms)
+
     def cancel_task(self, task_id: UUID):
         self.canceled_tasks.add(task_id)
+        self.stop_segment_translator(task_id)
 
-        if self.current_task.uid == task_id:
+        if self.current_task is not None and self.current_task.uid == task_id:
             if self.current_transcriber is not None:
                 self.current_transcriber.stop()
 
     def on_task_error(self, error: str):
+        if self.current_task is not None:
+            get_thread_budget().release(self.current_task.uid)
+            self.stop_segment_translator(self.current_task.uid)
+            self.coalescer.remove_file(self.current_task)
+
         if (
             self.current_task is not None
             and self.current_task.uid not in self.canceled_tasks
@@ -128,12 +205,41 @@ class FileTranscriberQueueWorker(QObject):
         if self.current_task is not None:
             self.task_download_progress.emit(self.current_task, fraction_downloaded)
 
+    @pyqtSlot(list)
+    def on_task_new_segments(self, segments: List[Segment]):
+        if self.current_task is not None:
+            self.task_segments.emit(self.current_task, segments)
+
     @pyqtSlot(list)
     def on_task_completed(self, segments: List[Segment]):
         if self.current_task is not None:
+            get_thread_budget().release(self.current_task.uid)
+            translator = self.segment_translators.get(self.current_task.uid)
+            if translator is not None:
+                translator.complete(segments)
+
             self.task_completed.emit(self.current_task, segments)
 
+            # Duplicates that were added while the task ran complete with it
+            self.coalescer.add_result(self.current_task, segments)
+            for task in self.tasks_queue.tasks():
+                if task.uid in self.canceled_tasks:
+                    continue
+                duplicate_segments = self.coalescer.get_result(task)
+                if duplicate_segments is not None and self.tasks_queue.remove(task.uid):
+                    self.complete_duplicate_task(task, duplicate_segments)
+
+    def complete_duplicate_task(self, task: FileTranscriptionTask, segments: List[Segment]):
+        """Completes a task with the segments of a completed task with the same media and options"""
+        logging.debug("Completing task %s without transcribing it again", task.uid)
+        self.task_started.emit(task)
+        write_task_outputs(task, segments)
+        move_watched_file(task)
+        self.task_completed.emit(task, segments)
+
     def stop(self):
         self.tasks_queue.put(None)
+        for task_id in list(self.segment_translators.keys()):
+            self.stop_segment_translator(task_id)
         if self.current_transcriber is not None:
             self.current_transcriber.stop()
@@ -0,0 +1,583 @@
+"""
+Local HTTP API for adding transcriptions to the queue of a running Buzz.
+
+    POST   /jobs              Add a job, JSON body with "file_path" or "url" and options
+    POST   /jobs?filename=a.mp3&options={...}
+                              Add a job for the media file in the request body
+    GET    /jobs              Status of all jobs added through the API
+    GET    /jobs/<id>         Status and segments of a job
+    GET    /jobs/<id>/events  Progress, segments and result as server-sent events
+    DELETE /jobs/<id>         Cancel a job
+
+Jobs go through the same queue and database as the tasks added in the app,
+so all clients share its loaded models.
+
+Every request needs the header "Authorization: Bearer <token>", with the token
+the server writes to a file only the user can read when it starts. Requests
+from web pages, which send an Origin or another Host, are rejected.
+"""
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, List, Dict, Tuple
+from urllib.parse import urlparse, parse_qs
+from uuid import UUID
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from buzz.assets import get_cache_path
+from buzz.cli import CommandLineModelType, is_url
+from buzz.model_loader import (
+    ModelType,
+    WhisperModelSize,
+    TranscriptionModel,
+    ModelDownloader,
+)
+from buzz.store.keyring_store import get_password, Key
+from buzz.transcriber.transcriber import (
+    Task,
+    FileTranscriptionTask,
+    FileTranscriptionOptions,
+    TranscriptionOptions,
+    LANGUAGES,
+    OutputFormat,
+    Segment,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+# Sent while a job has no new events, so clients and proxies keep the stream open
+KEEP_ALIVE_SECS = 15.0
+# Largest media file that can be uploaded
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024 * 1024
+UPLOAD_CONTENT_TYPE = "application/octet-stream"
+
+TERMINAL_STATUSES = {
+    FileTranscriptionTask.Status.COMPLETED.value,
+    FileTranscriptionTask.Status.FAILED.value,
+    FileTranscriptionTask.Status.CANCELED.value,
+}
+
+JOB_PATH_REGEX = re.compile(
+    r"^/jobs/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})(/events)?$"
+)
+
+
+def create_task(
+    options: dict, file_path: Optional[str] = None, download_model: bool = False
+) -> FileTranscriptionTask:
+    """
+    Creates the task of a job from its options, raises ValueError if they are
+    invalid. A model that is not on this machine is downloaded if
+    download_model is set.
+    """
+    url = None
+    if file_path is None:
+        source = options.get("file_path") or options.get("url")
+        if not source:
+            raise ValueError("file_path or url is required")
+        if is_url(source):
+            url = source
+        elif os.path.isfile(source):
+            file_path = source
+        else:
+            raise ValueError(f"File not found: {source}")
+
+    try:
+        task = Task(options.get("task", Task.TRANSCRIBE.value))
+        model_type = CommandLineModelType(
+            options.get("model_type", CommandLineModelType.WHISPER.value)
+        )
+        model_size = WhisperModelSize(
+            options.get("model_size", WhisperModelSize.TINY.value)
+        )
+        output_formats = {
+            OutputFormat(output_format)
+            for output_format in options.get("output_formats", [])
+        }
+        priority = int(options.get("priority", 0))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(str(exc))
+
+    hugging_face_model_id = options.get("hfid", "")
+    if hugging_face_model_id == "" and model_type == CommandLineModelType.HUGGING_FACE:
+        raise ValueError("hfid is required when model_type is huggingface")
+
+    language = options.get("language") or None
+    if language is not None and LANGUAGES.get(language) is None:
+        raise ValueError(f"Invalid language: {language}")
+
+    model = TranscriptionModel(
+        model_type=ModelType[model_type.name],
+        whisper_model_size=model_size,
+        hugging_face_model_id=hugging_face_model_id,
+    )
+    model_path = model.get_local_model_path()
+    if model_path is None and download_model:
+        ModelDownloader(model=model).run()
+        model_path = model.get_local_model_path()
+    if model_path is None:
+        raise ValueError(f"Model not downloaded: {model}")
+
+    openai_access_token = options.get("openai_token", "")
+    if model.model_type == ModelType.OPEN_AI_WHISPER_API and openai_access_token == "":
+        openai_access_token = get_password(Key.OPENAI_API_KEY)
+
+    return FileTranscriptionTask(
+        file_path=file_path,
+        url=url,
+        source=FileTranscriptionTask.Source.URL_IMPORT
+        if url is not None
+        else FileTranscriptionTask.Source.FILE_IMPORT,
+        model_path=model_path,
+        transcription_options=TranscriptionOptions(
+            model=model,
+            task=task,
+            language=language,
+            initial_prompt=options.get("initial_prompt", ""),
+            word_level_timings=bool(options.get("word_timestamps", False)),
+            openai_access_token=openai_access_token,
+        ),
+        file_transcription_options=FileTranscriptionOptions(
+            file_paths=[file_path] if file_path is not None else None,
+            url=url,
+            output_formats=output_formats,
+        ),
+        output_directory=options.get("output_directory") or None,
+        priority=priority,
+    )
+
+
+def to_segment_dicts(segments: List[Segment]) -> List[dict]:
+    return [
+        {"start": segment.start, "end": segment.end, "text": segment.text.strip()}
+        for segment in segments
+    ]
+
+
+@dataclass
+class Job:
+    id: UUID
+    file_path: Optional[str] = None
+    url: Optional[str] = None
+    status: str = FileTranscriptionTask.Status.QUEUED.value
+    progress: float = 0.0
+    error: Optional[str] = None
+    segments: List[Segment] = field(default_factory=list)
+    # (event type, data) in the order they happened
+    events: List[Tuple[str, dict]] = field(default_factory=list)
+
+    def to_dict(self, with_segments=False) -> dict:
+        data = {
+            "id": str(self.id),
+            "file_path": self.file_path,
+            "url": self.url,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+        }
+        if with_segments:
+            data["segments"] = to_segment_dicts(self.segments)
+        return data
+
+
+class JobRegistry:
+    """Jobs added through the API, shared between the main thread and the request threads"""
+
+    def __init__(self):
+        self.jobs: Dict[UUID, Job] = {}
+        self.condition = threading.Condition()
+
+    def add(self, job: Job):
+        with self.condition:
+            self.jobs[job.id] = job
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[dict]:
+        with self.condition:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def get_status(self, job_id: UUID) -> Optional[dict]:
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return job.to_dict(with_segments=True) if job is not None else None
+
+    def update(self, job_id: UUID, event: str, data: dict, **changes):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.events.append((event, data))
+            self.condition.notify_all()
+
+    def wait_for_events(
+        self, job_id: UUID, start: int, timeout: float
+    ) -> Tuple[List[Tuple[str, dict]], bool]:
+        """Returns the events of the job after start and whether the job has ended"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: len(self.jobs[job_id].events) > start, timeout=timeout
+            )
+            job = self.jobs[job_id]
+            return job.events[start:], job.status in TERMINAL_STATUSES
+
+
+class JobApiServer(QObject):
+    """
+    Serves the job API from a thread pool. Requests that change the queue or
+    the database are sent to the thread the server lives on with the
+    job_submitted and cancel_requested signals.
+    """
+
+    job_submitted = pyqtSignal(FileTranscriptionTask)
+    cancel_requested = pyqtSignal(object)  # UUID
+
+    def __init__(
+        self,
+        port: int,
+        host: str = DEFAULT_HOST,
+        upload_dir: Optional[str] = None,
+        token_path: Optional[str] = None,
+        max_upload_bytes: int = MAX_UPLOAD_BYTES,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.registry = JobRegistry()
+        self.upload_dir = upload_dir or os.path.join(get_cache_path(), "uploads")
+        self.token_path = token_path or os.path.join(get_cache_path(), "job_api_token")
+        self.token = secrets.token_urlsafe(32)
+        self.max_upload_bytes = max_upload_bytes
+        # Uploaded files by job, deleted once the job has ended
+        self.uploads: Dict[UUID, str] = {}
+        self.uploads_lock = threading.Lock()
+        self.http_server = ThreadingHTTPServer((host, port), JobApiRequestHandler)
+        self.http_server.daemon_threads = True
+        self.http_server.api = self
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.http_server.server_address[1]
+
+    @property
+    def allowed_hosts(self) -> List[str]:
+        return [f"127.0.0.1:{self.port}", f"localhost:{self.port}"]
+
+    def write_token(self):
+        """Writes the token of this session to a file only the user can read"""
+        os.makedirs(os.path.dirname(self.token_path), exist_ok=True)
+        fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode only applies to new files
+        os.chmod(self.token_path, 0o600)
+        with os.fdopen(fd, "w") as file:
+            file.write(self.token)
+
+    def start(self):
+        self.write_token()
+        self.thread = threading.Thread(
+            target=self.http_server.serve_forever, name="job-api", daemon=True
+        )
+        self.thread.start()
+        logging.debug(
+            "Job API listening on port %s, token in %s", self.port, self.token_path
+        )
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        try:
+            os.remove(self.token_path)
+        except OSError:
+            pass
+
+    def submit(self, task: FileTranscriptionTask, uploaded: bool = False) -> Job:
+        job = Job(id=task.uid, file_path=task.file_path, url=task.url)
+        self.registry.add(job)
+        if uploaded:
+            with self.uploads_lock:
+                self.uploads[task.uid] = task.file_path
+        self.job_submitted.emit(task)
+        return job
+
+    def cancel(self, job_id: UUID):
+        self.registry.update(
+            job_id,
+            "canceled",
+            {"id": str(job_id)},
+            status=FileTranscriptionTask.Status.CANCELED.value,
+        )
+        self.cancel_requested.emit(job_id)
+        self.remove_upload(job_id)
+
+    def remove_upload(self, job_id: UUID):
+        with self.uploads_lock:
+            file_path = self.uploads.pop(job_id, None)
+        if file_path is None:
+            return
+        try:
+            os.remove(file_path)
+        except OSError:
+            logging.debug("Job API: could not remove upload %s", file_path)
+
+    def on_task_started(self, task: FileTranscriptionTask):
+        self.registry.update(
+            task.uid,
+            "started",
+            {"id": str(task.uid)},
+            status=FileTranscriptionTask.Status.IN_PROGRESS.value,
+        )
+
+    def on_task_progress(self, task: FileTranscriptionTask, progress: float):
+        self.registry.update(
+            task.uid,
+            "progress",
+            {"id": str(task.uid), "progress": progress},
+            progress=progress,
+        )
+
+    def on_task_segments(self, task: FileTranscriptionTask, segments: List[Segment]):
+        job = self.registry.get(task.uid)
+        if job is None:
+            return
+        self.registry.update(
+            task.uid,
+            "segments",
+            {"id": str(task.uid), "segments": to_segment_dicts(segments)},
+            segments=job.segments + segments,
+        )
+
+    def on_task_completed(self, task: FileTranscriptionTask, segments: List[Segment]):
+        self.registry.update(
+            task.uid,
+            "completed",
+            {"id": str(task.uid), "segments": to_segment_dicts(segments)},
+            status=FileTranscriptionTask.Status.COMPLETED.value,
+            progress=1.0,
+            segments=segments,
+        )
+        self.remove_upload(task.uid)
+
+    def on_task_error(self, task: FileTranscriptionTask, error: str):
+        self.registry.update(
+            task.uid,
+            "failed",
+            {"id": str(task.uid), "error": error},
+            status=FileTranscriptionTask.Status.FAILED.value,
+            error=error,
+        )
+        self.remove_upload(task.uid)
+
+
+class JobApiRequestHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def api(self) -> JobApiServer:
+        return self.server.api
+
+    def log_message(self, format: str, *args):
+        logging.debug("Job API: " + format, *args)
+
+    def is_allowed(self) -> bool:
+        """
+        Checks the token, and rejects requests of web pages, e.g. of a page
+        whose host name resolves to this machine
+        """
+        if self.headers.get("Host") not in self.api.allowed_hosts:
+            self.send_error_json(HTTPStatus.FORBIDDEN, "Host not allowed")
+            return False
+
+        origin = self.headers.get("Origin")
+        if origin is not None and origin not in [
+            f"http://{host}" for host in self.api.allowed_hosts
+        ]:
+            self.send_error_json(HTTPStatus.FORBIDDEN, "Origin not allowed")
+            return False
+
+        authorization = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode(), f"Bearer {self.api.token}".encode()
+        ):
+            self.send_error_json(HTTPStatus.UNAUTHORIZED, "Invalid token")
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.is_allowed():
+            return
+
+        path = urlparse(self.path).path
+        if path == "/jobs":
+            self.send_json(HTTPStatus.OK, {"jobs": self.api.registry.list()})
+            return
+
+        job_id, events = self.parse_job_path(path)
+        if job_id is None:
+            return
+
+        if events:
+            self.stream_events(job_id)
+        else:
+            self.send_json(HTTPStatus.OK, self.api.registry.get_status(job_id))
+
+    def do_POST(self):
+        if not self.is_allowed():
+            return
+
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Not found")
+            return
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in ("application/json", UPLOAD_CONTENT_TYPE):
+            self.send_error_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                f"Content-Type must be application/json or {UPLOAD_CONTENT_TYPE}",
+            )
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+            return
+        if length > self.api.max_upload_bytes:
+            self.send_error_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Uploads are limited to {self.api.max_upload_bytes} bytes",
+            )
+            return
+
+        uploaded = content_type == UPLOAD_CONTENT_TYPE
+        try:
+            if uploaded:
+                task = self.create_upload_task(parse_qs(url.query))
+            else:
+                options = json.loads(self.read_body() or b"{}")
+                if not isinstance(options, dict):
+                    raise ValueError("Expected a JSON object")
+                task = create_task(options)
+        except (ValueError, json.JSONDecodeError) as exc:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+
+        job = self.api.submit(task, uploaded=uploaded)
+        self.send_json(HTTPStatus.CREATED, job.to_dict())
+
+    def do_DELETE(self):
+        if not self.is_allowed():
+            return
+
+        job_id, events = self.parse_job_path(urlparse(self.path).path)
+        if job_id is None:
+            return
+        self.api.cancel(job_id)
+        self.send_json(HTTPStatus.OK, self.api.registry.get_status(job_id))
+
+    def create_upload_task(self, query: Dict[str, List[str]]) -> FileTranscriptionTask:
+        filename = os.path.basename(query.get("filename", [""])[0])
+        if filename == "":
+            raise ValueError("filename is required for uploads")
+        options = json.loads(query.get("options", ["{}"])[0])
+        if not isinstance(options, dict):
+            raise ValueError("Expected a JSON object")
+
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0:
+            raise ValueError("Uploads need a Content-Length above zero")
+
+        os.makedirs(self.api.upload_dir, exist_ok=True)
+        file_path = os.path.join(self.api.upload_dir, f"{uuid.uuid4().hex}_{filename}")
+        self.read_body_to_file(file_path, length)
+        try:
+            return create_task(options, file_path=file_path)
+        except ValueError:
+            os.remove(file_path)
+            raise
+
+    def parse_job_path(self, path: str) -> Tuple[Optional[UUID], bool]:
+        match = JOB_PATH_REGEX.match(path)
+        job_id = UUID(match.group(1)) if match is not None else None
+        if job_id is None or self.api.registry.get(job_id) is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "Job not found")
+            return None, False
+        return job_id, match.group(2) is not None
+
+    def stream_events(self, job_id: UUID):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        sent = 0
+        try:
+            while True:
+                events, ended = self.api.registry.wait_for_events(
+                    job_id, sent, timeout=KEEP_ALIVE_SECS
+                )
+                for event, data in events:
+                    self.wfile.write(
+                        f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode(
+                            "utf-8"
+                        )
+                    )
+                sent += len(events)
+                if len(events) == 0:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                if ended:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            logging.debug("Job API: client stopped listening to job %s", job_id)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+    def read_body_to_file(self, file_path: str, length: int, chunk_size=1024 * 1024):
+        remaining = length
+        try:
+            with open(file_path, "wb") as file:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    file.write(chunk)
+                    remaining -= len(chunk)
+            # A client that disconnects early leaves a truncated file
+            if remaining != 0:
+                raise ValueError(
+                    f"Upload ended after {length - remaining} of {length} bytes"
+                )
+        except BaseException:
+            os.remove(file_path)
+            raise
+
+    def send_json(self, status: HTTPStatus, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: HTTPStatus, message: str):
+        # The body of a rejected request may not have been read
+        self.close_connection = True
+        self.send_json(status, {"error": message})
@@ -0,0 +1,166 @@
+import logging
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple
+from uuid import UUID
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+INPUT_REGEX = re.compile(r"^Input #0, ([^,]+(?:,[^,]+)*), from ", re.MULTILINE)
+DURATION_REGEX = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+AUDIO_STREAM_REGEX = re.compile(r"Stream #\d+:\d+.*?: Audio: (.+)$", re.MULTILINE)
+SAMPLE_RATE_REGEX = re.compile(r"(\d+) Hz")
+CHANNELS_REGEX = re.compile(r"(\d+) channels")
+CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "7.1": 8}
+
+# (absolute path, size, modification time in ns)
+MediaKey = Tuple[str, int, int]
+
+
+@dataclass
+class MediaInfo:
+    duration_ms: Optional[int] = None
+    has_audio: bool = False
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    format_name: Optional[str] = None
+
+
+def get_media_key(file_path: str) -> MediaKey:
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+def probe_media(file_path: str) -> MediaInfo:
+    """Reads the duration and audio stream info from the file header, without decoding it"""
+    # fmt: off
+    cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-i", file_path]
+    # fmt: on
+    # Exits with an error as there is no output file, the input info is still printed
+    result = subprocess.run(cmd, capture_output=True)
+    output = result.stderr.decode("utf-8", errors="replace")
+
+    info = MediaInfo()
+
+    input_match = INPUT_REGEX.search(output)
+    if input_match is None:
+        raise Exception(f"FFMPEG Failed to read media info: {output[-1000:]}")
+    info.format_name = input_match.group(1)
+
+    duration_match = DURATION_REGEX.search(output)
+    if duration_match is not None:
+        hours, minutes, seconds = duration_match.groups()
+        info.duration_ms = int(
+            (int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000
+        )
+
+    audio_match = AUDIO_STREAM_REGEX.search(output)
+    if audio_match is not None:
+        # e.g. "mp3 (mp3float), 44100 Hz, stereo, fltp, 320 kb/s"
+        stream = audio_match.group(1)
+        info.has_audio = True
+        info.audio_codec = stream.split(",")[0].split(" ")[0]
+
+        sample_rate_match = SAMPLE_RATE_REGEX.search(stream)
+        if sample_rate_match is not None:
+            info.sample_rate = int(sample_rate_match.group(1))
+
+        channels_match = CHANNELS_REGEX.search(stream)
+        if channels_match is not None:
+            info.channels = int(channels_match.group(1))
+        else:
+            layouts = [part.strip().split("(")[0] for part in stream.split(",")]
+            info.channels = next(
+                (CHANNEL_LAYOUTS[layout] for layout in layouts if layout in CHANNEL_LAYOUTS),
+                None,
+            )
+
+    return info
+
+
+_cache: Dict[MediaKey, MediaInfo] = {}
+_cache_lock = threading.Lock()
+
+
+def get_media_info(file_path: str) -> MediaInfo:
+    """
+    Returns the media info of the file, probing it only if it has changed since
+    it was last probed in this process. Safe to call from any thread.
+    """
+    key = get_media_key(file_path)
+    with _cache_lock:
+        info = _cache.get(key)
+    if info is not None:
+        return info
+
+    info = probe_media(file_path)
+    set_cached_media_info(key, info)
+    return info
+
+
+def set_cached_media_info(key: MediaKey, info: MediaInfo):
+    with _cache_lock:
+        _cache[key] = info
+
+
+class MediaProbeService(QObject):
+    """
+    Probes the files of queued transcriptions on a small thread pool and stores
+    the results in the database, so a file is only probed again after it
+    changes. Results are handled on the thread the service lives on, which is
+    the thread that owns the database connection.
+    """
+
+    probed = pyqtSignal(object, object)  # (UUID, MediaInfo)
+    _probe_finished = pyqtSignal(object, tuple, object)  # (UUID, MediaKey, MediaInfo)
+
+    def __init__(self, transcription_service, max_workers: int = 2, parent=None):
+        super().__init__(parent)
+        self.transcription_service = transcription_service
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="media-probe"
+        )
+        self._probe_finished.connect(self.on_probe_finished)
+
+    def probe(self, transcription_id: UUID, file_path: str):
+        try:
+            key = get_media_key(file_path)
+        except OSError as exc:
+            logging.debug("Failed to read file for media probe: %s", exc)
+            return
+
+        info = self.transcription_service.get_media_info(*key)
+        if info is not None:
+            set_cached_media_info(key, info)
+            self.on_probe_finished(transcription_id, key, info, store=False)
+            return
+
+        self.executor.submit(self.run_probe, transcription_id, key)
+
+    def run_probe(self, transcription_id: UUID, key: MediaKey):
+        try:
+            info = probe_media(key[0])
+        except Exception as exc:
+            logging.debug("Failed to probe %s: %s", key[0], exc)
+            return
+        set_cached_media_info(key, info)
+        self._probe_finished.emit(transcription_id, key, info)
+
+    def on_probe_finished(
+        self, transcription_id: UUID, key: MediaKey, info: MediaInfo, store=True
+    ):
+        if store:
+            self.transcription_service.save_media_info(*key, info)
+        if info.duration_ms is not None:
+            self.transcription_service.update_transcription_duration(
+                transcription_id, info.duration_ms
+            )
+        self.probed.emit(transcription_id, info)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
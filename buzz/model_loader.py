@@ -11,7 +11,6 @@ import tempfile
 import warnings
 import platform
 import requests
-import whisper
 import huggingface_hub
 import zipfile
 from dataclasses import dataclass
@@ -278,6 +277,9 @@ def get_whisper_file_path(size: WhisperModelSize) -> str:
     if size == WhisperModelSize.CUSTOM:
         return os.path.join(root_dir, "custom")
 
+    # Imported here as importing whisper loads torch, which takes seconds
+    import whisper
+
     url = whisper._MODELS[size.value]
     return os.path.join(root_dir, os.path.basename(url))
 
@@ -494,6 +496,8 @@ class ModelDownloader(QRunnable):
             return
 
         if self.model.model_type == ModelType.WHISPER:
+            import whisper
+
             url = whisper._MODELS[self.model.whisper_model_size.value]
             file_path = get_whisper_file_path(size=self.model.whisper_model_size)
             expected_sha256 = url.split("/")[-2]
@@ -1,9 +1,9 @@
 import os
+import re
+import math
+import asyncio
 import logging
 import queue
-import requests
-import json
-import time
 
 from typing import Optional, Dict, Any, List
 from PyQt6.QtCore import QObject, pyqtSignal
@@ -11,14 +11,97 @@ from PyQt6.QtCore import QObject, pyqtSignal
 #from buzz.settings.settings import Settings
 from buzz.store.keyring_store import get_password, Key
 from buzz.transcriber.transcriber import TranscriptionOptions
+from buzz.translation_client import (
+  OllamaTranslationClient,
+  OLLAMA_BASE_URL,
+  OLLAMA_MODEL,
+  OLLAMA_KEEP_ALIVE,
+)
 from buzz.widgets.transcriber.advanced_settings_dialog import AdvancedSettingsDialog
 
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+THINK_TAGS_REGEX = re.compile(r'<think>.*?</think>', flags=re.DOTALL)
+# Also handle the case with backslash in closing tag
+THINK_TAGS_BACKSLASH_REGEX = re.compile(r'<think>.*?<\\think>', flags=re.DOTALL)
+
+SUMMARY_PROMPT = (
+  "Summarize the following conversation between a user and a translator in a few sentences. "
+  "Keep names, terms and how they were translated, so the translation can stay consistent. "
+  "Reply with the summary only."
+)
+
+
+def estimate_tokens(text: str) -> int:
+  """Rough token count: about four ASCII characters per token, one token per other character"""
+  ascii_chars = sum(1 for char in text if ord(char) < 128)
+  return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+class ConversationHistory:
+  """
+  Conversation history bounded by an approximate token budget.
+
+  Exchanges are only appended until the budget (or the exchange limit) is exceeded,
+  then the oldest exchanges are dropped down to a low watermark in a single step.
+  Between two compactions every request starts with the same messages, so Ollama
+  can reuse the KV cache for that prefix instead of evaluating the whole prompt again.
+  """
+
+  def __init__(self, token_budget: int, max_exchanges: int, low_watermark: float = 0.5):
+    self.token_budget = token_budget
+    self.max_exchanges = max_exchanges
+    self.low_watermark = low_watermark
+    self.messages: List[Dict[str, str]] = []
+    self.summary = ""
+
+  def __len__(self):
+    return len(self.messages)
+
+  def __bool__(self):
+    return len(self.messages) > 0 or self.summary != ""
+
+  def tokens(self) -> int:
+    return estimate_tokens(self.summary) + sum(
+      estimate_tokens(message["content"]) for message in self.messages
+    )
+
+  def reset(self):
+    self.messages = []
+    self.summary = ""
+
+  def build_messages(self, system_prompt: str, transcript: str) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": system_prompt}]
+    if self.summary:
+      messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+    messages.extend(self.messages)
+    messages.append({"role": "user", "content": transcript})
+    return messages
+
+  def add_exchange(self, transcript: str, translation: str) -> List[Dict[str, str]]:
+    """Appends an exchange and returns the messages dropped to stay within the budget"""
+    self.messages.append({"role": "user", "content": transcript})
+    self.messages.append({"role": "assistant", "content": translation})
+
+    if self.tokens() <= self.token_budget and len(self.messages) <= self.max_exchanges * 2:
+      return []
+
+    target_tokens = int(self.token_budget * self.low_watermark)
+    target_messages = int(self.max_exchanges * self.low_watermark) * 2
+
+    dropped = []
+    while self.messages and (self.tokens() > target_tokens or len(self.messages) > target_messages):
+      dropped.extend(self.messages[:2])
+      del self.messages[:2]
+    return dropped
+
+
 class OllamaTranslator(QObject):
   translation = pyqtSignal(str, int)
+  # Text received so far for a translation that is still streaming
+  partial_translation = pyqtSignal(str, int)
   finished = pyqtSignal()
   is_running = False
 
@@ -27,6 +110,7 @@ class OllamaTranslator(QObject):
     transcription_options: TranscriptionOptions,
     advanced_settings_dialog: AdvancedSettingsDialog,
     parent: Optional[QObject] = None,
+    client: Optional[OllamaTranslationClient] = None,
   ) -> None:
     super().__init__(parent)
 
@@ -41,130 +125,180 @@ class OllamaTranslator(QObject):
     self.queue = queue.Queue()
     
     # Initialize conversation history
-    self.message_history = []
     self.max_history_length = int(os.getenv(
       "OLLAMA_HISTORY_LENGTH",
       "50"
     ))
+    self.history_token_budget = int(os.getenv(
+      "OLLAMA_HISTORY_TOKEN_BUDGET",
+      "2048"
+    ))
+    self.summarize_history = os.getenv(
+      "OLLAMA_SUMMARIZE_HISTORY",
+      "false"
+    ).lower() in {"1", "true", "yes"}
+    self.message_history = ConversationHistory(
+      token_budget=self.history_token_budget,
+      max_exchanges=self.max_history_length,
+    )
     self.conversation_timeout = int(os.getenv(
       "OLLAMA_CONVERSATION_TIMEOUT",
       "20"
     ))
+    # How long Ollama keeps the model loaded after the last request
+    self.keep_alive = os.getenv(
+      "OLLAMA_KEEP_ALIVE",
+      OLLAMA_KEEP_ALIVE
+    )
 
     #settings = Settings()
     # Get Ollama API URL from settings or environment
     self.ollama_api_url = os.getenv(
       "OLLAMA_BASE_URL",
-      "http://localhost:11434"
+      OLLAMA_BASE_URL
     )
     # Get Ollama model name from settings or environment
     self.ollama_model = os.getenv(
       "OLLAMA_MODEL",
-      "llama3.1:8b"  # Default model name in Ollama
+      OLLAMA_MODEL  # Default model name in Ollama
     )
     
-    logging.debug(f"OllamaTranslator using API URL: {self.ollama_api_url} and model: {self.ollama_model}, history length: {self.max_history_length}, conversation timeout: {self.conversation_timeout}")
+    logging.debug(f"OllamaTranslator using API URL: {self.ollama_api_url} and model: {self.ollama_model}, history length: {self.max_history_length}, history token budget: {self.history_token_budget}, conversation timeout: {self.conversation_timeout}, keep alive: {self.keep_alive}")
     
-    # Verify Ollama connection
-    try:
-      check_response = requests.get(f"{self.ollama_api_url}")
-      logging.debug(f"Ollama server status check: {check_response.status_code}")
-      self.is_available = check_response.status_code == 200
-    except Exception as e:
-      logging.error(f"Failed to connect to Ollama server: {str(e)}")
-      self.is_available = False
+    # Check the Ollama server in the background, so building the widget does not block on it.
+    # The model is not loaded here, translators are also built for transcripts that are
+    # never translated. The widgets that translate live load it with warm_up_translation_model()
+    # and pass its client, so the model is only requested once.
+    self.client = client or OllamaTranslationClient(base_url=self.ollama_api_url)
+    self.client.start_health_probe()
+
+  @property
+  def is_available(self) -> bool:
+    # Unknown until the first health probe finishes, try the request in that case
+    return self.client.is_available is not False
 
   def start(self):
     logging.debug("Starting Ollama translation queue")
 
     self.is_running = True
-    last_activity_time = time.time()
+    loop = asyncio.new_event_loop()
 
     while self.is_running:
       try:
-        transcript, transcript_id = self.queue.get(timeout=1)
+        # Wait up to the inactivity timeout instead of polling
+        item = self.queue.get(timeout=self.conversation_timeout)
       except queue.Empty:
-        # Check if we should reset conversation due to inactivity
-        if time.time() - last_activity_time > self.conversation_timeout and self.message_history:
+        # Reset conversation due to inactivity
+        if self.message_history:
           logging.debug(f"Resetting conversation history due to {self.conversation_timeout}s of inactivity")
-          self.message_history = []
+          self.message_history.reset()
+          # Reload the model if Ollama evicted it while idle, e.g. for another model
+          self.client.start_warm_up(self.ollama_model, keep_alive=self.keep_alive)
         continue
 
-      # Update activity time
-      last_activity_time = time.time()
+      # stop() puts None on the queue to wake up the loop
+      if item is None:
+        break
+
+      transcript, transcript_id = item
+      dropped_messages = []
 
       # Check if Ollama is available
       if not self.is_available:
         logging.warning("Ollama server is not available. Skipping translation.")
         next_translation = transcript  # Use original text as fallback
+        # Check again in the background, the server may have come back
+        self.client.start_health_probe()
       else:
         try:
-          # Prepare the API endpoint URL for chat
-          api_url = f"{self.ollama_api_url}/api/chat"
-          
-          # Build messages array with history
-          messages = [
-            {"role": "system", "content": self.transcription_options.llm_prompt}
-          ]
-          
-          # Add conversation history
-          messages.extend(self.message_history)
-          
-          # Add current user message
-          messages.append({"role": "user", "content": transcript})
-          
-          # Prepare request data
-          data = {
-            "model": self.ollama_model,
-            "messages": messages,
-            "stream": False
-          }
-          
-          logging.debug(f"Sending request to Ollama API: {api_url}, history length: {len(self.message_history)}, total messages: {len(messages)}, last message: {messages[-1]['content']}")
-          # Log out all messages content
-          # for item in messages:
-          #   logging.debug(f"Sending message content: {item['content']}")
-
-          
-          # Make the API request
-          response = requests.post(api_url, json=data)
-          
-          if response.status_code == 200:
-            result = response.json()
-            logging.debug(f"Received translation response: {result}")
-            
-            if "message" in result and "content" in result["message"]:
-              next_translation = result["message"]["content"]
-              
-              # Remove <think> tags and their content if present
-              import re
-              next_translation = re.sub(r'<think>.*?</think>', '', next_translation, flags=re.DOTALL)
-              # Also handle the case with backslash in closing tag
-              next_translation = re.sub(r'<think>.*?<\\think>', '', next_translation, flags=re.DOTALL)
-              # Strip any leading/trailing whitespace
-              next_translation = next_translation.strip()
-              
-              # Add the exchange to history
-              self.message_history.append({"role": "user", "content": transcript})
-              self.message_history.append({"role": "assistant", "content": next_translation})
-              
-              # Trim history if it gets too long (keep most recent exchanges)
-              if len(self.message_history) > self.max_history_length * 2:  # *2 because each exchange is 2 messages
-                self.message_history = self.message_history[-self.max_history_length * 2:]
-                #logging.debug(f"Trimmed conversation history to {len(self.message_history)} messages")
-            else:
-              logging.error(f"Unexpected response format: {result}")
-              next_translation = transcript  # Use original text as fallback
-          else:
-            logging.error(f"Ollama API error: {response.status_code} - {response.text}")
-            next_translation = transcript  # Use original text as fallback
-            
+          # Build messages array with system prompt, history and the current user message
+          messages = self.message_history.build_messages(
+            self.transcription_options.llm_prompt, transcript
+          )
+
+          logging.debug(f"Sending request to Ollama API: {self.ollama_api_url}, history length: {len(self.message_history)}, history tokens: {self.message_history.tokens()}, total messages: {len(messages)}, last message: {messages[-1]['content']}")
+
+          response = loop.run_until_complete(
+            self.client.chat(
+              model=self.ollama_model,
+              messages=messages,
+              on_partial=lambda text: self.partial_translation.emit(text, transcript_id),
+              keep_alive=self.keep_alive,
+            )
+          )
+          logging.debug(f"Received translation response: {response.content}")
+          self.log_response_metrics(response.metrics)
+
+          next_translation = self.strip_think_tags(response.content)
+
+          # Add the exchange to history, older exchanges are dropped once over the token budget
+          dropped_messages = self.message_history.add_exchange(transcript, next_translation)
+          if dropped_messages:
+            logging.debug(f"Compacted conversation history, dropped {len(dropped_messages)} messages, {len(self.message_history)} remaining")
+
         except Exception as e:
           logging.error(f"Error during Ollama translation: {e}")
           next_translation = transcript  # Use original text as fallback
 
       self.translation.emit(next_translation, transcript_id)
 
+      # Summarize after emitting so the translation is not delayed by the extra request
+      if dropped_messages and self.summarize_history:
+        loop.run_until_complete(self.summarize_dropped_messages(dropped_messages))
+
+    loop.run_until_complete(self.client.aclose())
+    loop.close()
+
+    self.finished.emit()
+
+  @staticmethod
+  def strip_think_tags(text: str) -> str:
+    # Remove <think> tags and their content if present
+    text = THINK_TAGS_REGEX.sub('', text)
+    text = THINK_TAGS_BACKSLASH_REGEX.sub('', text)
+    # Strip any leading/trailing whitespace
+    return text.strip()
+
+  @staticmethod
+  def log_response_metrics(result: Dict[str, Any]):
+    # Ollama reports durations in nanoseconds. With a reused KV cache,
+    # prompt_eval_count only counts the tokens that had to be evaluated.
+    def to_ms(key: str) -> float:
+      return result.get(key, 0) / 1_000_000
+
+    logging.debug(
+      "Ollama translation metrics: prompt tokens = %s (%.0f ms), generated tokens = %s (%.0f ms), load = %.0f ms, total = %.0f ms, first token = %.0f ms",
+      result.get("prompt_eval_count", 0),
+      to_ms("prompt_eval_duration"),
+      result.get("eval_count", 0),
+      to_ms("eval_duration"),
+      to_ms("load_duration"),
+      to_ms("total_duration"),
+      (result.get("first_token_latency") or 0) * 1000,
+    )
+
+  async def summarize_dropped_messages(self, dropped_messages: List[Dict[str, str]]):
+    conversation = "\n".join(
+      f"{message['role']}: {message['content']}" for message in dropped_messages
+    )
+    if self.message_history.summary:
+      conversation = f"Earlier summary: {self.message_history.summary}\n{conversation}"
+
+    messages = [
+      {"role": "system", "content": SUMMARY_PROMPT},
+      {"role": "user", "content": conversation},
+    ]
+
+    try:
+      response = await self.client.chat(
+        model=self.ollama_model, messages=messages, keep_alive=self.keep_alive
+      )
+      self.log_response_metrics(response.metrics)
+      self.message_history.summary = self.strip_think_tags(response.content)
+      logging.debug(f"Summarized dropped history: {self.message_history.summary[:100]}...")
+    except Exception as e:
+      logging.error(f"Error summarizing Ollama conversation history: {e}")
+
   def on_transcription_options_changed(
     self, transcription_options: TranscriptionOptions
   ):
@@ -178,3 +312,4 @@ class OllamaTranslator(QObject):
   def stop(self):
     logging.debug("Stopping Ollama translation queue")
     self.is_running = False
+    self.queue.put(None)
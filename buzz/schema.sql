@@ -15,8 +15,14 @@ CREATE TABLE transcription (
     time_started TIMESTAMP,
     url TEXT,
     whisper_model_size TEXT,
-    hugging_face_model_id TEXT
+    hugging_face_model_id TEXT,
+    duration_ms INT,
+    priority INT DEFAULT 0,
+    transcription_options TEXT
 );
+-- The tasks table lists the newest transcriptions first, a page at a time
+CREATE INDEX idx_transcription_time_queued ON transcription(time_queued);
+CREATE INDEX idx_transcription_status ON transcription(status);
 
 CREATE TABLE transcription_segment (
     id INTEGER PRIMARY KEY,
@@ -25,6 +31,43 @@ CREATE TABLE transcription_segment (
     text TEXT NOT NULL,
     translation TEXT DEFAULT '',
     transcription_id TEXT,
+    -- Packed word-level timings of the sentence
+    words BLOB,
     FOREIGN KEY (transcription_id) REFERENCES transcription(id) ON DELETE CASCADE
 );
 CREATE INDEX idx_transcription_id ON transcription_segment(transcription_id);
+
+-- Full-text index of the segments, kept up to date by the triggers below
+CREATE VIRTUAL TABLE transcription_segment_fts USING fts5(
+    text,
+    translation,
+    content='transcription_segment',
+    content_rowid='id'
+);
+CREATE TRIGGER transcription_segment_fts_insert AFTER INSERT ON transcription_segment BEGIN
+    INSERT INTO transcription_segment_fts(rowid, text, translation)
+    VALUES (new.id, new.text, new.translation);
+END;
+CREATE TRIGGER transcription_segment_fts_delete AFTER DELETE ON transcription_segment BEGIN
+    INSERT INTO transcription_segment_fts(transcription_segment_fts, rowid, text, translation)
+    VALUES ('delete', old.id, old.text, old.translation);
+END;
+CREATE TRIGGER transcription_segment_fts_update AFTER UPDATE OF text, translation ON transcription_segment BEGIN
+    INSERT INTO transcription_segment_fts(transcription_segment_fts, rowid, text, translation)
+    VALUES ('delete', old.id, old.text, old.translation);
+    INSERT INTO transcription_segment_fts(rowid, text, translation)
+    VALUES (new.id, new.text, new.translation);
+END;
+
+CREATE TABLE media_probe (
+    path TEXT PRIMARY KEY,
+    size INT NOT NULL,
+    mtime INT NOT NULL,
+    duration_ms INT,
+    has_audio BOOLEAN NOT NULL DEFAULT 0,
+    audio_codec TEXT,
+    sample_rate INT,
+    channels INT,
+    format_name TEXT,
+    time_probed TIMESTAMP
+);
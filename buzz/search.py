@@ -0,0 +1,120 @@
+"""
+Searches the transcripts in the app's database: `python -m buzz search <words>`
+
+Prints one matching segment per line, newest first, with the ID of its
+transcription and its start time, or JSON lines with --json. Exits with 1 if
+nothing matches.
+
+The database is opened read-only and is not migrated, so searching does not
+change it while the app is transcribing.
+"""
+import argparse
+import os
+import sys
+import typing
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from buzz.batch import print_event, EXIT_OK, EXIT_FAILED, EXIT_USAGE
+from buzz.db.dao.transcription_dao import TranscriptionDAO
+from buzz.db.dao.transcription_segment_dao import TranscriptionSegmentDAO
+from buzz.db.db import get_app_db_path, open_connection
+from buzz.db.entity.segment_search_result import SegmentSearchResult
+from buzz.db.service.transcription_service import (
+    TranscriptionService,
+    DEFAULT_SEARCH_LIMIT,
+)
+from buzz.transcriber.file_transcriber import to_timestamp
+
+CONNECTION_NAME = "search"
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="buzz search",
+        description="Search the text and translations of all transcripts. "
+        "Matches segments with all the words, the last word as a prefix.",
+    )
+    parser.add_argument("words", nargs="+", help="Words to search for.")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_SEARCH_LIMIT,
+        help=f"Most segments to print. Default: {DEFAULT_SEARCH_LIMIT}.",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the segments as JSON lines.",
+    )
+    return parser
+
+
+def format_result(result: SegmentSearchResult) -> str:
+    name = result.url if result.url != "" else os.path.basename(result.file)
+    text = result.text.strip()
+    if result.translation.strip() != "":
+        text += f" / {result.translation.strip()}"
+    return (
+        f"{result.transcription_id}  {to_timestamp(result.start_time)}  {name}: {text}"
+    )
+
+
+def has_search_index(db: QSqlDatabase) -> bool:
+    query = QSqlQuery(db)
+    query.prepare("SELECT 1 FROM sqlite_master WHERE name = 'transcription_segment_fts'")
+    return query.exec() and query.next()
+
+
+def search(db: QSqlDatabase, args: argparse.Namespace) -> int:
+    if not has_search_index(db):
+        print(
+            "Error: The database has no search index yet, open Buzz once to update it.",
+            file=sys.stderr,
+        )
+        return EXIT_FAILED
+
+    service = TranscriptionService(TranscriptionDAO(db), TranscriptionSegmentDAO(db))
+    results = service.search_segments(" ".join(args.words), limit=args.limit)
+
+    for result in results:
+        if args.json:
+            print_event(
+                {
+                    "transcription_id": result.transcription_id,
+                    "segment_id": result.id,
+                    "start": result.start_time,
+                    "end": result.end_time,
+                    "text": result.text,
+                    "translation": result.translation,
+                    "file": result.file,
+                    "url": result.url,
+                }
+            )
+        else:
+            print(format_result(result))
+
+    return EXIT_OK if len(results) > 0 else EXIT_FAILED
+
+
+def main(argv: typing.List[str]) -> int:
+    args = create_parser().parse_args(argv)
+    if args.limit < 1:
+        print("Error: Invalid value for --limit option.", file=sys.stderr)
+        return EXIT_USAGE
+
+    path = get_app_db_path()
+    if not os.path.exists(path):
+        print("Error: No transcripts yet.", file=sys.stderr)
+        return EXIT_FAILED
+
+    # The database connection needs an application, but not the widgets
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+    db = open_connection(path, CONNECTION_NAME, read_only=True)
+    try:
+        return search(db, args)
+    finally:
+        db.close()
+        del db
+        QSqlDatabase.removeDatabase(CONNECTION_NAME)
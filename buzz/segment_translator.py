@@ -0,0 +1,184 @@
+import os
+import asyncio
+import logging
+import queue
+import threading
+from typing import Optional, List, Dict, Tuple, Set
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from dotenv import load_dotenv
+
+from buzz.settings.settings import Settings
+from buzz.store.keyring_store import get_password, Key
+from buzz.transcriber.transcriber import TranscriptionOptions, Segment
+from buzz.translation_client import (
+    TranslationClient,
+    OllamaTranslationClient,
+    OpenAICompatibleTranslationClient,
+    OLLAMA_BASE_URL,
+    OLLAMA_MODEL,
+    OLLAMA_KEEP_ALIVE,
+)
+from buzz.ollama_translator import OllamaTranslator
+
+load_dotenv()
+
+SegmentKey = Tuple[int, int, str]
+
+
+def segment_key(segment: Segment) -> SegmentKey:
+    return segment.start, segment.end, segment.text.strip()
+
+
+class SegmentTranslator(QObject):
+    """
+    Translates the segments of a file transcription while the transcriber is
+    still running, so the translation is ready shortly after the transcription.
+
+    Segments are added with add_segments() as the transcriber produces them.
+    When the transcription completes, complete() fills in the translations that
+    are already done; the remaining ones are translated afterwards and emitted
+    in batches of (segment index, translation) pairs.
+    """
+
+    translations = pyqtSignal(list)  # List[Tuple[int, str]]
+    finished = pyqtSignal()
+
+    def __init__(
+        self,
+        transcription_options: TranscriptionOptions,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+
+        self.transcription_options = transcription_options
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.translated: Dict[SegmentKey, str] = {}
+        self.pending: Set[SegmentKey] = set()
+
+        self.concurrency = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+        self.batch_size = int(os.getenv("TRANSLATION_BATCH_SIZE", "20"))
+
+        self.translation_provider = os.getenv("TRANSLATION_PROVIDER", "OLLAMA")
+        self.client, self.model, self.options = self.create_client(
+            self.translation_provider, transcription_options
+        )
+
+    @staticmethod
+    def create_client(
+        translation_provider: str, transcription_options: TranscriptionOptions
+    ) -> Tuple[TranslationClient, str, dict]:
+        if translation_provider == "OLLAMA":
+            client = OllamaTranslationClient(
+                base_url=os.getenv("OLLAMA_BASE_URL", OLLAMA_BASE_URL)
+            )
+            model = os.getenv("OLLAMA_MODEL", OLLAMA_MODEL)
+            return client, model, {"keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", OLLAMA_KEEP_ALIVE)}
+
+        settings = Settings()
+        client = OpenAICompatibleTranslationClient(
+            base_url=settings.value(
+                key=Settings.Key.CUSTOM_OPENAI_BASE_URL, default_value=""
+            ),
+            api_key=get_password(Key.OPENAI_API_KEY),
+        )
+        return client, transcription_options.llm_model, {}
+
+    def add_segments(self, segments: List[Segment]):
+        """Queues segments emitted by the transcriber while it is running"""
+        self.queue.put(("segments", segments))
+
+    def complete(self, segments: List[Segment]):
+        """
+        Sets the translations that are already done on the final segments and
+        queues the rest, which are then emitted with the translations signal
+        """
+        with self.lock:
+            for segment in segments:
+                translation = self.translated.get(segment_key(segment))
+                if translation is not None:
+                    segment.translation = translation
+        self.queue.put(("complete", segments))
+
+    def stop(self):
+        self.queue.put(None)
+
+    def run(self):
+        logging.debug("Starting segment translation")
+        # Load the model while the transcriber is still loading its own
+        self.client.start_warm_up(self.model, **self.options)
+
+        loop = asyncio.new_event_loop()
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            kind, segments = item
+            if kind == "segments":
+                loop.run_until_complete(self.translate_segments(segments))
+                continue
+
+            loop.run_until_complete(self.translate_remaining(segments))
+            break
+
+        loop.run_until_complete(self.client.aclose())
+        loop.close()
+
+        logging.debug("Segment translation finished")
+        self.finished.emit()
+
+    async def translate_segments(self, segments: List[Segment]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate(segment: Segment):
+            key = segment_key(segment)
+            with self.lock:
+                if key in self.translated or key in self.pending or not key[2]:
+                    return
+                self.pending.add(key)
+
+            async with semaphore:
+                translation = await self.translate(key[2])
+
+            with self.lock:
+                # Failed translations are not stored, so they are retried on completion
+                if translation:
+                    self.translated[key] = translation
+                self.pending.discard(key)
+
+        await asyncio.gather(*[translate(segment) for segment in segments])
+
+    async def translate_remaining(self, segments: List[Segment]):
+        remaining = [
+            (index, segment)
+            for index, segment in enumerate(segments)
+            if segment.translation == ""
+        ]
+
+        for start in range(0, len(remaining), self.batch_size):
+            batch = remaining[start:start + self.batch_size]
+            await self.translate_segments([segment for _, segment in batch])
+
+            with self.lock:
+                translations = [
+                    (index, self.translated.get(segment_key(segment), ""))
+                    for index, segment in batch
+                ]
+            self.translations.emit(translations)
+
+    async def translate(self, text: str) -> str:
+        try:
+            response = await self.client.chat(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.transcription_options.llm_prompt},
+                    {"role": "user", "content": text},
+                ],
+                **self.options,
+            )
+            return OllamaTranslator.strip_think_tags(response.content)
+        except Exception as exc:
+            logging.error(f"Error during segment translation: {exc}")
+            return ""
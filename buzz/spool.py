@@ -0,0 +1,491 @@
+"""
+Headless workers that share a spool directory: `python -m buzz spool ...`
+
+Jobs are JSON files that move between the directories of the spool:
+
+    incoming/  jobs waiting for a worker, taken in the order they were submitted
+    claimed/   jobs a worker is transcribing
+    done/      jobs with their segments, output files and metrics
+    failed/    jobs with their error and metrics
+
+A worker claims a job by renaming it from incoming/ to claimed/, which only one
+worker can do. While it transcribes, it touches the claimed file every third of
+the lease. A claimed file that has not been touched for a whole lease belongs
+to a worker that died, and any worker puts it back in incoming/, or in failed/
+once it has been attempted max-attempts times. If that worker dies as well,
+the job it was putting back is returned to incoming/ a lease later.
+
+The spool can be on a volume shared by several hosts, e.g. over NFS, as long as
+their clocks differ by much less than the lease. A job may be transcribed
+twice if a worker loses its lease while it is still running, never zero times.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import typing
+import uuid
+
+from buzz.batch import (
+    add_transcription_arguments,
+    expand_inputs,
+    get_output_formats,
+    parse_enum,
+    print_event,
+    transcribe_and_write,
+    EXIT_OK,
+    EXIT_USAGE,
+    EXIT_INTERRUPTED,
+)
+from buzz.cli import CommandLineError, CommandLineModelType
+from buzz.model_loader import WhisperModelSize
+from buzz import thread_budget
+from buzz.transcriber.checkpoint import write_json
+from buzz.transcriber.transcriber import Task, LANGUAGES
+
+INCOMING = "incoming"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_LEASE_SECS = 60.0
+DEFAULT_POLL_SECS = 2.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Claimed jobs are renamed to <id>.json.reclaim-<random> while a worker
+# requeues or fails them
+RECLAIM_SUFFIX = ".reclaim-"
+
+
+def get_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Spool:
+    def __init__(
+        self,
+        directory: str,
+        lease_secs: float = DEFAULT_LEASE_SECS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        clock: typing.Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.lease_secs = lease_secs
+        self.max_attempts = max_attempts
+        self.clock = clock
+        for name in (INCOMING, CLAIMED, DONE, FAILED):
+            os.makedirs(self.path(name), exist_ok=True)
+
+    def path(self, name: str, job_id: typing.Optional[str] = None) -> str:
+        if job_id is None:
+            return os.path.join(self.directory, name)
+        return os.path.join(self.directory, name, f"{job_id}.json")
+
+    def list(self, name: str) -> typing.List[str]:
+        """Returns the IDs of the jobs in a directory of the spool, oldest first"""
+        return sorted(
+            file_name[: -len(".json")]
+            for file_name in os.listdir(self.path(name))
+            if file_name.endswith(".json")
+        )
+
+    def read(self, name: str, job_id: str) -> typing.Optional[dict]:
+        try:
+            with open(self.path(name, job_id)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def submit(self, file_path: str, options: dict) -> str:
+        # IDs start with the time, so incoming jobs sort in submission order
+        job_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        job = {
+            "id": job_id,
+            "file_path": os.path.abspath(file_path),
+            "options": options,
+            "submitted_at": self.clock(),
+            "attempts": 0,
+        }
+        # Written outside incoming/, so workers never see a partial job
+        temp_path = os.path.join(self.directory, f".{job_id}.json")
+        write_json(temp_path, job)
+        os.replace(temp_path, self.path(INCOMING, job_id))
+        return job_id
+
+    def claim(self) -> typing.Optional[dict]:
+        """Claims the oldest incoming job, or returns None if there are none"""
+        for job_id in self.list(INCOMING):
+            try:
+                os.rename(self.path(INCOMING, job_id), self.path(CLAIMED, job_id))
+            except FileNotFoundError:
+                # Claimed by another worker
+                continue
+
+            # Renaming keeps the modification time of the incoming file
+            if not self.heartbeat(job_id):
+                continue
+
+            job = self.read(CLAIMED, job_id)
+            if job is not None:
+                return job
+        return None
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Renews the lease of a claimed job, returns False if it has been lost"""
+        now = self.clock()
+        try:
+            os.utime(self.path(CLAIMED, job_id), (now, now))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, job_id: str):
+        """Returns a claimed job to incoming/, e.g. when its worker is stopped"""
+        try:
+            os.rename(self.path(CLAIMED, job_id), self.path(INCOMING, job_id))
+        except FileNotFoundError:
+            pass
+
+    def finish(self, job: dict, result: dict) -> bool:
+        """
+        Moves a claimed job to done/ or failed/ with its result. Returns False
+        if the lease of the job has been lost, and then drops the result.
+        """
+        job_id = job["id"]
+        if not self.heartbeat(job_id):
+            return False
+
+        name = DONE if result.get("status") == "completed" else FAILED
+        write_json(self.path(name, job_id), {**job, **result})
+        try:
+            os.remove(self.path(CLAIMED, job_id))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def reclaim_expired(self) -> typing.List[str]:
+        """Returns the jobs of dead workers to incoming/ and returns their IDs"""
+        now = self.clock()
+        expires_before = now - self.lease_secs
+        reclaimed = self.sweep_reclaims(expires_before)
+        for job_id in self.list(CLAIMED):
+            path = self.path(CLAIMED, job_id)
+            try:
+                if os.stat(path).st_mtime >= expires_before:
+                    continue
+                # Only one worker can rename it, the others skip the job
+                reclaim_path = f"{path}{RECLAIM_SUFFIX}{uuid.uuid4().hex[:8]}"
+                os.rename(path, reclaim_path)
+                # Renaming keeps the expired modification time, which would
+                # let other workers sweep the job while it is reclaimed
+                os.utime(reclaim_path, (now, now))
+                with open(reclaim_path) as file:
+                    job = json.load(file)
+            except FileNotFoundError:
+                continue
+            job["attempts"] = job.get("attempts", 0) + 1
+
+            if job["attempts"] >= self.max_attempts:
+                logging.debug("Lease of spool job %s expired, giving up", job_id)
+                write_json(
+                    self.path(FAILED, job_id),
+                    {
+                        **job,
+                        "status": "failed",
+                        "error": f"Lease expired {job['attempts']} times",
+                    },
+                )
+            else:
+                logging.debug("Lease of spool job %s expired, requeueing", job_id)
+                write_json(reclaim_path, job)
+                os.rename(reclaim_path, self.path(INCOMING, job_id))
+                reclaimed.append(job_id)
+                continue
+
+            os.remove(reclaim_path)
+        return reclaimed
+
+    def list_reclaims(self) -> typing.List[typing.Tuple[str, str]]:
+        """Returns the IDs and paths of the jobs being reclaimed, oldest first"""
+        reclaims = []
+        for file_name in sorted(os.listdir(self.path(CLAIMED))):
+            job_id, separator, suffix = file_name.partition(f".json{RECLAIM_SUFFIX}")
+            # Skips claimed jobs and the temporary files of write_json
+            if separator == "" or "." in suffix:
+                continue
+            reclaims.append((job_id, os.path.join(self.path(CLAIMED), file_name)))
+        return reclaims
+
+    def sweep_reclaims(self, expires_before: float) -> typing.List[str]:
+        """
+        Returns jobs to incoming/ whose worker died while it was reclaiming
+        them, and returns their IDs
+        """
+        swept = []
+        for job_id, reclaim_path in self.list_reclaims():
+            try:
+                if os.stat(reclaim_path).st_mtime >= expires_before:
+                    continue
+                os.rename(reclaim_path, self.path(INCOMING, job_id))
+            except FileNotFoundError:
+                continue
+            logging.debug("Reclaim of spool job %s was interrupted, requeueing", job_id)
+            swept.append(job_id)
+        return swept
+
+    def is_empty(self) -> bool:
+        return (
+            len(self.list(INCOMING)) == 0
+            and len(self.list(CLAIMED)) == 0
+            and len(self.list_reclaims()) == 0
+        )
+
+
+def transcribe_job(job: dict) -> dict:
+    """Transcribes the file of a job, returns its status with the segments or error"""
+    from buzz.job_api import create_task
+
+    try:
+        task = create_task(
+            {**job["options"], "file_path": job["file_path"]}, download_model=True
+        )
+    except ValueError as exc:
+        return {"status": "failed", "error": str(exc)}
+
+    task.cpu_threads = thread_budget.process_threads or None
+    result = transcribe_and_write(task)
+    if result["event"] == "failed":
+        return {"status": "failed", "error": result["error"]}
+    return {
+        "status": "completed",
+        "segments": result["segments"],
+        "outputs": result["outputs"],
+    }
+
+
+class Heartbeat:
+    """Renews the lease of a job on a thread while it is being transcribed"""
+
+    def __init__(self, spool: Spool, job_id: str):
+        self.spool = spool
+        self.job_id = job_id
+        self.lost = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.spool.lease_secs / 3):
+            if not self.spool.heartbeat(self.job_id):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+
+def work(
+    spool: Spool,
+    poll_secs: float = DEFAULT_POLL_SECS,
+    exit_when_empty: bool = False,
+    transcribe: typing.Callable[[dict], dict] = transcribe_job,
+    worker_id: typing.Optional[str] = None,
+):
+    """Transcribes the jobs of the spool until interrupted, or until it is empty"""
+    worker_id = worker_id or get_worker_id()
+
+    while True:
+        spool.reclaim_expired()
+        job = spool.claim()
+        if job is None:
+            # Jobs claimed by other workers can still be reclaimed
+            if exit_when_empty and spool.is_empty():
+                return
+            time.sleep(poll_secs)
+            continue
+
+        print_event({"event": "started", "id": job["id"], "file": job["file_path"]})
+        claimed_at = spool.clock()
+        try:
+            with Heartbeat(spool, job["id"]) as heartbeat:
+                result = transcribe(job)
+        except KeyboardInterrupt:
+            spool.release(job["id"])
+            raise
+
+        result["metrics"] = {
+            "worker": worker_id,
+            "attempt": job["attempts"] + 1,
+            "claimed_at": claimed_at,
+            "finished_at": spool.clock(),
+            "time_taken": round(spool.clock() - claimed_at, 3),
+        }
+
+        if heartbeat.lost or not spool.finish(job, result):
+            logging.debug("Lost the lease of spool job %s", job["id"])
+            print_event({"event": "lost", "id": job["id"], "file": job["file_path"]})
+            continue
+
+        event = {"event": result["status"], "id": job["id"], "file": job["file_path"]}
+        if "error" in result:
+            event["error"] = result["error"]
+        print_event(event)
+
+
+def run_worker(args: argparse.Namespace):
+    # The workers on this machine share its cores
+    thread_budget.limit_process_threads(
+        max(1, thread_budget.get_total_threads() // args.workers)
+    )
+    spool = Spool(args.spool, lease_secs=args.lease, max_attempts=args.max_attempts)
+    work(spool, poll_secs=args.poll, exit_when_empty=args.exit_when_empty)
+
+
+def run_worker_process(args: argparse.Namespace):
+    try:
+        run_worker(args)
+    except KeyboardInterrupt:
+        pass
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="buzz spool",
+        description="Share transcription jobs between headless workers through a spool directory.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Add jobs to the spool.")
+    submit.add_argument("spool", help="Spool directory.")
+    submit.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="glob|list-file",
+        help="Input files, glob patterns or text files that list one input file per line.",
+    )
+    add_transcription_arguments(submit)
+
+    work_parser = commands.add_parser("work", help="Transcribe the jobs of the spool.")
+    work_parser.add_argument("spool", help="Spool directory.")
+    work_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes on this machine. Default: 1.",
+    )
+    work_parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE_SECS,
+        help=f"Seconds after which the job of a worker that stopped renewing it is reclaimed. Default: {DEFAULT_LEASE_SECS:g}.",
+    )
+    work_parser.add_argument(
+        "--poll",
+        type=float,
+        default=DEFAULT_POLL_SECS,
+        help=f"Seconds to wait for new jobs when the spool is empty. Default: {DEFAULT_POLL_SECS:g}.",
+    )
+    work_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Number of expired leases after which a job fails. Default: {DEFAULT_MAX_ATTEMPTS}.",
+    )
+    work_parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="Exit when there are no incoming or claimed jobs instead of waiting for new ones.",
+    )
+    return parser
+
+
+def create_job_options(args: argparse.Namespace) -> dict:
+    """Returns the options of the jobs, in the vocabulary of the job API"""
+    parse_enum(args.task, Task, "task")
+    model_type = parse_enum(args.model_type, CommandLineModelType, "model-type")
+    parse_enum(args.model_size, WhisperModelSize, "model-size")
+
+    if args.hfid == "" and model_type == CommandLineModelType.HUGGING_FACE:
+        raise CommandLineError("--hfid is required when --model-type is huggingface")
+
+    if args.language and LANGUAGES.get(args.language) is None:
+        raise CommandLineError("Invalid language option")
+
+    options = {
+        "task": args.task,
+        "model_type": args.model_type,
+        "model_size": args.model_size,
+        "hfid": args.hfid,
+        "language": args.language,
+        "initial_prompt": args.prompt,
+        "word_timestamps": args.word_timestamps,
+        "output_formats": sorted(
+            output_format.value for output_format in get_output_formats(args)
+        ),
+        "output_directory": args.output_directory,
+    }
+    # Otherwise each worker uses its own saved token
+    if args.openai_token:
+        options["openai_token"] = args.openai_token
+    return options
+
+
+def submit(args: argparse.Namespace) -> int:
+    try:
+        file_paths = expand_inputs(args.inputs)
+        options = create_job_options(args)
+    except CommandLineError as exc:
+        print(f"Error: {str(exc)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    spool = Spool(args.spool)
+    for file_path in file_paths:
+        job_id = spool.submit(file_path, options)
+        print_event({"event": "submitted", "id": job_id, "file": file_path})
+    return EXIT_OK
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.workers < 1:
+        print("Error: Invalid value for --workers option.", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.workers == 1:
+        try:
+            run_worker(args)
+        except KeyboardInterrupt:
+            return EXIT_INTERRUPTED
+        return EXIT_OK
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker_process, args=(args,))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # The workers get the interrupt too and release their jobs
+        for process in processes:
+            process.join()
+        return EXIT_INTERRUPTED
+    return EXIT_OK
+
+
+def main(argv: typing.List[str]) -> int:
+    args = create_parser().parse_args(argv)
+    if args.command == "submit":
+        return submit(args)
+    return run(args)
@@ -0,0 +1,210 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple, Iterable
+from uuid import UUID
+
+from buzz.transcriber.transcriber import FileTranscriptionTask, Segment
+
+# Results of this many completed transcriptions are kept for duplicates
+DEFAULT_MAX_RESULTS = 32
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CoalescedResult:
+    file_path: str
+    size: int
+    mtime_ns: int
+    options_key: str
+    segments: List[Segment]
+
+
+def get_file_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_options_key(task: FileTranscriptionTask) -> str:
+    """Options that change the segments, the output formats and directory do not"""
+    options = task.transcription_options
+    return json.dumps(
+        {
+            "model_type": options.model.model_type,
+            "whisper_model_size": options.model.whisper_model_size,
+            "hugging_face_model_id": options.model.hugging_face_model_id,
+            "model_path": task.model_path,
+            "language": options.language,
+            "task": options.task,
+            "word_level_timings": options.word_level_timings,
+            "temperature": options.temperature,
+            "initial_prompt": options.initial_prompt,
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+
+def can_coalesce(task: FileTranscriptionTask) -> bool:
+    # URL imports are only downloaded when they run, and translations are
+    # made for each task by its own translator
+    return (
+        task.file_path is not None
+        and not task.transcription_options.enable_llm_translation
+    )
+
+
+class TaskCoalescer:
+    """
+    Finds tasks that transcribe the same media with the same options, e.g. a
+    file that is dropped twice or found again by a folder watch rescan, so
+    they share the result of a single transcription.
+
+    Files are compared by the hash of their content. A file is only hashed
+    once another file of the same size is looked up, and is not hashed again
+    while its size and modification time stay the same.
+    """
+
+    def __init__(self, max_results: int = DEFAULT_MAX_RESULTS):
+        self.max_results = max_results
+        self.lock = threading.Lock()
+        # Results of completed tasks, by task ID
+        self.results: "OrderedDict[UUID, CoalescedResult]" = OrderedDict()
+        # (size, mtime) of the files of the tasks being transcribed, by path
+        self.file_stats: Dict[str, Tuple[int, int]] = {}
+        # (size, mtime) and hash of the files hashed so far, by path
+        self.file_hashes: Dict[str, Tuple[int, int, str]] = {}
+
+    def get_stat(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """Size and mtime of the file, or the last ones seen if it was moved away"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            with self.lock:
+                cached = self.file_hashes.get(file_path)
+                if cached is not None:
+                    return cached[:2]
+                return self.file_stats.get(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_hash(self, file_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Hash of the file with this size and mtime, None if it has changed or is gone"""
+        with self.lock:
+            cached = self.file_hashes.get(file_path)
+        if cached is not None and cached[:2] == (size, mtime_ns):
+            return cached[2]
+
+        if self.get_stat(file_path) != (size, mtime_ns):
+            return None
+        try:
+            file_hash = get_file_hash(file_path)
+        except OSError:
+            return None
+        with self.lock:
+            self.file_hashes[file_path] = (size, mtime_ns, file_hash)
+        return file_hash
+
+    def add_file(
+        self,
+        task: FileTranscriptionTask,
+        queued_tasks: Iterable[FileTranscriptionTask] = (),
+    ):
+        """
+        Records the size and mtime of the file of a task before it is
+        transcribed, as a watched file is moved away after. The file is only
+        hashed now if a queued task has a file of the same size, as it could
+        be a duplicate that completes with this task.
+        """
+        if not can_coalesce(task):
+            return
+
+        file_path = os.path.abspath(task.file_path)
+        stat = self.get_stat(file_path)
+        if stat is None:
+            return
+        with self.lock:
+            self.file_stats[file_path] = stat
+
+        for queued_task in queued_tasks:
+            if not can_coalesce(queued_task):
+                continue
+            queued_stat = self.get_stat(os.path.abspath(queued_task.file_path))
+            if queued_stat is not None and queued_stat[0] == stat[0]:
+                self.get_hash(file_path, *stat)
+                return
+
+    def remove_file(self, task: FileTranscriptionTask):
+        """Forgets the file of a task that failed or was canceled"""
+        if can_coalesce(task):
+            with self.lock:
+                self.file_stats.pop(os.path.abspath(task.file_path), None)
+
+    def add_result(self, task: FileTranscriptionTask, segments: List[Segment]):
+        if not can_coalesce(task):
+            return
+
+        file_path = os.path.abspath(task.file_path)
+        stat = self.get_stat(file_path)
+        if stat is None:
+            return
+
+        with self.lock:
+            self.file_stats.pop(file_path, None)
+            self.results[task.uid] = CoalescedResult(
+                file_path=file_path,
+                size=stat[0],
+                mtime_ns=stat[1],
+                options_key=get_options_key(task),
+                segments=copy_segments(segments),
+            )
+            self.results.move_to_end(task.uid)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+    def get_result(self, task: FileTranscriptionTask) -> Optional[List[Segment]]:
+        """Returns the segments of a completed task with the same media and options"""
+        if not can_coalesce(task):
+            return None
+
+        file_path = os.path.abspath(task.file_path)
+        stat = self.get_stat(file_path)
+        if stat is None:
+            return None
+
+        options_key = get_options_key(task)
+        with self.lock:
+            candidates = [
+                (id, result)
+                for id, result in self.results.items()
+                if result.size == stat[0] and result.options_key == options_key
+            ]
+        if len(candidates) == 0:
+            return None
+
+        file_hash = self.get_hash(file_path, *stat)
+        if file_hash is None:
+            return None
+
+        for id, result in reversed(candidates):
+            if self.get_hash(result.file_path, result.size, result.mtime_ns) != file_hash:
+                continue
+            with self.lock:
+                if id in self.results:
+                    self.results.move_to_end(id)
+            logging.debug("Task %s is a duplicate of a completed task", task.uid)
+            return copy_segments(result.segments)
+        return None
+
+
+def copy_segments(segments: List[Segment]) -> List[Segment]:
+    # Each task gets its own segments, which are edited and translated separately
+    return [dataclasses.replace(segment) for segment in segments]
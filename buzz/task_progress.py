@@ -0,0 +1,73 @@
+import time
+from typing import Optional, Dict, Set
+from uuid import UUID
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Most often the table repaints the progress of the running tasks
+REPAINT_INTERVAL_MS = 250
+# Most often the progress of a running task is saved to the database
+PERSIST_INTERVAL_SECS = 5.0
+
+
+class TaskProgressModel(QObject):
+    """
+    Live progress of the running tasks. Engines report progress many times a
+    second, the tasks table reads it from here and repaints at most every
+    REPAINT_INTERVAL_MS, and it is only saved every PERSIST_INTERVAL_SECS,
+    so a restart shows about where a task was.
+    """
+
+    # IDs of the tasks whose progress changed since the last emit
+    changed = pyqtSignal(list)  # List[UUID]
+
+    def __init__(
+        self,
+        repaint_interval_ms: int = REPAINT_INTERVAL_MS,
+        persist_interval_secs: float = PERSIST_INTERVAL_SECS,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.persist_interval_secs = persist_interval_secs
+        self.progress: Dict[UUID, float] = {}
+        # When the progress of each task was last saved
+        self.persisted_at: Dict[UUID, float] = {}
+        self.pending: Set[UUID] = set()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(repaint_interval_ms)
+        self.timer.timeout.connect(self.emit_changed)
+
+    def set_progress(self, id: UUID, progress: float) -> bool:
+        """Updates the progress of the task, returns True when it is due to be saved"""
+        if self.progress.get(id) == progress:
+            return False
+
+        self.progress[id] = progress
+        self.pending.add(id)
+        if not self.timer.isActive():
+            self.timer.start()
+
+        now = time.monotonic()
+        persisted_at = self.persisted_at.get(id)
+        if persisted_at is not None and now - persisted_at < self.persist_interval_secs:
+            return False
+        self.persisted_at[id] = now
+        return True
+
+    def get(self, id: UUID) -> Optional[float]:
+        return self.progress.get(id)
+
+    def remove(self, id: UUID):
+        """Drops the task once its status is saved, the table then reads the database"""
+        self.progress.pop(id, None)
+        self.persisted_at.pop(id, None)
+        self.pending.discard(id)
+
+    def emit_changed(self):
+        if len(self.pending) == 0:
+            return
+        ids = list(self.pending)
+        self.pending.clear()
+        self.changed.emit(ids)
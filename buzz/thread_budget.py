@@ -0,0 +1,106 @@
+"""
+CPU threads shared by the transcriptions that run at the same time.
+
+Left alone, torch uses a thread per core, CTranslate2 and whisper.cpp their own
+defaults and ffmpeg as many threads as it likes. A file transcription and a
+live recording, or several batch workers, then run many more threads than
+there are cores and all of them slow down. The budget splits the cores
+evenly between the running jobs instead.
+
+Most engines fix their threads when a job starts, so a job gets its share
+when it starts. The live recording transcriber reads its share again before
+each chunk, giving up threads while a file transcription runs.
+"""
+import logging
+import os
+import sys
+import threading
+from typing import Optional, Set, Hashable
+
+# Environment variables read by the OpenMP, MKL and OpenBLAS runtimes when
+# they are loaded
+THREAD_ENV_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Threads allotted to this process, 0 if it has no limit
+process_threads = 0
+
+
+def get_total_threads() -> int:
+    total = int(os.getenv("BUZZ_THREAD_BUDGET", 0))
+    return total if total > 0 else os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """Splits the threads of the budget evenly between the jobs that are running"""
+
+    def __init__(self, total: Optional[int] = None):
+        self.total = total or get_total_threads()
+        self.lock = threading.Lock()
+        self.jobs: Set[Hashable] = set()
+
+    def acquire(self, job_id: Hashable) -> int:
+        """Adds a running job and returns its threads"""
+        with self.lock:
+            self.jobs.add(job_id)
+            threads = self.get_share()
+        logging.debug("Job %s started with %s threads", job_id, threads)
+        return threads
+
+    def release(self, job_id: Hashable):
+        with self.lock:
+            self.jobs.discard(job_id)
+
+    def share(self) -> int:
+        with self.lock:
+            return self.get_share()
+
+    def get_share(self) -> int:
+        return max(1, self.total // max(1, len(self.jobs)))
+
+
+_thread_budget: Optional[ThreadBudget] = None
+_thread_budget_lock = threading.Lock()
+
+
+def get_thread_budget() -> ThreadBudget:
+    """Returns the budget shared by all the jobs of this process"""
+    global _thread_budget
+    with _thread_budget_lock:
+        if _thread_budget is None:
+            _thread_budget = ThreadBudget()
+        return _thread_budget
+
+
+def set_torch_threads(threads: int):
+    """Limits the intra-op threads of torch on the calling thread"""
+    import torch
+
+    if torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+
+
+def limit_process_threads(threads: int):
+    """
+    Limits the threads of the engines in a worker process. Engines that are
+    loaded later read the environment, torch is limited right away.
+    """
+    global process_threads
+    process_threads = threads
+    for name in THREAD_ENV_VARIABLES:
+        os.environ[name] = str(threads)
+
+    if "torch" in sys.modules:
+        import torch
+
+        set_torch_threads(threads)
+        try:
+            # Inference runs one op at a time, more inter-op threads only
+            # add to the oversubscription
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before torch has run any parallel work
+            pass
+
+
+def get_ffmpeg_threads() -> str:
+    return str(process_threads)
@@ -0,0 +1,198 @@
+import csv
+import logging
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from buzz.thread_budget import get_ffmpeg_threads
+
+SILENCE_START_REGEX = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+SILENCE_END_REGEX = re.compile(r"silence_end: (\d+(?:\.\d+)?)")
+TIME_REGEX = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+DURATION_REGEX = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+# Chunks are kept well below the 25MB upload limit of the OpenAI API,
+# ten minutes of speech in 24 kbit/s Opus is under 2MB
+MAX_CHUNK_DURATION_SECS = 10 * 60
+
+
+@dataclass
+class AudioChunk:
+    file_path: str
+    start: float  # seconds from the start of the input file
+    end: float
+
+    @property
+    def offset_ms(self) -> int:
+        return int(self.start * 1000)
+
+    @property
+    def duration_ms(self) -> int:
+        return int((self.end - self.start) * 1000)
+
+
+def to_seconds(match: re.Match) -> float:
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class AudioSegmenter:
+    """
+    Splits an audio file into Opus chunks for remote transcription backends.
+
+    The file is decoded once to find silences and its duration, then encoded
+    once with ffmpeg's segment muxer, which writes all chunks and a list of
+    their start and end times. Cuts are moved to the middle of a silence near
+    the maximum chunk duration, so words are not split between chunks.
+    """
+
+    def __init__(
+        self,
+        max_chunk_duration: float = MAX_CHUNK_DURATION_SECS,
+        silence_threshold_db: int = -30,
+        min_silence_duration: float = 0.3,
+        bitrate: str = "24k",
+    ):
+        self.max_chunk_duration = max_chunk_duration
+        self.silence_threshold_db = silence_threshold_db
+        self.min_silence_duration = min_silence_duration
+        self.bitrate = bitrate
+
+    def detect_silences(self, file_path: str) -> Tuple[List[Tuple[float, float]], float]:
+        """Returns the silences in the file as (start, end) and its duration in seconds"""
+        # fmt: off
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-threads", get_ffmpeg_threads(),
+            "-i", file_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", "16000",
+            "-af", f"silencedetect=noise={self.silence_threshold_db}dB:d={self.min_silence_duration}",
+            "-f", "null",
+            "-",
+        ]
+        # fmt: on
+        result = subprocess.run(cmd, capture_output=True)
+        output = result.stderr.decode("utf-8", errors="replace")
+
+        if result.returncode != 0:
+            raise Exception(f"FFMPEG Failed to load audio: {output[-1000:]}")
+
+        # The last progress line has the decoded duration, which is exact
+        # even for files without a duration in the header
+        times = list(TIME_REGEX.finditer(output))
+        if len(times) > 0:
+            duration = to_seconds(times[-1])
+        else:
+            duration_match = DURATION_REGEX.search(output)
+            duration = to_seconds(duration_match) if duration_match else 0.0
+
+        silences = []
+        silence_start = None
+        for line in output.splitlines():
+            start_match = SILENCE_START_REGEX.search(line)
+            if start_match is not None:
+                silence_start = max(0.0, float(start_match.group(1)))
+                continue
+
+            end_match = SILENCE_END_REGEX.search(line)
+            if end_match is not None and silence_start is not None:
+                silences.append((silence_start, float(end_match.group(1))))
+                silence_start = None
+
+        # Silence until the end of the file
+        if silence_start is not None:
+            silences.append((silence_start, duration))
+
+        return silences, duration
+
+    @staticmethod
+    def find_cut_points(
+        silences: List[Tuple[float, float]],
+        duration: float,
+        max_chunk_duration: float,
+        min_chunk_fraction: float = 0.5,
+    ) -> List[float]:
+        """
+        Picks cut points at most max_chunk_duration apart. Each cut is at the middle
+        of the last silence in the second half of the allowed range, or at the
+        maximum duration when there is no silence there.
+        """
+        cut_points = []
+        last_cut = 0.0
+        midpoints = [(start + end) / 2 for start, end in silences]
+
+        while duration - last_cut > max_chunk_duration:
+            latest_cut = last_cut + max_chunk_duration
+            earliest_cut = last_cut + max_chunk_duration * min_chunk_fraction
+
+            candidates = [
+                midpoint for midpoint in midpoints if earliest_cut <= midpoint <= latest_cut
+            ]
+            cut = candidates[-1] if len(candidates) > 0 else latest_cut
+
+            cut_points.append(round(cut, 3))
+            last_cut = cut
+
+        return cut_points
+
+    def split(self, file_path: str, output_dir: str) -> List[AudioChunk]:
+        silences, duration = self.detect_silences(file_path)
+        cut_points = self.find_cut_points(silences, duration, self.max_chunk_duration)
+
+        logging.debug(
+            "Splitting audio file, duration = %s, silences = %s, cut points = %s",
+            duration,
+            len(silences),
+            cut_points,
+        )
+
+        segment_list = os.path.join(output_dir, "chunks.csv")
+        if len(cut_points) > 0:
+            segment_args = ["-segment_times", ",".join(str(cut) for cut in cut_points)]
+        else:
+            segment_args = ["-segment_time", str(int(duration) + 60)]
+
+        # fmt: off
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-threads", get_ffmpeg_threads(),
+            "-loglevel", "error",
+            "-i", file_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", "16000",
+            "-c:a", "libopus",
+            "-b:a", self.bitrate,
+            "-application", "voip",
+            "-f", "segment",
+            *segment_args,
+            "-segment_list", segment_list,
+            "-segment_list_type", "csv",
+            "-reset_timestamps", "1",
+            os.path.join(output_dir, "chunk_%04d.ogg"),
+        ]
+        # fmt: on
+        result = subprocess.run(cmd, capture_output=True)
+
+        if result.returncode != 0:
+            raise Exception(
+                f"FFMPEG Failed to split audio: {result.stderr.decode('utf-8', errors='replace')}"
+            )
+
+        chunks = []
+        with open(segment_list, newline="") as file:
+            for name, start, end in csv.reader(file):
+                chunks.append(
+                    AudioChunk(
+                        file_path=os.path.join(output_dir, name),
+                        start=float(start),
+                        end=float(end),
+                    )
+                )
+        return chunks
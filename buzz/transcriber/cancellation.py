@@ -0,0 +1,117 @@
+import io
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import Optional, Callable, List, Any, TypeVar
+
+from buzz.transcriber.transcriber import Stopped
+
+# Longest time a canceled task may keep its engine busy. Engines that cannot
+# stop by themselves within it are terminated.
+CANCEL_TIMEOUT_SECS = 0.5
+# How often blocking waits check whether the task has been canceled
+CANCEL_POLL_SECS = 0.1
+
+T = TypeVar("T")
+
+
+class CancellationToken:
+    """
+    Set when a task is canceled. Engines check it between chunks, segments
+    and retries, and register callbacks to abort what they are waiting for.
+
+    The event can be a multiprocessing.Event, so a transcription process can
+    check the token of the task it runs.
+    """
+
+    def __init__(self, event: Optional[Any] = None):
+        self.event = event if event is not None else threading.Event()
+        self.lock = threading.Lock()
+        self.callbacks: List[Callable[[], None]] = []
+
+    @property
+    def is_canceled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Calls the callback when the task is canceled, or now if it already is"""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_canceled(self):
+        if self.event.is_set():
+            raise Stopped
+
+    def sleep(self, secs: float):
+        """Waits before a retry, raises Stopped as soon as the task is canceled"""
+        if self.event.wait(secs):
+            raise Stopped
+
+    def run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a blocking call, e.g. a request, on a thread and returns its
+        result. Raises Stopped within CANCEL_POLL_SECS of the task being
+        canceled, the call is then left to stop by itself and its result is
+        dropped.
+        """
+        future: Future = Future()
+
+        def target():
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=target, daemon=True).start()
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_SECS)
+            except TimeoutError:
+                self.raise_if_canceled()
+
+
+class CancellableFile(io.RawIOBase):
+    """
+    File being uploaded that raises Stopped when it is read after the task is
+    canceled, which aborts the request and closes its connection
+    """
+
+    def __init__(self, file: io.BufferedReader, cancellation: CancellationToken):
+        super().__init__()
+        self.file = file
+        self.cancellation = cancellation
+        self.name = file.name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        self.cancellation.raise_if_canceled()
+        return self.file.read(size)
+
+    def readinto(self, buffer) -> int:
+        self.cancellation.raise_if_canceled()
+        return self.file.readinto(buffer)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def fileno(self) -> int:
+        return self.file.fileno()
@@ -0,0 +1,115 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Optional, List, Tuple, Callable
+
+from buzz.assets import get_cache_path
+from buzz.transcriber.transcriber import Segment
+
+CHECKPOINT_INTERVAL_SECS = 30
+
+
+def get_task_cache_directory(
+    name: str, file_path: str, options: dict, cache_dir: Optional[str] = None
+) -> str:
+    """
+    Returns the cache directory for the results of transcribing the file with
+    the options. It changes when the file is modified.
+    """
+    stat = os.stat(file_path)
+    key = json.dumps(
+        {
+            "file_path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            **options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return os.path.join(
+        cache_dir or os.path.join(get_cache_path(), name),
+        hashlib.sha256(key.encode("utf-8")).hexdigest()[:32],
+    )
+
+
+def write_json(path: str, data):
+    # Written to a temporary file first, so an interrupted run never
+    # leaves a partial result behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+class TranscriptionCheckpoint:
+    """
+    Segments a local transcription has completed so far and the position in
+    the audio they reach, saved to disk at most every interval seconds.
+
+    When the same file is transcribed again with the same options, e.g. after
+    a crash or a canceled task, the engine resumes from the saved position and
+    adds its segments to the saved ones.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        options: dict,
+        cache_dir: Optional[str] = None,
+        interval: float = CHECKPOINT_INTERVAL_SECS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.directory = get_task_cache_directory(
+            "checkpoints", file_path, options, cache_dir
+        )
+        self.path = os.path.join(self.directory, "checkpoint.json")
+        self.interval = interval
+        self.clock = clock
+        self.segments: List[Segment] = []
+        self.offset_ms = 0
+        self.saved_at = clock()
+
+    def load(self) -> Tuple[List[Segment], int]:
+        """Returns the saved segments and the position in ms to resume from"""
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+            self.segments = [Segment(**segment) for segment in data["segments"]]
+            self.offset_ms = int(data["offset_ms"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            self.segments = []
+            self.offset_ms = 0
+
+        if self.offset_ms > 0:
+            logging.debug(
+                "Resuming transcription at %sms with %s segments",
+                self.offset_ms,
+                len(self.segments),
+            )
+        return list(self.segments), self.offset_ms
+
+    def add_segments(self, segments: List[Segment], offset_ms: int):
+        """Adds segments that end at offset_ms, saving them if the interval has passed"""
+        self.segments.extend(segments)
+        self.offset_ms = max(self.offset_ms, offset_ms)
+        if self.clock() - self.saved_at >= self.interval:
+            self.save()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        write_json(
+            self.path,
+            {
+                "offset_ms": self.offset_ms,
+                "segments": [dataclasses.asdict(segment) for segment in self.segments],
+            },
+        )
+        self.saved_at = self.clock()
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
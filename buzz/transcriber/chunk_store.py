@@ -0,0 +1,92 @@
+import dataclasses
+import json
+import logging
+import os
+import shutil
+from typing import Optional, List
+
+from buzz.transcriber.audio_segmenter import AudioChunk, AudioSegmenter
+from buzz.transcriber.checkpoint import get_task_cache_directory, write_json
+from buzz.transcriber.transcriber import Segment
+
+
+class ChunkResultStore:
+    """
+    Keeps the audio chunks of a remote transcription and the segments of each
+    chunk on disk until the transcription completes.
+
+    The store is keyed on the input file and the options that change the
+    result, so rerunning a failed transcription of the same file reuses the
+    encoded chunks and only uploads the chunks that have no result yet.
+    """
+
+    def __init__(
+        self, file_path: str, options: dict, cache_dir: Optional[str] = None
+    ):
+        self.directory = get_task_cache_directory(
+            "remote_chunks", file_path, options, cache_dir
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        self.chunks_path = os.path.join(self.directory, "chunks.json")
+
+    def get_chunks(self, segmenter: AudioSegmenter, file_path: str) -> List[AudioChunk]:
+        chunks = self.load_chunks()
+        if chunks is not None:
+            logging.debug("Resuming from %s chunks in %s", len(chunks), self.directory)
+            return chunks
+
+        chunks = segmenter.split(file_path, self.directory)
+        self.save_chunks(chunks)
+        return chunks
+
+    def load_chunks(self) -> Optional[List[AudioChunk]]:
+        """Returns the chunks of a previous run, if all of them are still on disk"""
+        try:
+            with open(self.chunks_path) as file:
+                chunks = [
+                    AudioChunk(
+                        file_path=os.path.join(self.directory, chunk["file_name"]),
+                        start=chunk["start"],
+                        end=chunk["end"],
+                    )
+                    for chunk in json.load(file)
+                ]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+        if not all(os.path.isfile(chunk.file_path) for chunk in chunks):
+            return None
+        return chunks
+
+    def save_chunks(self, chunks: List[AudioChunk]):
+        write_json(
+            self.chunks_path,
+            [
+                {
+                    "file_name": os.path.basename(chunk.file_path),
+                    "start": chunk.start,
+                    "end": chunk.end,
+                }
+                for chunk in chunks
+            ],
+        )
+
+    def load_segments(self, index: int) -> Optional[List[Segment]]:
+        try:
+            with open(self.get_segments_path(index)) as file:
+                return [Segment(**segment) for segment in json.load(file)]
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def save_segments(self, index: int, segments: List[Segment]):
+        write_json(
+            self.get_segments_path(index),
+            [dataclasses.asdict(segment) for segment in segments],
+        )
+
+    def get_segments_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"segments_{index:04d}.json")
+
+    def clear(self):
+        logging.debug("Removing chunk results in %s", self.directory)
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -9,12 +9,15 @@ from typing import Optional, List
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 from yt_dlp import YoutubeDL
 
+from buzz.thread_budget import get_ffmpeg_threads
 from buzz.whisper_audio import SAMPLE_RATE
+from buzz.transcriber.cancellation import CancellationToken
 from buzz.transcriber.transcriber import (
     FileTranscriptionTask,
     get_output_file_path,
     Segment,
     OutputFormat,
+    Stopped,
 )
 
 
@@ -23,11 +26,14 @@ class FileTranscriber(QObject):
     progress = pyqtSignal(tuple)  # (current, total)
     download_progress = pyqtSignal(float)
     completed = pyqtSignal(list)  # List[Segment]
+    # Segments produced so far, for engines that can report them while transcribing
+    new_segments = pyqtSignal(list)  # List[Segment]
     error = pyqtSignal(str)
 
     def __init__(self, task: FileTranscriptionTask, parent: Optional["QObject"] = None):
         super().__init__(parent)
         self.transcription_task = task
+        self.cancellation = CancellationToken()
 
     @pyqtSlot()
     def run(self):
@@ -54,14 +60,16 @@ class FileTranscriber(QObject):
                 logging.debug(f"Downloading audio file from URL: {self.transcription_task.url}")
                 ydl.download([self.transcription_task.url])
             except Exception as exc:
-                logging.debug(f"Error downloading audio: {exc.msg}")
-                self.error.emit(exc.msg)
+                message = getattr(exc, "msg", str(exc))
+                logging.debug(f"Error downloading audio: {message}")
+                remove_files(temp_output_path, wav_file)
+                self.error.emit(message)
                 return
 
             cmd = [
                 "ffmpeg",
                 "-nostdin",
-                "-threads", "0",
+                "-threads", get_ffmpeg_threads(),
                 "-i", temp_output_path,
                 "-ac", "1",
                 "-ar", str(SAMPLE_RATE),
@@ -70,6 +78,12 @@ class FileTranscriber(QObject):
                 wav_file]
 
             result = subprocess.run(cmd, capture_output=True)
+            remove_files(temp_output_path)
+
+            if self.cancellation.is_canceled:
+                remove_files(wav_file)
+                self.error.emit("Stopped")
+                return
 
             if len(result.stderr):
                 logging.warning(f"Error processing downloaded audio. Error: {result.stderr.decode()}")
@@ -80,6 +94,10 @@ class FileTranscriber(QObject):
 
         try:
             segments = self.transcribe()
+        except Stopped:
+            logging.debug("Transcription stopped")
+            self.error.emit("Stopped")
+            return
         except Exception as exc:
             logging.exception("")
             self.error.emit(str(exc))
@@ -88,34 +106,16 @@ class FileTranscriber(QObject):
         for segment in segments:
             segment.text = segment.text.strip()
 
-        self.completed.emit(segments)
+        # Outputs are in place once the task is reported as completed, the
+        # queue worker may write the same outputs for a duplicate task
+        write_task_outputs(self.transcription_task, segments)
+        move_watched_file(self.transcription_task)
 
-        for (
-            output_format
-        ) in self.transcription_task.file_transcription_options.output_formats:
-            default_path = get_output_file_path(
-                file_path=self.transcription_task.file_path,
-                output_format=output_format,
-                language=self.transcription_task.transcription_options.language,
-                output_directory=self.transcription_task.output_directory,
-                model=self.transcription_task.transcription_options.model,
-                task=self.transcription_task.transcription_options.task,
-            )
-
-            write_output(
-                path=default_path, segments=segments, output_format=output_format
-            )
-
-        if self.transcription_task.source == FileTranscriptionTask.Source.FOLDER_WATCH:
-            shutil.move(
-                self.transcription_task.file_path,
-                os.path.join(
-                    self.transcription_task.output_directory,
-                    os.path.basename(self.transcription_task.file_path),
-                ),
-            )
+        self.completed.emit(segments)
 
     def on_download_progress(self, data: dict):
+        # Raised from the progress hook, aborts the download
+        self.cancellation.raise_if_canceled()
         if data["status"] == "downloading":
             self.download_progress.emit(data["downloaded_bytes"] / data["total_bytes"])
 
@@ -123,9 +123,46 @@ class FileTranscriber(QObject):
     def transcribe(self) -> List[Segment]:
         ...
 
-    @abstractmethod
     def stop(self):
-        ...
+        """Cancels the transcription, it stops within CANCEL_TIMEOUT_SECS"""
+        self.cancellation.cancel()
+
+
+def remove_files(*file_paths: str):
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+def move_watched_file(task: FileTranscriptionTask):
+    """Moves a file found by the folder watch to the output directory once it is transcribed"""
+    if task.source == FileTranscriptionTask.Source.FOLDER_WATCH and os.path.isfile(
+        task.file_path
+    ):
+        shutil.move(
+            task.file_path,
+            os.path.join(task.output_directory, os.path.basename(task.file_path)),
+        )
+
+
+def write_task_outputs(task: FileTranscriptionTask, segments: List[Segment]) -> List[str]:
+    """Writes the segments in each output format of the task, returns the paths written"""
+    paths = []
+    for output_format in task.file_transcription_options.output_formats:
+        default_path = get_output_file_path(
+            file_path=task.file_path,
+            output_format=output_format,
+            language=task.transcription_options.language,
+            output_directory=task.output_directory,
+            model=task.transcription_options.model,
+            task=task.transcription_options.task,
+        )
+
+        write_output(path=default_path, segments=segments, output_format=output_format)
+        paths.append(default_path)
+    return paths
 
 
 # TODO: Move to transcription service
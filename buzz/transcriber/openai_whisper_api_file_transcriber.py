@@ -1,20 +1,95 @@
 import logging
-import math
 import os
-import subprocess
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
 from typing import Optional, List
 
 from PyQt6.QtCore import QObject
-from openai import OpenAI
+from openai import OpenAI, RateLimitError, APIConnectionError, InternalServerError
 
 from buzz.settings.settings import Settings
 from buzz.model_loader import get_custom_api_whisper_model
+from buzz.transcriber.audio_segmenter import (
+    AudioSegmenter,
+    AudioChunk,
+    MAX_CHUNK_DURATION_SECS,
+)
+from buzz.transcriber.cancellation import (
+    CancellationToken,
+    CancellableFile,
+    CANCEL_POLL_SECS,
+)
+from buzz.transcriber.chunk_store import ChunkResultStore
 from buzz.transcriber.file_transcriber import FileTranscriber
-from buzz.transcriber.transcriber import FileTranscriptionTask, Segment, Task
+from buzz.transcriber.remote_client import (
+    get_http_client,
+    DEFAULT_TIMEOUT,
+    OPENAI_BASE_URL,
+)
+from buzz.transcriber.transcriber import FileTranscriptionTask, Segment, Task, Stopped
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of chunks uploaded at the same time. The limit is halved
+    when the server rate limits a request, and grows back by one after every
+    few successful requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        increase_after: int = 4,
+        cancellation: Optional[CancellationToken] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.increase_after = increase_after
+        self.active = 0
+        self.successes = 0
+        self.condition = threading.Condition()
+        self.cancellation = cancellation or CancellationToken()
+        # Wakes the uploads waiting for their turn
+        self.cancellation.on_cancel(self.notify_all)
+
+    def notify_all(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def __enter__(self):
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.active < self.limit or self.cancellation.is_canceled
+            )
+            self.cancellation.raise_if_canceled()
+            self.active += 1
+        return self
+
+    def __exit__(self, *args):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.increase_after and self.limit < self.max_concurrency:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def on_rate_limited(self):
+        with self.condition:
+            self.limit = max(1, self.limit // 2)
+            self.successes = 0
+            logging.debug("Rate limited, reducing upload concurrency to %s", self.limit)
 
 
 class OpenAIWhisperAPIFileTranscriber(FileTranscriber):
+    # Chunks that are rate limited or fail with a transient error are retried
+    # this many times before the task fails
+    MAX_RETRIES = 5
+
     def __init__(self, task: FileTranscriptionTask, parent: Optional["QObject"] = None):
         super().__init__(task=task, parent=parent)
         settings = Settings()
@@ -24,9 +99,13 @@ class OpenAIWhisperAPIFileTranscriber(FileTranscriber):
         self.task = task.transcription_options.task
         self.openai_client = OpenAI(
             api_key=self.transcription_task.transcription_options.openai_access_token,
-            base_url=custom_openai_base_url if custom_openai_base_url else None
+            base_url=custom_openai_base_url if custom_openai_base_url else None,
+            timeout=DEFAULT_TIMEOUT,
+            http_client=get_http_client(custom_openai_base_url or OPENAI_BASE_URL),
         )
         self.whisper_api_model = get_custom_api_whisper_model(custom_openai_base_url)
+        self.max_concurrency = int(os.getenv("BUZZ_OPENAI_API_CONCURRENCY", 3))
+        self.max_chunk_duration = MAX_CHUNK_DURATION_SECS
         logging.debug("Will use whisper API on %s, %s",
                       custom_openai_base_url, self.whisper_api_model)
 
@@ -37,86 +116,153 @@ class OpenAIWhisperAPIFileTranscriber(FileTranscriber):
             self.task,
         )
 
-        mp3_file = tempfile.mktemp() + ".mp3"
+        options = self.transcription_task.transcription_options
+        store = ChunkResultStore(
+            self.transcription_task.file_path,
+            options={
+                "engine": "openai_whisper_api",
+                "model": self.whisper_api_model,
+                "task": options.task,
+                "language": options.language,
+                "initial_prompt": options.initial_prompt,
+                "max_chunk_duration": self.max_chunk_duration,
+            },
+        )
+        chunks = store.get_chunks(
+            AudioSegmenter(max_chunk_duration=self.max_chunk_duration),
+            self.transcription_task.file_path,
+        )
 
-        cmd = [
-            "ffmpeg",
-            "-threads", "0",
-            "-loglevel", "panic",
-            "-i", self.transcription_task.file_path, mp3_file
-        ]
+        self.progress.emit((0, 100))
 
-        result = subprocess.run(cmd, capture_output=True)
+        segments = self.transcribe_chunks(chunks, store)
 
-        if result.returncode != 0:
-            logging.warning(f"FFMPEG audio load warning. Process return code was not zero: {result.returncode}")
+        # Only a completed transcription discards the chunk results, a failed
+        # one is resumed from them when it is run again
+        store.clear()
+        return segments
 
-        if len(result.stderr):
-            logging.warning(f"FFMPEG audio load error. Error: {result.stderr.decode()}")
-            raise Exception(f"FFMPEG Failed to load audio: {result.stderr.decode()}")
+    def transcribe_chunks(
+        self, chunks: List[AudioChunk], store: ChunkResultStore
+    ) -> List[Segment]:
+        # Canceled with the task, or when the upload of another chunk fails
+        cancellation = CancellationToken()
+        self.cancellation.on_cancel(cancellation.cancel)
 
-        # fmt: off
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            mp3_file,
-        ]
-        # fmt: on
-        duration_secs = float(
-            subprocess.run(cmd, capture_output=True, check=True).stdout.decode("utf-8")
+        # Several chunks are uploaded at the same time
+        limiter = AdaptiveConcurrencyLimiter(
+            self.max_concurrency, cancellation=cancellation
         )
+        progress_lock = threading.Lock()
+        completed_chunks = 0
+        # Error of the chunk that failed first, the chunks it stopped raise Stopped
+        errors: List[BaseException] = []
 
-        total_size = os.path.getsize(mp3_file)
-        max_chunk_size = 25 * 1024 * 1024
-
-        self.progress.emit((0, 100))
-
-        if total_size < max_chunk_size:
-            return self.get_segments_for_file(mp3_file)
+        def on_chunk_done():
+            nonlocal completed_chunks
+            with progress_lock:
+                completed_chunks += 1
+                self.progress.emit((completed_chunks, len(chunks)))
 
-        # If the file is larger than 25MB, split into chunks
-        # and transcribe each chunk separately
-        num_chunks = math.ceil(total_size / max_chunk_size)
-        chunk_duration = duration_secs / num_chunks
-
-        segments = []
+        def transcribe_chunk(index: int, chunk: AudioChunk) -> List[Segment]:
+            try:
+                chunk_segments = self.get_segments_for_chunk(
+                    chunk.file_path,
+                    offset_ms=chunk.offset_ms,
+                    limiter=limiter,
+                    cancellation=cancellation,
+                )
+            except BaseException as exc:
+                with progress_lock:
+                    if not cancellation.is_canceled:
+                        errors.append(exc)
+                # Stops the other uploads before the next chunk is started
+                cancellation.cancel()
+                raise
 
-        for i in range(num_chunks):
-            chunk_start = i * chunk_duration
-            chunk_end = min((i + 1) * chunk_duration, duration_secs)
+            # Kept for when the task is run again, even if it has been canceled
+            store.save_segments(index, chunk_segments)
+            cancellation.raise_if_canceled()
+            self.new_segments.emit(chunk_segments)
+            on_chunk_done()
+            return chunk_segments
 
-            chunk_file = tempfile.mktemp() + ".mp3"
+        saved_segments = [store.load_segments(i) for i in range(len(chunks))]
+        for chunk_segments in saved_segments:
+            if chunk_segments is not None:
+                self.new_segments.emit(chunk_segments)
+                on_chunk_done()
 
-            # fmt: off
-            cmd = [
-                "ffmpeg",
-                "-i", mp3_file,
-                "-ss", str(chunk_start),
-                "-to", str(chunk_end),
-                "-c", "copy",
-                chunk_file,
-            ]
-            # fmt: on
-            subprocess.run(cmd, capture_output=True, check=True)
-            logging.debug('Created chunk file "%s"', chunk_file)
+        executor = ThreadPoolExecutor(max_workers=limiter.max_concurrency)
+        futures = [
+            executor.submit(transcribe_chunk, i, chunk)
+            for i, chunk in enumerate(chunks)
+            if saved_segments[i] is None
+        ]
+        try:
+            pending = futures
+            while len(pending) > 0:
+                done, pending = wait(
+                    pending, timeout=CANCEL_POLL_SECS, return_when=FIRST_EXCEPTION
+                )
+                if cancellation.is_canceled:
+                    raise errors[0] if len(errors) > 0 else Stopped
+            results = iter([future.result() for future in futures])
+        except BaseException:
+            # The other uploads stop at their next read or retry, without
+            # keeping the task waiting for them
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
 
+        # Stitch the chunks back together in order
+        segments = []
+        for chunk_segments in saved_segments:
             segments.extend(
-                self.get_segments_for_file(
-                    chunk_file, offset_ms=int(chunk_start * 1000)
-                )
+                chunk_segments if chunk_segments is not None else next(results)
             )
-            os.remove(chunk_file)
-            self.progress.emit((i + 1, num_chunks))
-
         return segments
 
-    def get_segments_for_file(self, file: str, offset_ms: int = 0):
+    def get_segments_for_chunk(
+        self,
+        file: str,
+        offset_ms: int,
+        limiter: AdaptiveConcurrencyLimiter,
+        cancellation: CancellationToken,
+    ) -> List[Segment]:
+        retries = 0
+        while True:
+            try:
+                # Only holds a slot while uploading, not while backing off
+                with limiter:
+                    segments = self.get_segments_for_file(
+                        file, offset_ms=offset_ms, cancellation=cancellation
+                    )
+                limiter.on_success()
+                return segments
+            except (RateLimitError, APIConnectionError, InternalServerError) as exc:
+                # The client already retried a couple of times, upload fewer
+                # chunks at the same time and back off before trying again
+                retries += 1
+                cancellation.raise_if_canceled()
+                if retries > self.MAX_RETRIES:
+                    raise
+                if isinstance(exc, RateLimitError):
+                    limiter.on_rate_limited()
+                delay = min(2 ** retries, 30)
+                logging.debug("Chunk upload failed (%s), retrying in %ss", exc, delay)
+                cancellation.sleep(delay)
+
+    def get_segments_for_file(
+        self,
+        file: str,
+        offset_ms: int = 0,
+        cancellation: Optional[CancellationToken] = None,
+    ):
         with open(file, "rb") as file:
             options = {
                 "model": self.whisper_api_model,
-                "file": file,
+                "file": CancellableFile(file, cancellation or self.cancellation),
                 "response_format": "verbose_json",
                 "prompt": self.transcription_task.transcription_options.initial_prompt,
             }
@@ -138,5 +284,3 @@ class OpenAIWhisperAPIFileTranscriber(FileTranscriber):
                 for segment in transcript.model_extra["segments"]
             ]
 
-    def stop(self):
-        pass
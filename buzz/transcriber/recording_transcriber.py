@@ -19,6 +19,12 @@ from PyQt6.QtCore import QObject, pyqtSignal
 from buzz import whisper_audio
 from buzz.model_loader import WhisperModelSize, ModelType, get_custom_api_whisper_model
 from buzz.settings.settings import Settings
+from buzz.thread_budget import get_thread_budget, set_torch_threads
+from buzz.transcriber.remote_client import (
+    get_http_client,
+    DEFAULT_TIMEOUT,
+    OPENAI_BASE_URL,
+)
 from buzz.transcriber.transcriber import TranscriptionOptions, Task
 from buzz.transcriber.whisper_cpp import WhisperCpp
 from buzz.transformers_whisper import TransformersWhisper
@@ -67,12 +73,22 @@ class RecordingTranscriber(QObject):
         self.whisper_api_model = get_custom_api_whisper_model("")
 
     def start(self):
-        model_path = self.model_path
-        keep_samples = int(self.keep_sample_seconds * self.sample_rate)
-
         if torch.cuda.is_available():
             logging.debug(f"CUDA version detected: {torch.version.cuda}")
 
+        # Shares the cores with the file transcriptions running at the same time
+        thread_budget = get_thread_budget()
+        cpu_threads = thread_budget.acquire(id(self))
+        try:
+            self.transcribe_recording(cpu_threads)
+        finally:
+            thread_budget.release(id(self))
+
+    def transcribe_recording(self, cpu_threads: int):
+        model_path = self.model_path
+        keep_samples = int(self.keep_sample_seconds * self.sample_rate)
+        thread_budget = get_thread_budget()
+
         if self.transcription_options.model.model_type == ModelType.WHISPER:
             device = "cuda" if torch.cuda.is_available() else "cpu"
             model = whisper.load_model(model_path, device=device)
@@ -97,6 +113,7 @@ class RecordingTranscriber(QObject):
                 model_size_or_path=model_path,
                 download_root=model_root_dir,
                 device=device,
+                cpu_threads=cpu_threads,
             )
 
             # Fix for large-v3 https://github.com/guillaumekln/faster-whisper/issues/547#issuecomment-1797962599
@@ -111,7 +128,9 @@ class RecordingTranscriber(QObject):
             self.whisper_api_model = get_custom_api_whisper_model(custom_openai_base_url)
             self.openai_client = OpenAI(
                 api_key=self.transcription_options.openai_access_token,
-                base_url=custom_openai_base_url if custom_openai_base_url else None
+                base_url=custom_openai_base_url if custom_openai_base_url else None,
+                timeout=DEFAULT_TIMEOUT,
+                http_client=get_http_client(custom_openai_base_url or OPENAI_BASE_URL),
             )
             logging.debug("Will use whisper API on %s, %s",
                           custom_openai_base_url, self.whisper_api_model)
@@ -151,6 +170,8 @@ class RecordingTranscriber(QObject):
                             self.amplitude(samples),
                         )
                         time_started = datetime.datetime.now()
+                        # The share changes when file transcriptions start or finish
+                        cpu_threads = thread_budget.share()
 
                         # TODO Filter out silent audio
 
@@ -159,6 +180,7 @@ class RecordingTranscriber(QObject):
                                 == ModelType.WHISPER
                         ):
                             assert isinstance(model, whisper.Whisper)
+                            set_torch_threads(cpu_threads)
                             result = model.transcribe(
                                 audio=samples,
                                 language=self.transcription_options.language,
@@ -174,7 +196,8 @@ class RecordingTranscriber(QObject):
                             result = model.transcribe(
                                 audio=samples,
                                 params=model.get_params(
-                                    transcription_options=self.transcription_options
+                                    transcription_options=self.transcription_options,
+                                    n_threads=cpu_threads,
                                 ),
                             )
                         elif (
@@ -198,6 +221,7 @@ class RecordingTranscriber(QObject):
                                 == ModelType.HUGGING_FACE
                         ):
                             assert isinstance(model, TransformersWhisper)
+                            set_torch_threads(cpu_threads)
                             result = model.transcribe(
                                 audio=samples,
                                 language=self.transcription_options.language
@@ -0,0 +1,237 @@
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Any, List
+
+import httpx
+
+from buzz.transcriber.cancellation import CancellationToken, CancellableFile
+from buzz.transcriber.transcriber import Stopped
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+# Uploads of long chunks and transcription on slow servers take a while,
+# connecting should not
+DEFAULT_TIMEOUT = httpx.Timeout(connect=10.0, read=300.0, write=120.0, pool=60.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=8, max_keepalive_connections=8, keepalive_expiry=120.0
+)
+HEALTH_PROBE_TIMEOUT = httpx.Timeout(3.0)
+HEALTH_TTL_SECS = 30.0
+
+
+@dataclass
+class RequestMetrics:
+    requests: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    total_latency: float = 0.0
+
+
+_clients: Dict[str, httpx.Client] = {}
+_metrics: Dict[str, RequestMetrics] = {}
+# (healthy, checked at) by health check URL
+_health: Dict[str, Tuple[bool, float]] = {}
+_lock = threading.Lock()
+
+
+def get_origin(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.netloc.decode('ascii')}"
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """
+    Returns the client shared by all requests to the host of the url, so
+    consecutive chunks and tasks reuse its keep-alive connections
+    """
+    origin = get_origin(url)
+    with _lock:
+        client = _clients.get(origin)
+        if client is None:
+            client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                limits=DEFAULT_LIMITS,
+                event_hooks={"request": [on_request], "response": [on_response]},
+            )
+            _clients[origin] = client
+        return client
+
+
+def get_request_metrics(url: str) -> RequestMetrics:
+    with _lock:
+        return _metrics.setdefault(get_origin(url), RequestMetrics())
+
+
+def on_request(request: httpx.Request):
+    request.extensions["started"] = time.monotonic()
+
+
+def on_response(response: httpx.Response):
+    # Called when the headers arrive, the body sizes come from the headers
+    request = response.request
+    latency = time.monotonic() - request.extensions.get("started", time.monotonic())
+    bytes_sent = int(request.headers.get("Content-Length", 0))
+    bytes_received = int(response.headers.get("Content-Length", 0))
+
+    metrics = get_request_metrics(str(request.url))
+    with _lock:
+        metrics.requests += 1
+        metrics.errors += 1 if response.status_code >= 400 else 0
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+        metrics.total_latency += latency
+
+    logging.debug(
+        "%s %s: %s, sent %s bytes, received %s bytes in %.2fs",
+        request.method,
+        request.url,
+        response.status_code,
+        bytes_sent,
+        bytes_received,
+        latency,
+    )
+
+
+class ConnectionAborter:
+    """
+    Shuts down the connections a request opens when the task is canceled,
+    which aborts the request even while it is waiting for the response
+    """
+
+    def __init__(self, cancellation: CancellationToken):
+        self.cancellation = cancellation
+        self.lock = threading.Lock()
+        self.sockets: List[socket.socket] = []
+        cancellation.on_cancel(self.abort)
+
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        # Passed to httpcore as the trace extension of the request
+        if event_name != "connection.connect_tcp.complete":
+            return
+        sock = info["return_value"].get_extra_info("socket")
+        with self.lock:
+            self.sockets.append(sock)
+        if self.cancellation.is_canceled:
+            self.abort()
+
+    def abort(self):
+        with self.lock:
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # Already closed
+                pass
+
+    def close(self):
+        with self.lock:
+            self.sockets.clear()
+
+
+class RemoteBackendClient:
+    """
+    HTTP client for remote transcription servers, e.g. Ollama or an
+    OpenAI-compatible server.
+
+    Requests go through the pooled client of the server's host, and the result
+    of the health check is cached for HEALTH_TTL_SECS, so it is not repeated
+    for every chunk of a file.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        health_path: str = "/",
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.health_url = f"{self.base_url}{health_path}"
+        self.transport = transport
+        if transport is not None:
+            self.http_client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                transport=transport,
+                event_hooks={"request": [on_request], "response": [on_response]},
+            )
+        else:
+            self.http_client = get_http_client(self.base_url)
+
+    def is_healthy(self, ttl: float = HEALTH_TTL_SECS) -> bool:
+        with _lock:
+            cached = _health.get(self.health_url)
+        if cached is not None and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+
+        try:
+            response = self.http_client.get(
+                self.health_url, headers=self.headers, timeout=HEALTH_PROBE_TIMEOUT
+            )
+            healthy = response.status_code < 500
+        except httpx.TransportError as exc:
+            logging.error("Failed to connect to %s: %s", self.base_url, exc)
+            healthy = False
+
+        self.set_healthy(healthy)
+        return healthy
+
+    def set_healthy(self, healthy: bool):
+        with _lock:
+            _health[self.health_url] = (healthy, time.monotonic())
+
+    def post_file(
+        self,
+        path: str,
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        field: str = "file",
+        data: Optional[Dict[str, Any]] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> httpx.Response:
+        """
+        Uploads the file as multipart form data, read from disk in chunks while
+        sending. The request is aborted when the cancellation token is canceled,
+        also while it is waiting for the response.
+        """
+        http_client = self.http_client
+        aborter = None
+        if cancellation is not None and self.transport is None:
+            # A pooled connection cannot be shut down, the pool does not tell
+            # which one a request is sent on. The upload gets a connection of
+            # its own, the pool keeps its connections for the other requests.
+            http_client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                event_hooks={"request": [on_request], "response": [on_response]},
+            )
+            aborter = ConnectionAborter(cancellation)
+
+        with open(file_path, "rb") as file:
+            if cancellation is not None:
+                file = CancellableFile(file, cancellation)
+            try:
+                response = http_client.post(
+                    f"{self.base_url}{path}",
+                    headers=self.headers,
+                    files={field: (os.path.basename(file_path), file, content_type)},
+                    data=data,
+                    extensions={"trace": aborter.trace} if aborter is not None else {},
+                )
+            except httpx.TransportError:
+                if cancellation is not None and cancellation.is_canceled:
+                    raise Stopped
+                self.set_healthy(False)
+                raise
+            finally:
+                if aborter is not None:
+                    http_client.close()
+                    aborter.close()
+
+        self.set_healthy(response.status_code < 500)
+        return response
@@ -200,6 +200,12 @@ class FileTranscriptionTask:
     file_path: Optional[str] = None
     url: Optional[str] = None
     fraction_downloaded: float = 0.0
+    # Tasks with a higher priority are transcribed first
+    priority: int = 0
+    # Length of the media, once it has been probed
+    duration_ms: Optional[int] = None
+    # CPU threads allotted by the thread budget while the task runs
+    cpu_threads: Optional[int] = None
 
 
 class OutputFormat(enum.Enum):
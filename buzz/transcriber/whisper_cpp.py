@@ -2,7 +2,7 @@ import platform
 import os
 import ctypes
 import logging
-from typing import Union, Any, List
+from typing import Union, Any, List, Optional
 
 import numpy as np
 
@@ -130,9 +130,14 @@ class WhisperCpp:
         transcription_options: TranscriptionOptions,
         print_realtime=False,
         print_progress=False,
+        n_threads: Optional[int] = None,
     ):
         params = self.instance.full_default_params(whisper_cpp.WHISPER_SAMPLING_GREEDY)
-        params.n_threads = int(os.getenv("BUZZ_WHISPERCPP_N_THREADS", 4))
+        # The environment variable overrides the share of the thread budget.
+        # Past 8 threads, combining their results makes transcription slower
+        params.n_threads = int(
+            os.getenv("BUZZ_WHISPERCPP_N_THREADS", min(n_threads or 4, 8))
+        )
         params.print_realtime = print_realtime
         params.print_progress = print_progress
         params.language = self.instance.get_string((transcription_options.language or "en"))
@@ -161,6 +166,9 @@ class WhisperCppInterface:
     def get_new_segment_callback(self, callback):
         raise NotImplementedError
 
+    def get_abort_callback(self, callback):
+        raise NotImplementedError
+
     def init_from_file(self, model: str):
         raise NotImplementedError
 
@@ -196,6 +204,9 @@ class WhisperCppCpu(WhisperCppInterface):
     def get_new_segment_callback(self, callback):
         return whisper_cpp.whisper_new_segment_callback(callback)
 
+    def get_abort_callback(self, callback):
+        return whisper_cpp.ggml_abort_callback(callback)
+
     def init_from_file(self, model: str):
         return whisper_cpp.whisper_init_from_file(model.encode())
 
@@ -231,6 +242,9 @@ class WhisperCppCoreML(WhisperCppInterface):
     def get_new_segment_callback(self, callback):
         return whisper_cpp_coreml.whisper_new_segment_callback(callback)
 
+    def get_abort_callback(self, callback):
+        return whisper_cpp_coreml.ggml_abort_callback(callback)
+
     def init_from_file(self, model: str):
         return whisper_cpp_coreml.whisper_init_from_file(model.encode())
 
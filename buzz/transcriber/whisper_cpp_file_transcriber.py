@@ -6,6 +6,8 @@ from typing import Optional, List
 from PyQt6.QtCore import QObject
 
 from buzz import whisper_audio
+from buzz.media_probe import get_media_info
+from buzz.transcriber.checkpoint import TranscriptionCheckpoint
 from buzz.transcriber.file_transcriber import FileTranscriber
 from buzz.transcriber.transcriber import FileTranscriptionTask, Segment, Stopped
 from buzz.transcriber.whisper_cpp import WhisperCpp
@@ -13,22 +15,29 @@ from buzz.transcriber.whisper_cpp import WhisperCpp
 
 class WhisperCppFileTranscriber(FileTranscriber):
     duration_audio_ms = sys.maxsize  # max int
+    # Position in the file the audio passed to whisper.cpp starts at
+    offset_ms = 0
     state: "WhisperCppFileTranscriber.State"
 
     class State:
         running = True
 
     def __init__(
-        self, task: FileTranscriptionTask, parent: Optional["QObject"] = None
+        self,
+        task: FileTranscriptionTask,
+        parent: Optional["QObject"] = None,
+        model: Optional[WhisperCpp] = None,
     ) -> None:
         super().__init__(task, parent)
 
         self.transcription_options = task.transcription_options
         self.model_path = task.model_path
-        self.model = WhisperCpp(model=self.model_path)
+        # A loaded model can be passed in to reuse it for several files
+        self.model = model or WhisperCpp(model=self.model_path)
         self.state = self.State()
 
     def transcribe(self) -> List[Segment]:
+        self.cancellation.raise_if_canceled()
         self.state.running = True
 
         logging.debug(
@@ -41,11 +50,39 @@ class WhisperCppFileTranscriber(FileTranscriber):
             self.transcription_options.word_level_timings,
         )
 
-        audio = whisper_audio.load_audio(self.transcription_task.file_path)
-        self.duration_audio_ms = len(audio) * 1000 / whisper_audio.SAMPLE_RATE
+        # The duration is only needed for the progress, read it from the header
+        # instead of decoding the whole file
+        duration_ms = get_media_info(self.transcription_task.file_path).duration_ms
+        if duration_ms is None:
+            audio = whisper_audio.load_audio(self.transcription_task.file_path)
+            duration_ms = len(audio) * 1000 / whisper_audio.SAMPLE_RATE
+        self.duration_audio_ms = duration_ms
+
+        # The file path of URL imports is only known once they are downloaded
+        self.checkpoint = TranscriptionCheckpoint(
+            self.transcription_task.file_path,
+            options={
+                "engine": "whisper_cpp",
+                "model": self.model_path,
+                "task": self.transcription_options.task,
+                "language": self.transcription_options.language,
+                "temperature": self.transcription_options.temperature,
+                "initial_prompt": self.transcription_options.initial_prompt,
+                "word_level_timings": self.transcription_options.word_level_timings,
+            },
+        )
+        restored_segments, self.offset_ms = self.checkpoint.load()
+        if len(restored_segments) > 0:
+            self.new_segments.emit(restored_segments)
+
+        audio = self.transcription_task.file_path
+        if self.offset_ms > 0:
+            audio = whisper_audio.load_audio(self.transcription_task.file_path)
+            audio = audio[int(self.offset_ms * whisper_audio.SAMPLE_RATE / 1000):]
 
         whisper_params = self.model.get_params(
-            transcription_options=self.transcription_options
+            transcription_options=self.transcription_options,
+            n_threads=self.transcription_task.cpu_threads,
         )
         whisper_params.encoder_begin_callback_user_data = ctypes.c_void_p(
             id(self.state)
@@ -57,29 +94,71 @@ class WhisperCppFileTranscriber(FileTranscriber):
         whisper_params.new_segment_callback = self.model.get_instance().get_new_segment_callback(
             self.new_segment_callback
         )
+        # The encoder callback is only called once per 30s window, the abort
+        # callback of newer bindings is also called between the ggml graph
+        # computations, so a canceled task stops within CANCEL_TIMEOUT_SECS
+        if hasattr(whisper_params, "abort_callback"):
+            whisper_params.abort_callback_user_data = ctypes.c_void_p(id(self.state))
+            whisper_params.abort_callback = self.model.get_instance().get_abort_callback(
+                self.abort_callback
+            )
 
-        result = self.model.transcribe(
-            audio=self.transcription_task.file_path, params=whisper_params
-        )
+        result = self.model.transcribe(audio=audio, params=whisper_params)
 
         if not self.state.running:
+            # Lets a canceled task continue from here when it is run again
+            self.checkpoint.save()
             raise Stopped
 
         self.state.running = False
-        return result["segments"]
+        self.checkpoint.clear()
+
+        for segment in result["segments"]:
+            segment.start += self.offset_ms
+            segment.end += self.offset_ms
+        return restored_segments + result["segments"]
 
-    def new_segment_callback(self, ctx, _state, _n_new, user_data):
+    def new_segment_callback(self, ctx, _state, n_new, user_data):
         n_segments = self.model.get_instance().full_n_segments(ctx)
         t1 = self.model.get_instance().full_get_segment_t1(ctx, n_segments - 1)
         # t1 seems to sometimes be larger than the duration when the
         # audio ends in silence. Trim to fix the displayed progress.
-        progress = min(t1 * 10, self.duration_audio_ms)
+        progress = min(t1 * 10 + self.offset_ms, self.duration_audio_ms)
         state: WhisperCppFileTranscriber.State = ctypes.cast(
             user_data, ctypes.py_object
         ).value
         if state.running:
             self.progress.emit((progress, self.duration_audio_ms))
 
+            # With word-level timings the tokens are only merged into
+            # words after the whole file is transcribed
+            if not self.transcription_options.word_level_timings:
+                new_segments = self.get_new_segments(ctx, n_segments, n_new)
+                self.checkpoint.add_segments(
+                    new_segments, offset_ms=t1 * 10 + self.offset_ms
+                )
+                self.new_segments.emit(new_segments)
+
+    def get_new_segments(self, ctx, n_segments: int, n_new: int) -> List[Segment]:
+        instance = self.model.get_instance()
+        segments = []
+        for i in range(n_segments - n_new, n_segments):
+            try:
+                text = instance.full_get_segment_text(ctx, i).decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            if text == "":
+                continue
+            segments.append(
+                Segment(
+                    # centisecond to ms
+                    start=instance.full_get_segment_t0(ctx, i) * 10 + self.offset_ms,
+                    end=instance.full_get_segment_t1(ctx, i) * 10 + self.offset_ms,
+                    text=text.strip(),
+                )
+            )
+        return segments
+
     @staticmethod
     def encoder_begin_callback(_ctx, _state, user_data):
         state: WhisperCppFileTranscriber.State = ctypes.cast(
@@ -87,5 +166,13 @@ class WhisperCppFileTranscriber(FileTranscriber):
         ).value
         return state.running == 1
 
+    @staticmethod
+    def abort_callback(user_data) -> bool:
+        state: WhisperCppFileTranscriber.State = ctypes.cast(
+            user_data, ctypes.py_object
+        ).value
+        return not state.running
+
     def stop(self):
+        super().stop()
         self.state.running = False
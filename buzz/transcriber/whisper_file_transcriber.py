@@ -10,7 +10,7 @@ import platform
 from platformdirs import user_cache_dir
 from multiprocessing.connection import Connection
 from threading import Thread
-from typing import Optional, List
+from typing import Optional, List, Any
 from buzz.assets import get_models_path
 
 import tqdm
@@ -19,9 +19,16 @@ from PyQt6.QtCore import QObject
 from buzz import whisper_audio
 from buzz.conn import pipe_stderr
 from buzz.model_loader import ModelType, WhisperModelSize
+from buzz.thread_budget import limit_process_threads
 from buzz.transformers_whisper import TransformersWhisper
+from buzz.transcriber.cancellation import (
+    CancellationToken,
+    CANCEL_POLL_SECS,
+    CANCEL_TIMEOUT_SECS,
+)
+from buzz.transcriber.checkpoint import TranscriptionCheckpoint
 from buzz.transcriber.file_transcriber import FileTranscriber
-from buzz.transcriber.transcriber import FileTranscriptionTask, Segment
+from buzz.transcriber.transcriber import FileTranscriptionTask, Segment, Stopped
 
 import faster_whisper
 import whisper
@@ -45,8 +52,10 @@ class WhisperFileTranscriber(FileTranscriber):
     ) -> None:
         super().__init__(task, parent)
         self.segments = []
+        self.error_lines = []
         self.started_process = False
-        self.stopped = False
+        # Shared with the transcription process, which stops at the next segment
+        self.cancellation = CancellationToken(multiprocessing.Event())
 
     def transcribe(self) -> List[Segment]:
         time_started = datetime.datetime.now()
@@ -60,16 +69,17 @@ class WhisperFileTranscriber(FileTranscriber):
         recv_pipe, send_pipe = multiprocessing.Pipe(duplex=False)
 
         self.current_process = multiprocessing.Process(
-            target=self.transcribe_whisper, args=(send_pipe, self.transcription_task)
+            target=self.transcribe_whisper,
+            args=(send_pipe, self.transcription_task, self.cancellation.event),
         )
-        if not self.stopped:
-            self.current_process.start()
-            self.started_process = True
+        self.cancellation.raise_if_canceled()
+        self.current_process.start()
+        self.started_process = True
 
         self.read_line_thread = Thread(target=self.read_line, args=(recv_pipe,))
         self.read_line_thread.start()
 
-        self.current_process.join()
+        self.join_process()
 
         if self.current_process.exitcode != 0:
             send_pipe.close()
@@ -84,6 +94,8 @@ class WhisperFileTranscriber(FileTranscriber):
             len(self.segments),
         )
 
+        self.cancellation.raise_if_canceled()
+
         if self.current_process.exitcode != 0:
             if self.error_lines:
                 error_message = "Transcription process failed with the following errors:\n" + "\n".join(self.error_lines)
@@ -93,11 +105,32 @@ class WhisperFileTranscriber(FileTranscriber):
 
         return self.segments
 
+    def join_process(self):
+        """
+        Waits for the transcription process. When the task is canceled, the
+        process gets CANCEL_TIMEOUT_SECS to save its checkpoint and exit, and is
+        terminated if it is still busy, e.g. loading the model.
+        """
+        while self.current_process.is_alive():
+            if self.cancellation.is_canceled:
+                self.current_process.join(timeout=CANCEL_TIMEOUT_SECS)
+                if self.current_process.is_alive():
+                    logging.debug("Terminating canceled whisper process")
+                    self.current_process.terminate()
+                self.current_process.join()
+                return
+            self.current_process.join(timeout=CANCEL_POLL_SECS)
+
     @classmethod
     def transcribe_whisper(
-        cls, stderr_conn: Connection, task: FileTranscriptionTask
+        cls,
+        stderr_conn: Connection,
+        task: FileTranscriptionTask,
+        cancel_event: Optional[Any] = None,
     ) -> None:
         print(f"transcribe_whisper_model_type: {task.transcription_options.model.model_type}")
+        if task.cpu_threads is not None:
+            limit_process_threads(task.cpu_threads)
         with pipe_stderr(stderr_conn):
             if task.transcription_options.model.model_type == ModelType.HUGGING_FACE:
                 sys.stderr.write("0%\n")
@@ -106,7 +139,9 @@ class WhisperFileTranscriber(FileTranscriber):
             elif (
                 task.transcription_options.model.model_type == ModelType.FASTER_WHISPER
             ):
-                segments = cls.transcribe_faster_whisper(task)
+                segments = cls.transcribe_faster_whisper(
+                    task, cancellation=CancellationToken(cancel_event)
+                )
             elif task.transcription_options.model.model_type == ModelType.WHISPER:
                 segments = cls.transcribe_openai_whisper(task)
             else:
@@ -120,9 +155,12 @@ class WhisperFileTranscriber(FileTranscriber):
             sys.stderr.write(WhisperFileTranscriber.READ_LINE_THREAD_STOP_TOKEN + "\n")
 
     @classmethod
-    def transcribe_hugging_face(cls, task: FileTranscriptionTask) -> List[Segment]:
+    def transcribe_hugging_face(
+        cls, task: FileTranscriptionTask, model: Optional[TransformersWhisper] = None
+    ) -> List[Segment]:
         print(f"transcribe_hugging_face.model_path: {task.model_path}")
-        model = TransformersWhisper(task.model_path)
+        if model is None:
+            model = TransformersWhisper(task.model_path)
         language = (
             task.transcription_options.language
             if task.transcription_options.language is not None
@@ -144,16 +182,19 @@ class WhisperFileTranscriber(FileTranscriber):
             for segment in result.get("segments")
         ]
 
-    @classmethod
-    def transcribe_faster_whisper(cls, task: FileTranscriptionTask) -> List[Segment]:
-        print(f"transcribe_faster_whisper.model_path: {task.model_path}")
+    @staticmethod
+    def get_faster_whisper_model_size_or_path(task: FileTranscriptionTask) -> str:
         if task.transcription_options.model.whisper_model_size == WhisperModelSize.CUSTOM:
-            model_size_or_path = task.transcription_options.model.hugging_face_model_id
+            return task.transcription_options.model.hugging_face_model_id
         elif task.transcription_options.model.whisper_model_size == WhisperModelSize.LARGEV3TURBO:
-            model_size_or_path = "deepdml/faster-whisper-large-v3-turbo-ct2"
+            return "deepdml/faster-whisper-large-v3-turbo-ct2"
         else:
-            model_size_or_path = task.transcription_options.model.whisper_model_size.to_faster_whisper_model_size()
+            return task.transcription_options.model.whisper_model_size.to_faster_whisper_model_size()
 
+    @classmethod
+    def load_faster_whisper_model(
+        cls, task: FileTranscriptionTask
+    ) -> faster_whisper.WhisperModel:
         #model_root_dir = user_cache_dir("Buzz")
         #model_root_dir = os.path.join(model_root_dir, "models")
         model_root_dir = get_models_path()
@@ -168,11 +209,44 @@ class WhisperFileTranscriber(FileTranscriber):
             logging.debug("Unsupported CUDA version (<12), using CPU")
             device = "cpu"
 
-        model = faster_whisper.WhisperModel(
-            model_size_or_path=model_size_or_path,
+        return faster_whisper.WhisperModel(
+            model_size_or_path=cls.get_faster_whisper_model_size_or_path(task),
             download_root=model_root_dir,
             device=device,
+            # 0 uses the default of CTranslate2
+            cpu_threads=task.cpu_threads or 0,
         )
+
+    @classmethod
+    def transcribe_faster_whisper(
+        cls,
+        task: FileTranscriptionTask,
+        model: Optional[faster_whisper.WhisperModel] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> List[Segment]:
+        print(f"transcribe_faster_whisper.model_path: {task.model_path}")
+        cancellation = cancellation or CancellationToken()
+        model_size_or_path = cls.get_faster_whisper_model_size_or_path(task)
+        if model is None:
+            model = cls.load_faster_whisper_model(task)
+
+        checkpoint = TranscriptionCheckpoint(
+            task.file_path,
+            options={
+                "engine": "faster_whisper",
+                "model": model_size_or_path,
+                "task": task.transcription_options.task,
+                "language": task.transcription_options.language,
+                "temperature": task.transcription_options.temperature,
+                "initial_prompt": task.transcription_options.initial_prompt,
+                "word_level_timings": task.transcription_options.word_level_timings,
+            },
+        )
+        segments, offset_ms = checkpoint.load()
+        if len(segments) > 0:
+            segments_json = json.dumps(segments, ensure_ascii=True, default=vars)
+            sys.stderr.write(f"new_segments = {segments_json}\n")
+
         whisper_segments, info = model.transcribe(
             audio=task.file_path,
             language=task.transcription_options.language,
@@ -180,41 +254,68 @@ class WhisperFileTranscriber(FileTranscriber):
             temperature=task.transcription_options.temperature,
             initial_prompt=task.transcription_options.initial_prompt,
             word_timestamps=task.transcription_options.word_level_timings,
+            # Skips the audio transcribed before the checkpoint, the
+            # timestamps of the segments stay relative to the whole file
+            clip_timestamps=[offset_ms / 1000] if offset_ms > 0 else "0",
         )
-        segments = []
-        with tqdm.tqdm(total=round(info.duration, 2), unit=" seconds") as pbar:
-            for segment in list(whisper_segments):
+        with tqdm.tqdm(
+            total=round(info.duration, 2),
+            initial=round(offset_ms / 1000, 2),
+            unit=" seconds",
+        ) as pbar:
+            # whisper_segments is a generator, segments are decoded while iterating
+            for segment in whisper_segments:
+                if cancellation.is_canceled:
+                    # Resumed from here when the task is run again
+                    checkpoint.save()
+                    raise Stopped
+
                 # Segment will contain words if word-level timings is True
                 if segment.words:
-                    for word in segment.words:
-                        segments.append(
-                            Segment(
-                                start=int(word.start * 1000),
-                                end=int(word.end * 1000),
-                                text=word.word,
-                                translation=""
-                            )
+                    new_segments = [
+                        Segment(
+                            start=int(word.start * 1000),
+                            end=int(word.end * 1000),
+                            text=word.word,
+                            translation=""
                         )
+                        for word in segment.words
+                    ]
                 else:
-                    segments.append(
+                    new_segments = [
                         Segment(
                             start=int(segment.start * 1000),
                             end=int(segment.end * 1000),
                             text=segment.text,
                             translation=""
                         )
-                    )
+                    ]
+                segments.extend(new_segments)
+                checkpoint.add_segments(new_segments, offset_ms=int(segment.end * 1000))
+
+                new_segments_json = json.dumps(new_segments, ensure_ascii=True, default=vars)
+                sys.stderr.write(f"new_segments = {new_segments_json}\n")
 
                 pbar.update(segment.end - segment.start)
+
+        checkpoint.clear()
         return segments
 
     @classmethod
-    def transcribe_openai_whisper(cls, task: FileTranscriptionTask) -> List[Segment]:
-        logging.info(f"transcribe_openai_whisper.model_path: {task.model_path}")
+    def load_openai_whisper_model(cls, task: FileTranscriptionTask) -> whisper.Whisper:
         device = "cuda" if torch.cuda.is_available() else "cpu"
         model = whisper.load_model(task.model_path, device=device)
+        stable_whisper.modify_model(model)
+        return model
+
+    @classmethod
+    def transcribe_openai_whisper(
+        cls, task: FileTranscriptionTask, model: Optional[whisper.Whisper] = None
+    ) -> List[Segment]:
+        logging.info(f"transcribe_openai_whisper.model_path: {task.model_path}")
+        if model is None:
+            model = cls.load_openai_whisper_model(task)
         if task.transcription_options.word_level_timings:
-            stable_whisper.modify_model(model)
             result: WhisperResult = model.transcribe(
                 audio=whisper_audio.load_audio(task.file_path),
                 language=task.transcription_options.language,
@@ -232,7 +333,6 @@ class WhisperFileTranscriber(FileTranscriber):
                 for segment in result.segments
                 for word in segment.words
             ]
-        stable_whisper.modify_model(model)
         result: WhisperResult = model.transcribe(
             # audio=task.file_path,
             audio=whisper_audio.load_audio(task.file_path),
@@ -254,11 +354,6 @@ class WhisperFileTranscriber(FileTranscriber):
             for segment in segments
         ]
 
-    def stop(self):
-        self.stopped = True
-        if self.started_process:
-            self.current_process.terminate()
-
     def read_line(self, pipe: Connection):
         while True:
             try:
@@ -281,6 +376,19 @@ class WhisperFileTranscriber(FileTranscriber):
                     for segment in segments_dict
                 ]
                 self.segments = segments
+            elif line.startswith("new_segments = "):
+                segments_dict = json.loads(line[15:])
+                self.new_segments.emit(
+                    [
+                        Segment(
+                            start=segment.get("start"),
+                            end=segment.get("end"),
+                            text=segment.get("text").strip(),
+                            translation=""
+                        )
+                        for segment in segments_dict
+                    ]
+                )
             else:
                 try:
                     match = PROGRESS_REGEX.search(line)
@@ -0,0 +1,162 @@
+import enum
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Callable
+from uuid import UUID
+
+from buzz.transcriber.transcriber import FileTranscriptionTask
+
+# Waiting this long raises a task's priority by one, so long tasks are not
+# starved by a steady stream of short or high priority ones
+DEFAULT_AGING_INTERVAL_SECS = 10 * 60
+
+
+class SchedulingPolicy(enum.Enum):
+    FIFO = "fifo"
+    SHORTEST_FIRST = "sjf"
+
+
+@dataclass
+class ScheduledTask:
+    task: FileTranscriptionTask
+    sequence: int
+    enqueued_at: float
+
+
+class TaskScheduler:
+    """
+    Queue of transcription tasks ordered by priority.
+
+    Tasks with a higher priority run first. Within the same priority they run
+    in the order they were added or, with the shortest-first policy, shortest
+    media first. Tasks without a known duration run after the ones with one.
+    A task gains one priority level for every aging interval it has waited.
+
+    Supports the put() and get() calls of queue.Queue; putting None makes
+    get() return None, which stops the worker.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[SchedulingPolicy] = None,
+        aging_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.policy = policy or SchedulingPolicy(
+            os.getenv("BUZZ_QUEUE_POLICY", SchedulingPolicy.FIFO.value)
+        )
+        self.aging_interval = aging_interval or float(
+            os.getenv("BUZZ_QUEUE_AGING_SECS", DEFAULT_AGING_INTERVAL_SECS)
+        )
+        self.clock = clock
+        self.entries: List[ScheduledTask] = []
+        self.sequence = itertools.count()
+        self.stopped = False
+        self.condition = threading.Condition()
+
+    def put(self, task: Optional[FileTranscriptionTask]):
+        with self.condition:
+            if task is None:
+                self.stopped = True
+            else:
+                self.entries.append(
+                    ScheduledTask(
+                        task=task, sequence=next(self.sequence), enqueued_at=self.clock()
+                    )
+                )
+            self.condition.notify()
+
+    def get(self) -> Optional[FileTranscriptionTask]:
+        """Removes and returns the next task, blocking until there is one"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.stopped or len(self.entries) > 0)
+            if self.stopped:
+                self.stopped = False
+                return None
+
+            entry = min(self.entries, key=self.sort_key)
+            self.entries.remove(entry)
+            logging.debug(
+                "Scheduling task %s, priority = %s, duration = %s, waited = %.0fs",
+                entry.task.uid,
+                entry.task.priority,
+                entry.task.duration_ms,
+                self.clock() - entry.enqueued_at,
+            )
+            return entry.task
+
+    def effective_priority(self, entry: ScheduledTask) -> int:
+        waited = self.clock() - entry.enqueued_at
+        return entry.task.priority + int(waited // self.aging_interval)
+
+    def sort_key(self, entry: ScheduledTask):
+        priority = self.effective_priority(entry)
+
+        duration = 0
+        if self.policy == SchedulingPolicy.SHORTEST_FIRST:
+            duration = entry.task.duration_ms if entry.task.duration_ms else math.inf
+
+        return -priority, duration, entry.sequence
+
+    def tasks(self) -> List[FileTranscriptionTask]:
+        """Queued tasks in the order they would run now"""
+        with self.condition:
+            return [entry.task for entry in sorted(self.entries, key=self.sort_key)]
+
+    def find(self, task_id: UUID) -> Optional[FileTranscriptionTask]:
+        with self.condition:
+            return next(
+                (entry.task for entry in self.entries if entry.task.uid == task_id),
+                None,
+            )
+
+    def set_priority(self, task_id: UUID, priority: int) -> bool:
+        with self.condition:
+            task = self.find(task_id)
+            if task is None:
+                return False
+            task.priority = priority
+            return True
+
+    def move_to_front(self, task_id: UUID) -> bool:
+        with self.condition:
+            entry = next(
+                (entry for entry in self.entries if entry.task.uid == task_id), None
+            )
+            if entry is None:
+                return False
+
+            highest = max(
+                (self.effective_priority(other) for other in self.entries if other is not entry),
+                default=entry.task.priority - 1,
+            )
+            aging = self.effective_priority(entry) - entry.task.priority
+            entry.task.priority = max(entry.task.priority, highest + 1 - aging)
+            return True
+
+    def remove(self, task_id: UUID) -> Optional[FileTranscriptionTask]:
+        with self.condition:
+            entry = next(
+                (entry for entry in self.entries if entry.task.uid == task_id), None
+            )
+            if entry is None:
+                return None
+            self.entries.remove(entry)
+            return entry.task
+
+    def set_duration(self, task_id: UUID, duration_ms: int) -> bool:
+        with self.condition:
+            task = self.find(task_id)
+            if task is None:
+                return False
+            task.duration_ms = duration_ms
+            return True
+
+    def qsize(self) -> int:
+        with self.condition:
+            return len(self.entries)
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_MODEL = "llama3.1:8b"
+OLLAMA_KEEP_ALIVE = "30m"
+
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=120.0, write=30.0, pool=10.0)
+HEALTH_PROBE_TIMEOUT = httpx.Timeout(3.0)
+# Loading a model from disk can take a while on the first request
+WARM_UP_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=8, max_keepalive_connections=4, keepalive_expiry=120.0
+)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TranslationClientError(Exception):
+    pass
+
+
+class RetryableStatusError(TranslationClientError):
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"{status_code} - {text}")
+        self.status_code = status_code
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        # "Full jitter" backoff, so that retries from several translators
+        # do not hit the server at the same moment
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass
+class ChatResponse:
+    content: str
+    # Extra fields reported by the server with the final chunk, e.g. token counts
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+class TranslationClient:
+    """
+    Async chat client for LLM translation providers.
+
+    A client keeps one pooled httpx.AsyncClient, so consecutive segments reuse
+    the same keep-alive connection. The pool is bound to the event loop it was
+    first used on; translators run their own loop in their worker thread.
+    """
+
+    health_path = "/"
+    # None until the first health probe or request finishes
+    is_available: Optional[bool] = None
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        retry_policy: Optional[RetryPolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.limits = limits
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._health_probe_thread: Optional[threading.Thread] = None
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        on_partial: Optional[Callable[[str], None]] = None,
+        **options,
+    ) -> ChatResponse:
+        """Streams a chat completion, calling on_partial with the text received so far"""
+        attempt = 0
+        while True:
+            try:
+                response = await self._chat(model, messages, on_partial, **options)
+                self.is_available = True
+                return response
+            except (httpx.TransportError, RetryableStatusError) as exc:
+                attempt += 1
+                if isinstance(exc, httpx.ConnectError):
+                    self.is_available = False
+                if attempt >= self.retry_policy.max_attempts:
+                    raise TranslationClientError(
+                        f"Translation request failed after {attempt} attempts: {exc}"
+                    ) from exc
+
+                delay = self.retry_policy.delay(attempt)
+                logging.debug(
+                    "Translation request failed (%s), retrying in %.2fs", exc, delay
+                )
+                await asyncio.sleep(delay)
+
+    async def _chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        on_partial: Optional[Callable[[str], None]],
+        **options,
+    ) -> ChatResponse:
+        raise NotImplementedError
+
+    async def _raise_for_status(self, response: httpx.Response):
+        if response.status_code == 200:
+            return
+        text = (await response.aread()).decode("utf-8", errors="replace")
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableStatusError(response.status_code, text)
+        raise TranslationClientError(f"{response.status_code} - {text}")
+
+    def start_health_probe(self):
+        """Checks the server in a background thread and updates is_available"""
+        if self._health_probe_thread is not None and self._health_probe_thread.is_alive():
+            return
+        self._health_probe_thread = threading.Thread(
+            target=self.probe_health, daemon=True
+        )
+        self._health_probe_thread.start()
+
+    def probe_health(self) -> bool:
+        try:
+            response = httpx.get(
+                f"{self.base_url}{self.health_path}",
+                headers=self.headers,
+                timeout=HEALTH_PROBE_TIMEOUT,
+            )
+            self.is_available = response.status_code == 200
+            logging.debug(
+                "Translation server status check %s: %s",
+                self.base_url,
+                response.status_code,
+            )
+        except httpx.HTTPError as exc:
+            logging.error(
+                "Failed to connect to translation server %s: %s", self.base_url, exc
+            )
+            self.is_available = False
+        return self.is_available
+
+    def start_warm_up(self, model: str, **options):
+        """Loads the model on the server in a background thread"""
+        if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+            return
+        self._warm_up_thread = threading.Thread(
+            target=self.ensure_model_loaded, args=(model,), kwargs=options, daemon=True
+        )
+        self._warm_up_thread.start()
+
+    def ensure_model_loaded(self, model: str, **options) -> bool:
+        # Hosted APIs have nothing to preload
+        return True
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OllamaTranslationClient(TranslationClient):
+    # Whether the model was in memory the last time it was checked
+    model_loaded: Optional[bool] = None
+
+    def running_models(self) -> List[str]:
+        """Names of the models Ollama currently has in memory"""
+        response = httpx.get(
+            f"{self.base_url}/api/ps", headers=self.headers, timeout=HEALTH_PROBE_TIMEOUT
+        )
+        response.raise_for_status()
+        return [model["name"] for model in response.json().get("models", [])]
+
+    def is_model_loaded(self, model: str) -> Optional[bool]:
+        try:
+            running_models = self.running_models()
+        except httpx.HTTPError as exc:
+            logging.debug("Failed to list running Ollama models: %s", exc)
+            return None
+
+        # Ollama adds the default tag to model names without one
+        names = {model, model if ":" in model else f"{model}:latest"}
+        self.model_loaded = len(names.intersection(running_models)) > 0
+        return self.model_loaded
+
+    def ensure_model_loaded(self, model: str, **options) -> bool:
+        if self.is_model_loaded(model):
+            logging.debug("Ollama model %s is already loaded", model)
+            return True
+        return self.warm_up(model, **options)
+
+    def warm_up(self, model: str, **options) -> bool:
+        """Sends a chat request without messages, which only loads the model"""
+        started = time.monotonic()
+        try:
+            response = httpx.post(
+                f"{self.base_url}/api/chat",
+                headers=self.headers,
+                json={"model": model, "messages": [], **options},
+                timeout=WARM_UP_TIMEOUT,
+            )
+        except httpx.HTTPError as exc:
+            logging.error("Failed to load Ollama model %s: %s", model, exc)
+            self.is_available = False
+            return False
+
+        self.is_available = True
+        if response.status_code != 200:
+            logging.error(
+                "Failed to load Ollama model %s: %s - %s",
+                model,
+                response.status_code,
+                response.text,
+            )
+            return False
+
+        self.model_loaded = True
+        logging.debug(
+            "Loaded Ollama model %s in %.2fs", model, time.monotonic() - started
+        )
+        return True
+
+    async def _chat(self, model, messages, on_partial, **options) -> ChatResponse:
+        data = {"model": model, "messages": messages, "stream": True, **options}
+
+        content = ""
+        metrics: Dict[str, Any] = {}
+        started = time.monotonic()
+        first_token_latency = None
+        async with self.client.stream("POST", "/api/chat", json=data) as response:
+            await self._raise_for_status(response)
+
+            # Ollama streams newline-delimited JSON objects, the last one
+            # has "done" set and carries the token counts and durations
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise TranslationClientError(chunk["error"])
+
+                content += chunk.get("message", {}).get("content", "")
+                if first_token_latency is None and content:
+                    first_token_latency = time.monotonic() - started
+                if on_partial is not None and not chunk.get("done"):
+                    on_partial(content)
+
+                if chunk.get("done"):
+                    metrics = {
+                        key: value
+                        for key, value in chunk.items()
+                        if key not in {"message", "done"}
+                    }
+
+        metrics["first_token_latency"] = first_token_latency
+        return ChatResponse(content=content, metrics=metrics)
+
+
+class OpenAICompatibleTranslationClient(TranslationClient):
+    health_path = "/models"
+
+    def __init__(self, base_url: str, api_key: Optional[str], **kwargs):
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        super().__init__(base_url=base_url or OPENAI_BASE_URL, headers=headers, **kwargs)
+
+    async def _chat(self, model, messages, on_partial, **options) -> ChatResponse:
+        data = {"model": model, "messages": messages, "stream": True, **options}
+
+        content = ""
+        metrics: Dict[str, Any] = {}
+        started = time.monotonic()
+        first_token_latency = None
+        async with self.client.stream(
+            "POST", "/chat/completions", json=data
+        ) as response:
+            await self._raise_for_status(response)
+
+            # Some servers and proxies ignore "stream" and reply with the
+            # whole completion at once
+            content_type = response.headers.get("content-type", "")
+            if content_type.split(";")[0].strip() == "application/json":
+                body = json.loads(await response.aread())
+                choices = body.get("choices") or [{}]
+                content = (choices[0].get("message") or {}).get("content") or ""
+                if content == "":
+                    raise TranslationClientError(f"Response has no content: {body}")
+                metrics = body.get("usage") or {}
+                if on_partial is not None:
+                    on_partial(content)
+                return ChatResponse(
+                    content=content,
+                    metrics={
+                        **metrics,
+                        "first_token_latency": time.monotonic() - started,
+                    },
+                )
+
+            # Server-sent events, one "data: {...}" line per chunk
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                # Keep reading instead of breaking out of the stream,
+                # so the response is closed and the connection reused
+                if payload == "[DONE]":
+                    continue
+
+                chunk = json.loads(payload)
+                if chunk.get("usage"):
+                    metrics = chunk["usage"]
+                for choice in chunk.get("choices", []):
+                    delta = choice.get("delta") or choice.get("message") or {}
+                    content += delta.get("content") or ""
+
+                if first_token_latency is None and content:
+                    first_token_latency = time.monotonic() - started
+                if on_partial is not None and content:
+                    on_partial(content)
+
+        if content == "":
+            raise TranslationClientError("Stream ended without any content")
+
+        metrics = {**metrics, "first_token_latency": first_token_latency}
+        return ChatResponse(content=content, metrics=metrics)
+
+
+def warm_up_translation_model() -> Optional[OllamaTranslationClient]:
+    """
+    Loads the Ollama translation model in the background, so that the first
+    translated segment does not wait for the model to be loaded from disk
+    """
+    if os.getenv("TRANSLATION_PROVIDER", "OLLAMA") != "OLLAMA":
+        return None
+
+    client = OllamaTranslationClient(
+        base_url=os.getenv("OLLAMA_BASE_URL", OLLAMA_BASE_URL)
+    )
+    client.start_warm_up(
+        os.getenv("OLLAMA_MODEL", OLLAMA_MODEL),
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", OLLAMA_KEEP_ALIVE),
+    )
+    return client
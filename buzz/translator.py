@@ -1,14 +1,18 @@
 import os
+import asyncio
 import logging
 import queue
 
 from typing import Optional, Union
-from openai import OpenAI
 from PyQt6.QtCore import QObject, pyqtSignal
 
 from buzz.settings.settings import Settings
 from buzz.store.keyring_store import get_password, Key
 from buzz.transcriber.transcriber import TranscriptionOptions
+from buzz.translation_client import (
+    OpenAICompatibleTranslationClient,
+    OllamaTranslationClient,
+)
 from buzz.widgets.transcriber.advanced_settings_dialog import AdvancedSettingsDialog
 from buzz.ollama_translator import OllamaTranslator
 # import keyring
@@ -17,6 +21,8 @@ load_dotenv()
 
 class Translator(QObject):
     translation = pyqtSignal(str, int)
+    # Text received so far for a translation that is still streaming
+    partial_translation = pyqtSignal(str, int)
     finished = pyqtSignal()
     is_running = False
 
@@ -25,6 +31,7 @@ class Translator(QObject):
         transcription_options: TranscriptionOptions,
         advanced_settings_dialog: AdvancedSettingsDialog,
         parent: Optional[QObject] = None,
+        ollama_client: Optional[OllamaTranslationClient] = None,
     ) -> None:
         super().__init__(parent)
 
@@ -51,9 +58,10 @@ class Translator(QObject):
             self.ollama_translator = OllamaTranslator(
                 transcription_options=transcription_options,
                 advanced_settings_dialog=advanced_settings_dialog,
-                parent=parent
+                parent=parent,
+                client=ollama_client,
             )
-            self.openai_client = None
+            self.client = None
             logging.debug("Ollama translator initialized")
         else:  # Default to OpenAI
             self.ollama_translator = None
@@ -71,18 +79,12 @@ class Translator(QObject):
             # )
             custom_openai_base_url = settings.value(key=Settings.Key.CUSTOM_OPENAI_BASE_URL, default_value="")
             openai_api_key = get_password(Key.OPENAI_API_KEY)
-            # Initialize OpenAI client with proper error handling
-            try:
-                self.openai_client = OpenAI(
-                    api_key=openai_api_key,
-                    base_url=custom_openai_base_url if custom_openai_base_url else None
-                )
-                logging.debug("OpenAI client initialized successfully")
-            except TypeError as e:
-                logging.warning(f"Error initializing OpenAI client: {e}")
-                # Fall back to a simpler initialization if there's a TypeError (likely due to proxies)
-                self.openai_client = None
-                logging.warning("OpenAI client disabled due to initialization error")
+            self.client = OpenAICompatibleTranslationClient(
+                base_url=custom_openai_base_url,
+                api_key=openai_api_key,
+            )
+            self.client.start_health_probe()
+            logging.debug("OpenAI translation client initialized")
 
     def start(self):
         logging.debug("Starting translation queue")
@@ -91,45 +93,56 @@ class Translator(QObject):
         if self.translation_provider == "OLLAMA" and self.ollama_translator:
             logging.debug("Delegating to Ollama translator")
             self.ollama_translator.translation.connect(self.translation.emit)
+            self.ollama_translator.partial_translation.connect(self.partial_translation.emit)
             self.ollama_translator.start()
+            self.finished.emit()
             return
             
-        # Otherwise use the OpenAI client
+        # Otherwise use the OpenAI-compatible client
         self.is_running = True
+        loop = asyncio.new_event_loop()
 
         while self.is_running:
-            try:
-                transcript, transcript_id = self.queue.get(timeout=1)
-            except queue.Empty:
-                continue
+            item = self.queue.get()
 
-            # Check if OpenAI client is available
-            if self.openai_client is None:
-                logging.warning("OpenAI client is not available. Skipping translation.")
-                next_translation = transcript  # Use original text as fallback
-            else:
-                try:
-                    completion = self.openai_client.chat.completions.create(
+            # stop() puts None on the queue to wake up the loop
+            if item is None:
+                break
+
+            transcript, transcript_id = item
+
+            if self.client.is_available is False:
+                # Check again in the background, the server may have come back
+                self.client.start_health_probe()
+
+            try:
+                response = loop.run_until_complete(
+                    self.client.chat(
                         model=self.transcription_options.llm_model,
                         messages=[
                             {"role": "system", "content": self.transcription_options.llm_prompt},
                             {"role": "user", "content": transcript}
-                        ]
+                        ],
+                        on_partial=lambda text: self.partial_translation.emit(text, transcript_id),
                     )
+                )
 
-                    logging.debug(f"Received translation response: {completion}")
+                logging.debug(f"Received translation response: {response}")
 
-                    if completion.choices and completion.choices[0].message:
-                        next_translation = completion.choices[0].message.content
-                    else:
-                        logging.error(f"Translation error! Server response: {completion}")
-                        next_translation = transcript  # Use original text as fallback
-                except Exception as e:
-                    logging.error(f"Error during translation: {e}")
+                if response.content:
+                    next_translation = response.content
+                else:
+                    logging.error(f"Translation error! Server response: {response}")
                     next_translation = transcript  # Use original text as fallback
+            except Exception as e:
+                logging.error(f"Error during translation: {e}")
+                next_translation = transcript  # Use original text as fallback
 
             self.translation.emit(next_translation, transcript_id)
 
+        loop.run_until_complete(self.client.aclose())
+        loop.close()
+
         self.finished.emit()
 
     def on_transcription_options_changed(
@@ -161,3 +174,4 @@ class Translator(QObject):
         else:
             # Otherwise stop the OpenAI queue
             self.is_running = False
+            self.queue.put(None)
@@ -3,6 +3,8 @@ import numpy as np
 import logging
 import os
 
+from buzz.thread_budget import get_ffmpeg_threads
+
 SAMPLE_RATE = 16000
 
 N_FFT = 400
@@ -41,7 +43,7 @@ def load_audio(file: str, sr: int = SAMPLE_RATE, save_mp3: bool = True):
             convert_cmd = [
                 "ffmpeg",
                 "-nostdin",
-                "-threads", "0",
+                "-threads", get_ffmpeg_threads(),
                 "-i", file,
                 "-ac", "1",
                 "-ar", str(sr),
@@ -72,7 +74,7 @@ def load_audio(file: str, sr: int = SAMPLE_RATE, save_mp3: bool = True):
     cmd = [
         "ffmpeg",
         "-nostdin",
-        "-threads", "0",
+        "-threads", get_ffmpeg_threads(),
         "-i", file,
         "-f", "s16le",
         "-ac", "1",
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QPalette, QColor
 
 from buzz.__version__ import VERSION
+from buzz.db.dao.media_probe_dao import MediaProbeDAO
 from buzz.db.dao.transcription_dao import TranscriptionDAO
 from buzz.db.dao.transcription_segment_dao import TranscriptionSegmentDAO
 from buzz.db.db import setup_app_db
@@ -170,7 +171,7 @@ class Application(QApplication):
 
         db = setup_app_db()
         transcription_service = TranscriptionService(
-            TranscriptionDAO(db), TranscriptionSegmentDAO(db)
+            TranscriptionDAO(db), TranscriptionSegmentDAO(db), MediaProbeDAO(db)
         )
 
         self.window = MainWindow(transcription_service)
@@ -3,6 +3,7 @@ import logging
 import sounddevice
 import keyring
 from typing import Tuple, List, Optional
+from uuid import UUID
 
 from PyQt6 import QtGui
 from PyQt6.QtCore import (
@@ -16,15 +17,22 @@ from PyQt6.QtWidgets import (
     QMainWindow,
     QMessageBox,
     QFileDialog,
+    QWidget,
+    QVBoxLayout,
 )
 
+from buzz.db.entity.segment_search_result import SegmentSearchResult
 from buzz.db.entity.transcription import Transcription
+from buzz.db.writer import DatabaseWriter
 from buzz.db.service.transcription_service import TranscriptionService
 from buzz.file_transcriber_queue_worker import FileTranscriberQueueWorker
+from buzz.job_api import JobApiServer
 from buzz.locale import _
+from buzz.media_probe import MediaProbeService, MediaInfo
 from buzz.settings.settings import APP_NAME, Settings
 from buzz.settings.shortcuts import Shortcuts
-from buzz.store.keyring_store import set_password, Key
+from buzz.store.keyring_store import get_password, set_password, Key
+from buzz.task_progress import TaskProgressModel
 from buzz.transcriber.transcriber import (
     FileTranscriptionTask,
     TranscriptionOptions,
@@ -42,6 +50,7 @@ from buzz.widgets.transcriber.file_transcriber_widget import FileTranscriberWidg
 from buzz.widgets.transcription_task_folder_watcher import (
     TranscriptionTaskFolderWatcher,
 )
+from buzz.widgets.transcript_search_widget import TranscriptSearchWidget
 from buzz.widgets.transcription_tasks_table_widget import (
     TranscriptionTasksTableWidget,
 )
@@ -69,6 +78,12 @@ class MainWindow(QMainWindow):
 
         self.quit_on_complete = False
         self.transcription_service = transcription_service
+        # Writes are committed on a background thread, the GUI thread only
+        # reads, so it never waits for a commit
+        self.db_writer = DatabaseWriter(
+            transcription_service.transcription_dao.db.databaseName(), parent=self
+        )
+        self.db_writer.start()
 
         self.toolbar = MainWindowToolbar(shortcuts=self.shortcuts, parent=self)
         self.toolbar.new_transcription_action_triggered.connect(
@@ -105,14 +120,29 @@ class MainWindow(QMainWindow):
         self.menu_bar.preferences_changed.connect(self.on_preferences_changed)
         self.setMenuBar(self.menu_bar)
 
-        self.table_widget = TranscriptionTasksTableWidget(self)
+        self.progress_model = TaskProgressModel(parent=self)
+        self.table_widget = TranscriptionTasksTableWidget(
+            self, progress_model=self.progress_model
+        )
         self.table_widget.doubleClicked.connect(self.on_table_double_clicked)
         self.table_widget.return_clicked.connect(self.open_transcript_viewer)
+        self.table_widget.move_to_front_triggered.connect(self.on_move_to_front_triggered)
+        self.table_widget.resume_triggered.connect(self.on_resume_triggered)
         self.table_widget.selectionModel().selectionChanged.connect(
             self.on_table_selection_changed
         )
 
-        self.setCentralWidget(self.table_widget)
+        self.search_widget = TranscriptSearchWidget(
+            transcription_service=self.transcription_service, parent=self
+        )
+        self.search_widget.result_activated.connect(self.on_search_result_activated)
+
+        central_widget = QWidget(self)
+        central_layout = QVBoxLayout(central_widget)
+        central_layout.setContentsMargins(0, 0, 0, 0)
+        central_layout.addWidget(self.search_widget)
+        central_layout.addWidget(self.table_widget, 1)
+        self.setCentralWidget(central_widget)
 
         # Start transcriber thread
         self.transcriber_thread = QThread()
@@ -127,6 +157,7 @@ class MainWindow(QMainWindow):
         )
         self.transcriber_worker.task_error.connect(self.on_task_error)
         self.transcriber_worker.task_completed.connect(self.on_task_completed)
+        self.transcriber_worker.task_translations.connect(self.on_task_translations)
 
         self.transcriber_worker.completed.connect(self.transcriber_thread.quit)
 
@@ -136,19 +167,53 @@ class MainWindow(QMainWindow):
 
         self.load_geometry()
 
+        self.media_probe_service = MediaProbeService(self.transcription_service, parent=self)
+        self.media_probe_service.probed.connect(self.on_media_probed)
+
+        restored_tasks = self.restore_queued_tasks()
+
         self.folder_watcher = TranscriptionTaskFolderWatcher(
-            tasks={},
+            tasks={task.id: task for task in restored_tasks},
             preferences=self.preferences.folder_watch,
         )
         self.folder_watcher.task_found.connect(self.add_task)
         self.folder_watcher.find_tasks()
 
+        self.job_api_server: Optional[JobApiServer] = None
+        job_api_port = os.getenv("BUZZ_JOB_API_PORT")
+        if job_api_port:
+            self.start_job_api_server(int(job_api_port))
+
         self.transcription_viewer_widget = None
 
         if os.environ.get('SNAP_NAME', '') == 'buzz':
             logging.debug("Running in a snap environment")
             self.check_linux_permissions()
 
+    def start_job_api_server(self, port: int):
+        try:
+            self.job_api_server = JobApiServer(port=port, parent=self)
+        except OSError as exc:
+            logging.error("Could not start the job API on port %s: %s", port, exc)
+            return
+
+        self.job_api_server.job_submitted.connect(self.add_task)
+        self.job_api_server.cancel_requested.connect(self.cancel_task)
+
+        self.transcriber_worker.task_started.connect(self.job_api_server.on_task_started)
+        self.transcriber_worker.task_progress.connect(
+            self.job_api_server.on_task_progress
+        )
+        self.transcriber_worker.task_segments.connect(
+            self.job_api_server.on_task_segments
+        )
+        self.transcriber_worker.task_completed.connect(
+            self.job_api_server.on_task_completed
+        )
+        self.transcriber_worker.task_error.connect(self.job_api_server.on_task_error)
+
+        self.job_api_server.start()
+
     def check_linux_permissions(self):
         devices = sounddevice.query_devices()
         input_devices = [device for device in devices if device['max_input_channels'] > 0]
@@ -244,13 +309,23 @@ class MainWindow(QMainWindow):
     def on_stop_transcription_action_triggered(self):
         selected_transcriptions = self.table_widget.selected_transcriptions()
         for transcription in selected_transcriptions:
-            transcription_id = transcription.id_as_uuid
-            self.transcriber_worker.cancel_task(transcription_id)
-            self.transcription_service.update_transcription_as_canceled(
-                transcription_id
-            )
-            self.table_widget.refresh_row(transcription_id)
-            self.on_table_selection_changed()
+            self.cancel_task(transcription.id_as_uuid)
+
+    def cancel_task(self, transcription_id: UUID):
+        self.transcriber_worker.cancel_task(transcription_id)
+        self.db_writer.submit(
+            lambda service: service.update_transcription_as_canceled(transcription_id),
+            lambda: self.on_transcription_canceled(transcription_id),
+        )
+
+    def on_transcription_canceled(self, transcription_id: UUID):
+        self.on_transcription_ended(transcription_id)
+        self.on_table_selection_changed()
+
+    def on_transcription_ended(self, transcription_id: UUID):
+        # The saved status replaces the live progress
+        self.progress_model.remove(transcription_id)
+        self.table_widget.refresh_row(transcription_id)
 
     def on_new_transcription_action_triggered(self):
         (file_paths, __) = QFileDialog.getOpenFileNames(
@@ -365,6 +440,7 @@ class MainWindow(QMainWindow):
         self.transcription_viewer_widget = TranscriptionViewerWidget(
             transcription=transcription,
             transcription_service=self.transcription_service,
+            db_writer=self.db_writer,
             shortcuts=self.shortcuts,
             parent=self,
             flags=Qt.WindowType.Window,
@@ -374,18 +450,97 @@ class MainWindow(QMainWindow):
         self.transcription_viewer_widget.rerun_triggered.connect(self.on_file_transcriber_triggered)
         self.transcription_viewer_widget.show()
 
+    def on_search_result_activated(self, result: SegmentSearchResult):
+        transcription = self.transcription_service.transcription_dao.find_by_id(
+            result.transcription_id
+        )
+        if transcription is None:
+            return
+        self.open_transcription_viewer(transcription)
+        self.transcription_viewer_widget.show_segment(result.id, result.start_time)
+
     def add_task(self, task: FileTranscriptionTask):
-        self.transcription_service.create_transcription(task)
-        self.table_widget.refresh_all()
+        # The writes of the task's progress are queued after its creation
+        self.db_writer.submit(
+            lambda service: service.create_transcription(task),
+            lambda: self.on_transcription_created(task),
+        )
         self.transcriber_worker.add_task(task)
 
+    def on_transcription_created(self, task: FileTranscriptionTask):
+        self.table_widget.refresh_all()
+        if task.file_path:
+            self.media_probe_service.probe(task.uid, task.file_path)
+
+    def restore_queued_tasks(self) -> List[FileTranscriptionTask]:
+        """Queues the transcriptions that had not completed when the app last exited"""
+        tasks = self.transcription_service.get_queued_tasks(
+            openai_access_token=get_password(Key.OPENAI_API_KEY)
+        )
+        for task in tasks:
+            self.transcriber_worker.add_task(task)
+            if task.file_path and task.duration_ms is None:
+                self.media_probe_service.probe(task.uid, task.file_path)
+
+        if len(tasks) > 0:
+            logging.debug("Restored %s queued transcriptions", len(tasks))
+        return tasks
+
+    def on_media_probed(self, transcription_id: UUID, info: MediaInfo):
+        if info.duration_ms is not None:
+            self.transcriber_worker.set_task_duration(transcription_id, info.duration_ms)
+        self.table_widget.refresh_row(transcription_id)
+
+    def on_move_to_front_triggered(self, transcription_ids: List[UUID]):
+        # Move the first selected task to the front last
+        for transcription_id in reversed(transcription_ids):
+            self.transcriber_worker.move_task_to_front(transcription_id)
+
+        # Keep the new order after a restart
+        priorities = []
+        for transcription_id in transcription_ids:
+            task = self.transcriber_worker.tasks_queue.find(transcription_id)
+            if task is not None:
+                priorities.append((transcription_id, task.priority))
+
+        def update_priorities(service: TranscriptionService):
+            for transcription_id, priority in priorities:
+                service.update_transcription_priority(transcription_id, priority)
+
+        self.db_writer.submit(update_priorities)
+
+    def on_resume_triggered(self, transcriptions: List[Transcription]):
+        openai_access_token = get_password(Key.OPENAI_API_KEY)
+        # Continues from the checkpoint of the engine, if it saved one
+        tasks = [
+            transcription.to_task(openai_access_token=openai_access_token)
+            for transcription in transcriptions
+        ]
+
+        def update_as_queued(service: TranscriptionService):
+            for task in tasks:
+                service.update_transcription_as_queued(task.uid)
+
+        # Queued before the writes of the tasks' progress
+        self.db_writer.submit(update_as_queued, self.table_widget.refresh_all)
+        for task in tasks:
+            self.transcriber_worker.add_task(task)
+
     def on_task_started(self, task: FileTranscriptionTask):
-        self.transcription_service.update_transcription_as_started(task.uid)
-        self.table_widget.refresh_row(task.uid)
+        self.db_writer.submit(
+            lambda service: service.update_transcription_as_started(task.uid),
+            lambda: self.table_widget.refresh_row(task.uid),
+        )
 
     def on_task_progress(self, task: FileTranscriptionTask, progress: float):
-        self.transcription_service.update_transcription_progress(task.uid, progress)
-        self.table_widget.refresh_row(task.uid)
+        # The table repaints from the progress model, the database is only
+        # updated every few seconds
+        if self.progress_model.set_progress(task.uid, progress):
+            self.db_writer.submit(
+                lambda service: service.update_transcription_progress(
+                    task.uid, progress
+                )
+            )
 
     def on_task_download_progress(
         self, task: FileTranscriptionTask, fraction_downloaded: float
@@ -394,17 +549,33 @@ class MainWindow(QMainWindow):
         pass
 
     def on_task_completed(self, task: FileTranscriptionTask, segments: List[Segment]):
-        self.transcription_service.update_transcription_as_completed(task.uid, segments)
-        self.table_widget.refresh_row(task.uid)
+        self.db_writer.submit(
+            lambda service: service.update_transcription_as_completed(
+                task.uid,
+                segments,
+                word_level_timings=task.transcription_options.word_level_timings,
+            ),
+            lambda: self.on_transcription_ended(task.uid),
+        )
 
         if self.quit_on_complete:
+            # Closing the window commits the pending writes
             self.close()
             QApplication.quit()
 
 
+    def on_task_translations(
+        self, task: FileTranscriptionTask, translations: List[Tuple[int, str]]
+    ):
+        self.db_writer.submit(
+            lambda service: service.update_segment_translations(task.uid, translations)
+        )
+
     def on_task_error(self, task: FileTranscriptionTask, error: str):
-        self.transcription_service.update_transcription_as_failed(task.uid, error)
-        self.table_widget.refresh_row(task.uid)
+        self.db_writer.submit(
+            lambda service: service.update_transcription_as_failed(task.uid, error),
+            lambda: self.on_transcription_ended(task.uid),
+        )
 
         if self.quit_on_complete:
             self.close()
@@ -423,6 +594,10 @@ class MainWindow(QMainWindow):
         self.transcriber_worker.stop()
         self.transcriber_thread.quit()
         self.transcriber_thread.wait()
+        self.media_probe_service.shutdown()
+        if self.job_api_server is not None:
+            self.job_api_server.stop()
+        self.db_writer.stop()
 
         if self.transcription_viewer_widget is not None:
             self.transcription_viewer_widget.close()
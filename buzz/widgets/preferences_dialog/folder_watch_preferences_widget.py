@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import (
     QFileDialog,
     QCheckBox,
     QVBoxLayout,
+    QSpinBox,
 )
 
 from buzz.locale import _
@@ -68,6 +69,15 @@ class FolderWatchPreferencesWidget(QWidget):
         output_folder_row.addWidget(self.output_folder_line_edit)
         output_folder_row.addWidget(output_folder_browse_button)
 
+        self.priority_spin_box = QSpinBox(self)
+        self.priority_spin_box.setRange(-10, 10)
+        self.priority_spin_box.setValue(config.priority)
+        self.priority_spin_box.setToolTip(
+            _("Tasks with a higher priority are transcribed first")
+        )
+        self.priority_spin_box.setObjectName("PrioritySpinBox")
+        self.priority_spin_box.valueChanged.connect(self.on_priority_changed)
+
         openai_access_token = get_password(Key.OPENAI_API_KEY)
         (
             transcription_options,
@@ -93,6 +103,7 @@ class FolderWatchPreferencesWidget(QWidget):
         folders_form_layout.addRow("", checkbox)
         folders_form_layout.addRow(_("Input folder"), input_folder_row)
         folders_form_layout.addRow(_("Output folder"), output_folder_row)
+        folders_form_layout.addRow(_("Priority"), self.priority_spin_box)
         folders_form_layout.addWidget(transcription_form_widget)
 
         layout.addLayout(folders_form_layout)
@@ -119,6 +130,10 @@ class FolderWatchPreferencesWidget(QWidget):
         self.config.output_directory = folder
         self.config_changed.emit(self.config)
 
+    def on_priority_changed(self, priority: int):
+        self.config.priority = priority
+        self.config_changed.emit(self.config)
+
     def on_enable_changed(self, state: int):
         self.config.enabled = state == 2
         self.config_changed.emit(self.config)
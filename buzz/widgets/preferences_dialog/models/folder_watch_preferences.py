@@ -13,11 +13,14 @@ class FolderWatchPreferences:
     input_directory: str
     output_directory: str
     file_transcription_options: FileTranscriptionPreferences
+    # Priority of the tasks found in the input folder
+    priority: int = 0
 
     def save(self, settings: QSettings):
         settings.setValue("enabled", self.enabled)
         settings.setValue("input_folder", self.input_directory)
         settings.setValue("output_directory", self.output_directory)
+        settings.setValue("priority", self.priority)
         settings.beginGroup("file_transcription_options")
         self.file_transcription_options.save(settings)
         settings.endGroup()
@@ -29,6 +32,7 @@ class FolderWatchPreferences:
 
         input_folder = settings.value("input_folder", defaultValue="", type=str)
         output_folder = settings.value("output_directory", defaultValue="", type=str)
+        priority = settings.value("priority", defaultValue=0, type=int)
         settings.beginGroup("file_transcription_options")
         file_transcription_options = FileTranscriptionPreferences.load(settings)
         settings.endGroup()
@@ -37,4 +41,5 @@ class FolderWatchPreferences:
             input_directory=input_folder,
             output_directory=output_folder,
             file_transcription_options=file_transcription_options,
+            priority=priority,
         )
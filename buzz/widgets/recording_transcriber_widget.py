@@ -29,6 +29,7 @@ from buzz.transcriber.transcriber import (
     Task,
 )
 from buzz.translator import Translator
+from buzz.translation_client import warm_up_translation_model
 from buzz.widgets.audio_devices_combo_box import AudioDevicesComboBox
 from buzz.widgets.audio_meter_widget import AudioMeterWidget
 from buzz.widgets.model_download_progress_dialog import ModelDownloadProgressDialog
@@ -170,8 +171,13 @@ class RecordingTranscriberWidget(QWidget):
         layout.addWidget(self.transcription_text_box)
         layout.addWidget(self.translation_text_box)
 
+        self.translation_client = None
         if not self.transcription_options.enable_llm_translation:
             self.translation_text_box.hide()
+        else:
+            # Start loading the model before the first segment is transcribed,
+            # the translator of the recording uses the same client
+            self.translation_client = warm_up_translation_model()
 
         self.setLayout(layout)
         self.resize(450, 500)
@@ -315,6 +321,7 @@ class RecordingTranscriberWidget(QWidget):
             self.translator = Translator(
                 self.transcription_options,
                 self.transcription_options_group_box.advanced_settings_dialog,
+                ollama_client=self.translation_client,
             )
 
             self.translator.moveToThread(self.translation_thread)
@@ -12,6 +12,7 @@ from PyQt6.QtWidgets import (
 from buzz.locale import _
 from buzz.model_loader import ModelType
 from buzz.transcriber.transcriber import TranscriptionOptions
+from buzz.translation_client import warm_up_translation_model
 from buzz.settings.settings import Settings
 from buzz.widgets.line_edit import LineEdit
 from buzz.widgets.transcriber.initial_prompt_text_edit import InitialPromptTextEdit
@@ -123,6 +124,9 @@ class AdvancedSettingsDialog(QDialog):
         self.llm_model_line_edit.setEnabled(self.transcription_options.enable_llm_translation)
         self.llm_prompt_text_edit.setEnabled(self.transcription_options.enable_llm_translation)
 
+        if self.transcription_options.enable_llm_translation:
+            warm_up_translation_model()
+
     def on_llm_model_changed(self, text: str):
         self.transcription_options.llm_model = text
         self.transcription_options_changed.emit(self.transcription_options)
@@ -0,0 +1,106 @@
+import os
+from typing import Optional, List
+
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QTableWidget,
+    QTableWidgetItem,
+    QAbstractItemView,
+    QHeaderView,
+)
+
+from buzz.db.entity.segment_search_result import SegmentSearchResult
+from buzz.db.service.transcription_service import TranscriptionService
+from buzz.locale import _
+from buzz.transcriber.file_transcriber import to_timestamp
+from buzz.widgets.line_edit import LineEdit
+
+# Waits for the user to stop typing before searching
+SEARCH_DELAY_MS = 250
+
+
+class TranscriptSearchWidget(QWidget):
+    """
+    Search box for the segments of all transcriptions. The results are listed
+    under the box while it has text, and activating one opens its transcript
+    at the segment.
+    """
+
+    result_activated = pyqtSignal(SegmentSearchResult)
+
+    def __init__(
+        self,
+        transcription_service: TranscriptionService,
+        parent: Optional[QWidget] = None,
+    ):
+        super().__init__(parent)
+        self.transcription_service = transcription_service
+        self.results: List[SegmentSearchResult] = []
+
+        self.search_line_edit = LineEdit(parent=self)
+        self.search_line_edit.setPlaceholderText(_("Search transcripts"))
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self.on_text_changed)
+        self.search_line_edit.returnPressed.connect(self.search)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search)
+
+        self.results_table = QTableWidget(0, 3, self)
+        self.results_table.setHorizontalHeaderLabels(
+            [_("File Name / URL"), _("Start"), _("Text")]
+        )
+        self.results_table.horizontalHeader().setSectionResizeMode(
+            2, QHeaderView.ResizeMode.Stretch
+        )
+        self.results_table.setColumnWidth(0, 250)
+        self.results_table.verticalHeader().hide()
+        self.results_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.results_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.results_table.cellActivated.connect(self.on_cell_activated)
+        self.results_table.hide()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.search_line_edit)
+        layout.addWidget(self.results_table)
+
+    def on_text_changed(self, text: str):
+        if text.strip() == "":
+            self.search_timer.stop()
+            self.set_results([])
+            return
+        self.search_timer.start()
+
+    def search(self):
+        self.search_timer.stop()
+        self.set_results(
+            self.transcription_service.search_segments(self.search_line_edit.text())
+        )
+
+    def set_results(self, results: List[SegmentSearchResult]):
+        self.results = results
+        self.results_table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            name = result.url if result.url != "" else os.path.basename(result.file)
+            text = result.text.strip()
+            if result.translation.strip() != "":
+                text += f" / {result.translation.strip()}"
+            for column, value in enumerate(
+                [name, to_timestamp(result.start_time), text]
+            ):
+                item = QTableWidgetItem(value)
+                item.setToolTip(value)
+                self.results_table.setItem(row, column, item)
+        self.results_table.setVisible(self.search_line_edit.text().strip() != "")
+
+    def on_cell_activated(self, row: int, _column: int):
+        self.result_activated.emit(self.results[row])
@@ -71,6 +71,7 @@ class TranscriptionTaskFolderWatcher(QFileSystemWatcher):
                     model_path=model_path,
                     output_directory=self.preferences.output_directory,
                     source=FileTranscriptionTask.Source.FOLDER_WATCH,
+                    priority=self.preferences.priority,
                 )
                 self.task_found.emit(task)
                 self.paths_emitted.add(file_path)
@@ -4,7 +4,7 @@ import os
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import auto
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
 
 from PyQt6 import QtGui
@@ -25,6 +25,7 @@ from PyQt6.QtWidgets import (
 from buzz.db.entity.transcription import Transcription
 from buzz.locale import _
 from buzz.settings.settings import Settings
+from buzz.task_progress import TaskProgressModel
 from buzz.transcriber.transcriber import FileTranscriptionTask, Task, TASK_LABEL_TRANSLATIONS
 from buzz.widgets.record_delegate import RecordDelegate
 from buzz.widgets.transcription_record import TranscriptionRecord
@@ -47,6 +48,10 @@ class Column(enum.Enum):
     TIME_STARTED = auto()
     URL = auto()
     WHISPER_MODEL_SIZE = auto()
+    HUGGING_FACE_MODEL_ID = auto()
+    DURATION_MS = auto()
+    PRIORITY = auto()
+    TRANSCRIPTION_OPTIONS = auto()
 
 
 @dataclass
@@ -59,12 +64,21 @@ class ColDef:
     hidden_toggleable: bool = True
 
 
-def format_record_status_text(record: QSqlRecord) -> str:
+def format_record_status_text(
+    record: QSqlRecord, progress: Optional[float] = None
+) -> str:
+    """progress is the live progress of a running task, if newer than the record's"""
     status = FileTranscriptionTask.Status(record.value("status"))
     match status:
         case FileTranscriptionTask.Status.IN_PROGRESS:
             in_progress_label = _("In Progress")
-            return f'{in_progress_label} ({record.value("progress") :.0%})'
+            if progress is None:
+                progress = record.value("progress")
+            remaining = estimate_time_remaining(record.value("time_started"), progress)
+            if remaining is not None:
+                left_label = _("left")
+                return f'{in_progress_label} ({progress :.0%}, {TranscriptionTasksTableWidget.format_timedelta(remaining)} {left_label})'
+            return f'{in_progress_label} ({progress :.0%})'
         case FileTranscriptionTask.Status.COMPLETED:
             status = _("Completed")
             started_at = record.value("time_started")
@@ -82,6 +96,23 @@ def format_record_status_text(record: QSqlRecord) -> str:
         case _:
             return ""
 
+def estimate_time_remaining(time_started: str, progress: float) -> Optional[timedelta]:
+    # Too early to tell from the first percent
+    if not time_started or not progress or progress < 0.01:
+        return None
+    elapsed = datetime.now() - datetime.fromisoformat(time_started)
+    return elapsed * ((1 - progress) / progress)
+
+
+def format_record_duration_text(record: QSqlRecord) -> str:
+    duration_ms = record.value("duration_ms")
+    if not duration_ms:
+        return ""
+    return TranscriptionTasksTableWidget.format_timedelta(
+        timedelta(milliseconds=duration_ms)
+    )
+
+
 column_definitions = [
     ColDef(
         id="file_name",
@@ -113,12 +144,20 @@ column_definitions = [
             text_getter=lambda record: TASK_LABEL_TRANSLATIONS[Task(record.value("task"))]
         ),
     ),
+    ColDef(
+        id="length",
+        header=_("Length"),
+        column=Column.DURATION_MS,
+        width=100,
+        delegate=RecordDelegate(text_getter=format_record_duration_text),
+    ),
     ColDef(
         id="status",
         header=_("Status"),
         column=Column.STATUS,
         width=180,
-        delegate=RecordDelegate(text_getter=format_record_status_text),
+        # Set by the table, which reads the live progress of the running tasks
+        delegate=None,
         hidden_toggleable=False,
     ),
     ColDef(
@@ -170,19 +209,60 @@ class TranscriptionTasksTableHeaderView(QHeaderView):
         self.setSectionHidden(column_index, not checked)
         self.parent().save_column_visibility()
 
+class TranscriptionTableModel(QSqlTableModel):
+    """
+    Transcriptions, newest first. Rows are fetched from the database a page
+    at a time as the table scrolls, sorted by the time_queued index, and the
+    row of each fetched transcription is kept by its ID.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setTable("transcription")
+        self.setEditStrategy(QSqlTableModel.EditStrategy.OnManualSubmit)
+        self.setSort(Column.TIME_QUEUED.value, Qt.SortOrder.DescendingOrder)
+
+        self.row_by_id: Dict[str, int] = {}
+        self.modelReset.connect(self.on_model_reset)
+        self.rowsInserted.connect(self.on_rows_inserted)
+
+    def orderByClause(self) -> str:
+        # Transcriptions queued at the same time are listed newest first too,
+        # the time_queued index already holds the rowid, so no sort is needed
+        return 'ORDER BY "time_queued" DESC, rowid DESC'
+
+    def find_row(self, id: UUID) -> Optional[int]:
+        return self.row_by_id.get(str(id))
+
+    def on_model_reset(self):
+        self.row_by_id = {}
+        self.on_rows_inserted(QModelIndex(), 0, self.rowCount() - 1)
+
+    def on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        # Fetched pages are appended at the end
+        for row in range(first, last + 1):
+            self.row_by_id[self.record(row).value("id")] = row
+
+
 class TranscriptionTasksTableWidget(QTableView):
     return_clicked = pyqtSignal()
-
-    def __init__(self, parent: Optional[QWidget] = None):
+    move_to_front_triggered = pyqtSignal(list)  # List[UUID]
+    resume_triggered = pyqtSignal(list)  # List[Transcription]
+
+    def __init__(
+        self,
+        parent: Optional[QWidget] = None,
+        progress_model: Optional[TaskProgressModel] = None,
+    ):
         super().__init__(parent)
 
-        self.setHorizontalHeader(TranscriptionTasksTableHeaderView(Qt.Orientation.Horizontal, self))
+        self.progress_model = progress_model
+        if progress_model is not None:
+            progress_model.changed.connect(self.on_progress_changed)
 
-        self._model = QSqlTableModel()
-        self._model.setTable("transcription")
-        self._model.setEditStrategy(QSqlTableModel.EditStrategy.OnManualSubmit)
-        self._model.setSort(Column.TIME_QUEUED.value, Qt.SortOrder.DescendingOrder)
+        self.setHorizontalHeader(TranscriptionTasksTableHeaderView(Qt.Orientation.Horizontal, self))
 
+        self._model = TranscriptionTableModel()
         self.setModel(self._model)
 
         for i in range(self.model().columnCount()):
@@ -213,6 +293,9 @@ class TranscriptionTasksTableWidget(QTableView):
                 )
         self.settings.end_group()
 
+        self.status_delegate = RecordDelegate(text_getter=self.format_status_text)
+        self.setItemDelegateForColumn(Column.STATUS.value, self.status_delegate)
+
         self.model().select()
         self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -224,6 +307,36 @@ class TranscriptionTasksTableWidget(QTableView):
 
     def contextMenuEvent(self, event):
         menu = QMenu(self)
+
+        queued_ids = [
+            transcription.id_as_uuid
+            for transcription in self.selected_transcriptions()
+            if transcription.status == FileTranscriptionTask.Status.QUEUED.value
+        ]
+        if len(queued_ids) > 0:
+            move_to_front_action = menu.addAction(_("Move to Top of Queue"))
+            move_to_front_action.triggered.connect(
+                lambda: self.move_to_front_triggered.emit(queued_ids)
+            )
+            menu.addSeparator()
+
+        resumable = [
+            transcription
+            for transcription in self.selected_transcriptions()
+            if transcription.status
+            in {
+                FileTranscriptionTask.Status.CANCELED.value,
+                FileTranscriptionTask.Status.FAILED.value,
+            }
+            and transcription.transcription_options is not None
+        ]
+        if len(resumable) > 0:
+            resume_action = menu.addAction(_("Resume Transcription"))
+            resume_action.triggered.connect(
+                lambda: self.resume_triggered.emit(resumable)
+            )
+            menu.addSeparator()
+
         for definition in column_definitions:
             if not definition.hidden_toggleable:
                 continue
@@ -287,14 +400,30 @@ class TranscriptionTasksTableWidget(QTableView):
         return Transcription.from_record(self.model().record(index.row()))
 
     def refresh_all(self):
+        # Only the first page is fetched again
         self.model().select()
 
     def refresh_row(self, id: UUID):
-        for i in range(self.model().rowCount()):
-            record = self.model().record(i)
-            if record.value("id") == str(id):
-                self.model().selectRow(i)
-                return
+        """Reads the transcription again, if its row has been fetched"""
+        row = self.find_row(id)
+        if row is not None:
+            self.model().selectRow(row)
+
+    def find_row(self, id: UUID) -> Optional[int]:
+        return self._model.find_row(id)
+
+    def format_status_text(self, record: QSqlRecord) -> str:
+        progress = None
+        if self.progress_model is not None:
+            progress = self.progress_model.get(UUID(record.value("id")))
+        return format_record_status_text(record, progress)
+
+    def on_progress_changed(self, ids: List[UUID]):
+        # Repaints the status cells, the records are read again on the next refresh
+        for id in ids:
+            row = self.find_row(id)
+            if row is not None:
+                self.update(self.model().index(row, Column.STATUS.value))
 
     @staticmethod
     def format_timedelta(delta: timedelta):
@@ -6,10 +6,7 @@ from buzz.db.entity.transcription import Transcription
 from buzz.db.service.transcription_service import TranscriptionService
 from buzz.locale import _
 from buzz.transcriber.file_transcriber import write_output
-from buzz.transcriber.transcriber import (
-    OutputFormat,
-    Segment,
-)
+from buzz.transcriber.transcriber import OutputFormat
 
 
 class ExportTranscriptionMenu(QMenu):
@@ -46,16 +43,11 @@ class ExportTranscriptionMenu(QMenu):
         self.triggered.connect(self.on_menu_triggered)
 
     def load_segments(self):
-        self.segments = [
-            Segment(
-                start=segment.start_time,
-                end=segment.end_time,
-                text=segment.text,
-                translation=segment.translation)
-            for segment in self.transcription_service.get_transcription_segments(
-                transcription_id=self.transcription.id_as_uuid
-            )
-        ]
+        # Word-level transcriptions are exported with a segment for each word
+        self.segments = self.transcription_service.get_transcription_words(
+            transcription_id=self.transcription.id_as_uuid
+        )
+
     @staticmethod
     def extract_format_and_segment_key(action_text: str):
         parts = action_text.split('-')
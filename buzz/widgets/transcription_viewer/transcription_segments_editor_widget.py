@@ -15,6 +15,7 @@ from PyQt6.QtWidgets import (
     QTextEdit,
 )
 
+from buzz.db.writer import DatabaseWriter
 from buzz.locale import _
 from buzz.translator import Translator
 from buzz.transcriber.file_transcriber import to_timestamp
@@ -27,6 +28,7 @@ class Column(enum.Enum):
     TEXT = enum.auto()
     TRANSLATION = enum.auto()
     TRANSCRIPTION_ID = enum.auto()
+    WORDS = enum.auto()
 
 
 @dataclass
@@ -55,11 +57,50 @@ class WordWrapDelegate(QStyledItemDelegate):
 
 
 class TranscriptionSegmentModel(QSqlTableModel):
-    def __init__(self, transcription_id: UUID):
+    """
+    Segments of a transcription. The model never writes to the database
+    itself, edits are kept in its cache to display them and saved by the
+    database writer, so the GUI thread does not wait for the commit.
+    """
+
+    def __init__(self, transcription_id: UUID, db_writer: DatabaseWriter):
         super().__init__()
+        self.db_writer = db_writer
         self.setTable("transcription_segment")
-        self.setEditStrategy(QSqlTableModel.EditStrategy.OnFieldChange)
+        # The cache is never submitted
+        self.setEditStrategy(QSqlTableModel.EditStrategy.OnManualSubmit)
         self.setFilter(f"transcription_id = '{transcription_id}'")
+        # Translations that are still streaming in, displayed but not saved yet
+        self.partial_translations: dict[int, str] = {}
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if (
+            self.partial_translations
+            and role == Qt.ItemDataRole.DisplayRole
+            and index.column() == Column.TRANSLATION.value
+        ):
+            segment_id = self.record(index.row()).value("id")
+            if segment_id in self.partial_translations:
+                return self.partial_translations[segment_id]
+        return super().data(index, role)
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole):
+        column = index.column()
+        if column not in (Column.TEXT.value, Column.TRANSLATION.value):
+            return False
+        if not super().setData(index, value, role):
+            return False
+
+        segment_id = self.record(index.row()).value("id")
+        if column == Column.TEXT.value:
+            self.db_writer.submit(
+                lambda service: service.update_segment_text(segment_id, value)
+            )
+        else:
+            self.db_writer.submit(
+                lambda service: service.update_segment_translation(segment_id, value)
+            )
+        return True
 
     def flags(self, index: QModelIndex):
         flags = super().flags(index)
@@ -76,14 +117,18 @@ class TranscriptionSegmentsEditorWidget(QTableView):
             self,
             transcription_id: UUID,
             translator: Translator,
+            db_writer: DatabaseWriter,
             parent: Optional[QWidget]
     ):
         super().__init__(parent)
 
         self.translator = translator
         self.translator.translation.connect(self.update_translation)
+        self.translator.partial_translation.connect(self.update_partial_translation)
 
-        model = TranscriptionSegmentModel(transcription_id=transcription_id)
+        model = TranscriptionSegmentModel(
+            transcription_id=transcription_id, db_writer=db_writer
+        )
         self.setModel(model)
 
         timestamp_delegate = TimeStampDelegate()
@@ -166,17 +211,46 @@ class TranscriptionSegmentsEditorWidget(QTableView):
         self.has_translations = True
         self.resizeEvent(None)
 
+        self.model().partial_translations.pop(segment_id, None)
+
         for row in range(self.model().rowCount()):
             if self.model().record(row).value("id") == segment_id:
                 self.model().setData(self.model().index(row, Column.TRANSLATION.value), translation)
                 break
 
+    def update_partial_translation(self, translation: str, segment_id: Optional[int] = None):
+        if not self.has_translations:
+            self.has_translations = True
+            self.resizeEvent(None)
+
+        model = self.model()
+        for row in range(model.rowCount()):
+            if model.record(row).value("id") == segment_id:
+                model.partial_translations[segment_id] = translation
+                index = model.index(row, Column.TRANSLATION.value)
+                model.dataChanged.emit(index, index)
+                break
+
     def on_selection_changed(
         self, selected: QItemSelection, _deselected: QItemSelection
     ):
         if selected.indexes():
             self.segment_selected.emit(self.segment(selected.indexes()[0]))
 
+    def select_segment(self, segment_id: int):
+        model = self.model()
+        row = 0
+        while True:
+            while row < model.rowCount():
+                if model.record(row).value("id") == segment_id:
+                    self.selectRow(row)
+                    self.scrollTo(model.index(row, Column.TEXT.value))
+                    return
+                row += 1
+            if not model.canFetchMore():
+                return
+            model.fetchMore()
+
     def segment(self, index: QModelIndex) -> QSqlRecord:
         return self.model().record(index.row())
 
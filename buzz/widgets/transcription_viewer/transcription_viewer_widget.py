@@ -1,3 +1,4 @@
+import html
 import logging
 from typing import Optional
 from uuid import UUID
@@ -22,6 +23,9 @@ from srt_equalizer import srt_equalizer
 from buzz.locale import _
 from buzz.db.entity.transcription import Transcription
 from buzz.db.service.transcription_service import TranscriptionService
+from buzz.db.writer import DatabaseWriter
+from buzz.db.dao.dao import from_record_value
+from buzz.db.word_timings import unpack_words, join_words
 from buzz.paths import file_path_as_title
 from buzz.settings.shortcuts import Shortcuts
 from buzz.settings.settings import Settings
@@ -72,6 +76,7 @@ class TranscriptionViewerWidget(QWidget):
         self,
         transcription: Transcription,
         transcription_service: TranscriptionService,
+        db_writer: DatabaseWriter,
         shortcuts: Shortcuts,
         parent: Optional["QWidget"] = None,
         flags: Qt.WindowType = Qt.WindowType.Widget,
@@ -79,6 +84,7 @@ class TranscriptionViewerWidget(QWidget):
         super().__init__(parent, flags)
         self.transcription = transcription
         self.transcription_service = transcription_service
+        self.db_writer = db_writer
 
         self.setMinimumWidth(800)
         self.setMinimumHeight(500)
@@ -122,7 +128,7 @@ class TranscriptionViewerWidget(QWidget):
         self.table_widget = TranscriptionSegmentsEditorWidget(
             transcription_id=UUID(hex=transcription.id),
             translator=self.translator,
-
+            db_writer=self.db_writer,
             parent=self
         )
         self.table_widget.segment_selected.connect(self.on_segment_selected)
@@ -140,6 +146,7 @@ class TranscriptionViewerWidget(QWidget):
         self.current_segment_label.setAlignment(Qt.AlignmentFlag.AlignHCenter)
         self.current_segment_label.setContentsMargins(0, 0, 0, 10)
         self.current_segment_label.setWordWrap(True)
+        self.current_segment_label.setTextFormat(Qt.TextFormat.RichText)
 
         font_metrics = self.current_segment_label.fontMetrics()
         max_height = font_metrics.lineSpacing() * 3
@@ -255,6 +262,11 @@ class TranscriptionViewerWidget(QWidget):
                 (segment.value("start_time"), segment.value("end_time"))
             )
 
+    def show_segment(self, segment_id: int, start_time: int):
+        """Selects the segment, e.g. one found by a search, and seeks to it"""
+        self.table_widget.select_segment(segment_id)
+        self.audio_player.set_position(start_time)
+
     def on_audio_player_position_ms_changed(self, position_ms: int) -> None:
         segments = self.table_widget.segments()
         current_segment = next(
@@ -268,7 +280,9 @@ class TranscriptionViewerWidget(QWidget):
             None,
         )
         if current_segment is not None:
-            self.current_segment_label.setText(current_segment.value("text"))
+            self.current_segment_label.setText(
+                format_current_word(current_segment, position_ms)
+            )
 
     def load_preferences(self):
         self.settings.settings.beginGroup("file_transcriber")
@@ -356,11 +370,15 @@ class TranscriptionViewerWidget(QWidget):
             if round(sub.start) != round(sub.end)
         ]
 
-        self.transcription_service.replace_transcription_segments(
-            UUID(hex=self.transcription.id),
-            segments
+        transcription_id = UUID(hex=self.transcription.id)
+        self.db_writer.submit(
+            lambda service: service.replace_transcription_segments(
+                transcription_id, segments
+            ),
+            self.on_segments_replaced,
         )
 
+    def on_segments_replaced(self):
         self.table_widget.model().select()
         self.table_widget.init_row_height()
         
@@ -408,3 +426,20 @@ class TranscriptionViewerWidget(QWidget):
         self.translation_thread.wait()
 
         super().closeEvent(event)
+
+
+def format_current_word(segment: QSqlRecord, position_ms: int) -> str:
+    """Text of the segment, with the word spoken at the position in bold"""
+    text = segment.value("text")
+    words = unpack_words(from_record_value(segment.value("words")))
+    if len(words) == 0 or join_words([word.text for word in words]) != text:
+        return html.escape(text)
+
+    texts = []
+    for word in words:
+        word_text = html.escape(word.text)
+        if word.start <= position_ms < word.end:
+            stripped = word_text.lstrip()
+            word_text = f"{word_text[:len(word_text) - len(stripped)]}<b>{stripped}</b>"
+        texts.append(word_text)
+    return join_words(texts)
@@ -0,0 +1,119 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from buzz import batch
+from buzz.batch import (
+    expand_inputs,
+    transcribe_and_write,
+    ProgressWriter,
+    main,
+    EXIT_USAGE,
+)
+from buzz.cli import CommandLineError
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+    OutputFormat,
+    Segment,
+)
+
+
+def create_files(tmp_path, names):
+    paths = []
+    for name in names:
+        path = os.path.join(tmp_path, name)
+        with open(path, "wb") as file:
+            file.write(b"audio")
+        paths.append(path)
+    return paths
+
+
+class TestExpandInputs:
+    def test_glob(self, tmp_path):
+        first, second, _ = create_files(tmp_path, ["a.mp3", "b.mp3", "c.wav"])
+
+        assert expand_inputs([os.path.join(tmp_path, "*.mp3")]) == [first, second]
+
+    def test_list_file(self, tmp_path):
+        first, second = create_files(tmp_path, ["a.mp3", "b.mp3"])
+        list_file = os.path.join(tmp_path, "files.txt")
+        with open(list_file, "w") as file:
+            file.write(f"# Episodes\n{second}\n\n{first}\n{second}\n")
+
+        assert expand_inputs([list_file]) == [second, first]
+
+    def test_no_match(self, tmp_path):
+        with pytest.raises(CommandLineError):
+            expand_inputs([os.path.join(tmp_path, "*.mp3")])
+
+    def test_missing_file_in_list(self, tmp_path):
+        list_file = os.path.join(tmp_path, "files.txt")
+        with open(list_file, "w") as file:
+            file.write(os.path.join(tmp_path, "missing.mp3"))
+
+        with pytest.raises(CommandLineError):
+            expand_inputs([list_file])
+
+
+class TestMain:
+    def test_invalid_model_type(self, tmp_path, capsys):
+        (path,) = create_files(tmp_path, ["a.mp3"])
+
+        assert main([path, "--model-type", "unknown"]) == EXIT_USAGE
+        assert "Invalid value for --model-type option" in capsys.readouterr().err
+
+
+class TestProgressWriter:
+    def test_emits_new_progress(self):
+        with patch.object(batch, "emit_progress") as emit_progress:
+            writer = ProgressWriter("a.mp3")
+            writer.write("\r 42%|####      | 4.2/10 [00:01<00:01]")
+            writer.write("\r 42%|####      | 4.3/10 [00:01<00:01]")
+            writer.write('new_segments = [{"text": "100% sure"}]')
+            writer.write("\r100%|##########| 10/10 [00:02<00:00]")
+
+        assert [call.args for call in emit_progress.call_args_list] == [
+            ("a.mp3", 0.42),
+            ("a.mp3", 1.0),
+        ]
+
+
+class TestTranscribeAndWrite:
+    def test_writes_outputs(self, tmp_path):
+        (path,) = create_files(tmp_path, ["a.mp3"])
+        task = FileTranscriptionTask(
+            file_path=path,
+            transcription_options=TranscriptionOptions(),
+            file_transcription_options=FileTranscriptionOptions(
+                file_paths=[path], output_formats={OutputFormat.TXT}
+            ),
+            model_path="",
+        )
+
+        with patch.object(
+            batch, "transcribe", return_value=[Segment(0, 1000, " Bonjour ")]
+        ):
+            result = transcribe_and_write(task)
+
+        assert result["event"] == "completed"
+        assert result["segments"] == [{"start": 0, "end": 1000, "text": "Bonjour"}]
+        assert len(result["outputs"]) == 1
+        with open(result["outputs"][0]) as file:
+            assert file.read().strip() == "Bonjour"
+
+    def test_failure(self, tmp_path):
+        (path,) = create_files(tmp_path, ["a.mp3"])
+        task = FileTranscriptionTask(
+            file_path=path,
+            transcription_options=TranscriptionOptions(),
+            file_transcription_options=FileTranscriptionOptions(file_paths=[path]),
+            model_path="",
+        )
+
+        with patch.object(batch, "transcribe", side_effect=Exception("Bad audio")):
+            result = transcribe_and_write(task)
+
+        assert result == {"event": "failed", "file": path, "error": "Bad audio"}
@@ -10,6 +10,7 @@ from buzz.db.dao.transcription_dao import TranscriptionDAO
 from buzz.db.dao.transcription_segment_dao import TranscriptionSegmentDAO
 from buzz.db.db import setup_test_db
 from buzz.db.service.transcription_service import TranscriptionService
+from buzz.db.writer import DatabaseWriter
 from buzz.settings.settings import Settings
 from buzz.settings.shortcuts import Shortcuts
 from buzz.widgets.application import Application
@@ -20,7 +21,10 @@ def db() -> QSqlDatabase:
     db = setup_test_db()
     yield db
     db.close()
-    os.remove(db.databaseName())
+    for suffix in ("", "-wal", "-shm"):
+        path = db.databaseName() + suffix
+        if os.path.exists(path):
+            os.remove(path)
 
 
 @pytest.fixture()
@@ -45,6 +49,14 @@ def transcription_segment_dao(db) -> TranscriptionSegmentDAO:
     return TranscriptionSegmentDAO(db)
 
 
+@pytest.fixture()
+def db_writer(qapp, db) -> DatabaseWriter:
+    writer = DatabaseWriter(db.databaseName())
+    writer.start()
+    yield writer
+    writer.stop()
+
+
 @pytest.fixture(scope="session")
 def qapp_cls():
     return Application
@@ -0,0 +1,89 @@
+import uuid
+
+import pytest
+
+from tests.transcription_service_test import create_task
+
+
+class TestDatabaseWriter:
+    def test_commits_writes(self, qtbot, db_writer, transcription_service):
+        task = create_task("/a.mp3")
+        committed = []
+
+        db_writer.submit(
+            lambda service: service.create_transcription(task),
+            lambda: committed.append(task.uid),
+        )
+        db_writer.submit(
+            lambda service: service.update_transcription_progress(task.uid, 0.5)
+        )
+
+        qtbot.waitUntil(lambda: committed == [task.uid])
+        db_writer.stop()
+
+        transcription = transcription_service.transcription_dao.find_by_id(
+            str(task.uid)
+        )
+        assert transcription.progress == 0.5
+
+    def test_commits_writes_in_batches(self, qtbot, db_writer):
+        tasks = [create_task(f"/{i}.mp3") for i in range(200)]
+        committed = []
+
+        for task in tasks:
+            db_writer.submit(
+                lambda service, task=task: service.create_transcription(task),
+                lambda task=task: committed.append(task.uid),
+            )
+
+        qtbot.waitUntil(lambda: len(committed) == len(tasks))
+        assert committed == [task.uid for task in tasks]
+        assert db_writer.commits < len(tasks)
+
+    def test_failed_write_does_not_roll_back_others(
+        self, qtbot, db_writer, transcription_service
+    ):
+        first = create_task("/a.mp3")
+        second = create_task("/b.mp3")
+        committed = []
+
+        def fail(service):
+            service.create_transcription(create_task("/c.mp3"))
+            raise ValueError("bad write")
+
+        db_writer.submit(lambda service: service.create_transcription(first))
+        db_writer.submit(fail)
+        db_writer.submit(
+            lambda service: service.create_transcription(second),
+            lambda: committed.append(True),
+        )
+
+        qtbot.waitUntil(lambda: committed == [True])
+
+        files = [
+            transcription.file
+            for transcription in transcription_service.transcription_dao.get_queued_transcriptions()
+        ]
+        assert sorted(files) == ["/a.mp3", "/b.mp3"]
+
+    def test_uses_wal(self, db):
+        query = db.exec("PRAGMA journal_mode")
+        assert query.next()
+        assert query.value(0) == "wal"
+
+
+class TestTransaction:
+    def test_nested_transaction_rolls_back_to_savepoint(self, transcription_service):
+        dao = transcription_service.transcription_dao
+        first = create_task("/a.mp3")
+
+        with dao.transaction():
+            transcription_service.create_transcription(first)
+            with pytest.raises(ValueError):
+                with dao.transaction():
+                    transcription_service.create_transcription(create_task("/b.mp3"))
+                    raise ValueError("bad write")
+
+        assert [transcription.id for transcription in dao.get_queued_transcriptions()] == [
+            str(first.uid)
+        ]
@@ -0,0 +1,69 @@
+import os
+from unittest.mock import Mock
+
+from buzz.file_transcriber_queue_worker import FileTranscriberQueueWorker
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+    OutputFormat,
+    Segment,
+)
+
+
+def create_task(tmp_path, name: str) -> FileTranscriptionTask:
+    file_path = os.path.join(tmp_path, name)
+    with open(file_path, "wb") as file:
+        file.write(b"audio")
+    return FileTranscriptionTask(
+        file_path=file_path,
+        transcription_options=TranscriptionOptions(),
+        file_transcription_options=FileTranscriptionOptions(
+            file_paths=[file_path], output_formats={OutputFormat.TXT}
+        ),
+        model_path="",
+        output_directory=str(tmp_path),
+    )
+
+
+class TestFileTranscriberQueueWorker:
+    def test_completes_duplicate_of_completed_task(self, qapp, tmp_path):
+        worker = FileTranscriberQueueWorker()
+        worker.coalescer.add_result(
+            create_task(tmp_path, "a.mp3"), [Segment(0, 1000, "Bonjour")]
+        )
+        mock_started = Mock()
+        mock_completed = Mock()
+        worker.task_started.connect(mock_started)
+        worker.task_completed.connect(mock_completed)
+        # Stops the worker once the duplicate is completed
+        worker.task_completed.connect(lambda *args: worker.tasks_queue.put(None))
+
+        duplicate = create_task(tmp_path, "b.mp3")
+        worker.add_task(duplicate)
+        worker.run()
+
+        mock_started.assert_called_once_with(duplicate)
+        mock_completed.assert_called_once_with(duplicate, [Segment(0, 1000, "Bonjour")])
+        # The duplicate gets its own output files
+        assert any(
+            name.startswith("b") and name.endswith(".txt") for name in os.listdir(tmp_path)
+        )
+
+    def test_completes_queued_duplicates_with_task(self, qapp, tmp_path):
+        worker = FileTranscriberQueueWorker()
+        mock_completed = Mock()
+        worker.task_completed.connect(mock_completed)
+
+        task = create_task(tmp_path, "a.mp3")
+        duplicate = create_task(tmp_path, "b.mp3")
+        canceled_duplicate = create_task(tmp_path, "c.mp3")
+        worker.add_task(duplicate)
+        worker.add_task(canceled_duplicate)
+        worker.cancel_task(canceled_duplicate.uid)
+
+        worker.current_task = task
+        worker.on_task_completed([Segment(0, 1000, "Bonjour")])
+
+        assert [call.args[0] for call in mock_completed.call_args_list] == [task, duplicate]
+        assert worker.tasks_queue.tasks() == [canceled_duplicate]
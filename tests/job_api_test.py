@@ -0,0 +1,295 @@
+import json
+import os
+import socket
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+
+from buzz.job_api import JobApiServer, create_task
+from buzz.model_loader import ModelType
+from buzz.transcriber.transcriber import FileTranscriptionTask, Segment, OutputFormat
+
+OPENAI_OPTIONS = {"model_type": "openaiapi", "openai_token": "token"}
+
+
+@pytest.fixture()
+def server(qtbot, tmp_path):
+    server = JobApiServer(
+        port=0,
+        upload_dir=str(tmp_path / "uploads"),
+        token_path=str(tmp_path / "token"),
+        max_upload_bytes=1024,
+    )
+    server.submitted_tasks = []
+    server.canceled_ids = []
+    server.job_submitted.connect(server.submitted_tasks.append)
+    server.cancel_requested.connect(server.canceled_ids.append)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture()
+def audio_file(tmp_path):
+    path = os.path.join(tmp_path, "audio.mp3")
+    with open(path, "wb") as file:
+        file.write(b"audio")
+    return path
+
+
+def request(
+    server, method, path, data=None, content_type="application/json", headers=None
+):
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{server.port}{path}", data=data, method=method
+    )
+    req.add_header("Authorization", f"Bearer {server.token}")
+    for name, value in (headers or {}).items():
+        req.add_header(name, value)
+    if data is not None:
+        req.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+
+
+def post_job(server, options):
+    status, body = request(server, "POST", "/jobs", json.dumps(options).encode())
+    return status, json.loads(body)
+
+
+def wait_for_submitted_task(qtbot, server) -> FileTranscriptionTask:
+    # The signal is delivered on the thread the server lives on
+    qtbot.waitUntil(lambda: len(server.submitted_tasks) == 1)
+    return server.submitted_tasks[0]
+
+
+class TestCreateTask:
+    def test_options(self, audio_file):
+        task = create_task(
+            {
+                **OPENAI_OPTIONS,
+                "file_path": audio_file,
+                "language": "fr",
+                "task": "translate",
+                "output_formats": ["srt"],
+                "priority": 2,
+            }
+        )
+
+        assert task.file_path == audio_file
+        assert task.transcription_options.model.model_type == ModelType.OPEN_AI_WHISPER_API
+        assert task.transcription_options.language == "fr"
+        assert task.file_transcription_options.output_formats == {OutputFormat.SRT}
+        assert task.priority == 2
+
+    def test_url(self):
+        task = create_task({**OPENAI_OPTIONS, "url": "https://example.com/a.mp3"})
+
+        assert task.url == "https://example.com/a.mp3"
+        assert task.source == FileTranscriptionTask.Source.URL_IMPORT
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"file_path": ""},
+            {"file_path": "missing.mp3"},
+            {"language": "xx"},
+            {"model_type": "unknown"},
+            {"output_formats": ["doc"]},
+        ],
+    )
+    def test_invalid_options(self, audio_file, options):
+        with pytest.raises(ValueError):
+            create_task({**OPENAI_OPTIONS, "file_path": audio_file, **options})
+
+
+class TestJobApiServer:
+    def test_submit_and_status(self, qtbot, server, audio_file):
+        status, job = post_job(server, {**OPENAI_OPTIONS, "file_path": audio_file})
+
+        assert status == 201
+        assert job["status"] == "queued"
+        task = wait_for_submitted_task(qtbot, server)
+        assert job["id"] == str(task.uid)
+
+        server.on_task_started(task)
+        server.on_task_progress(task, 0.5)
+
+        status, body = request(server, "GET", f"/jobs/{task.uid}")
+        assert status == 200
+        assert json.loads(body)["status"] == "in_progress"
+        assert json.loads(body)["progress"] == 0.5
+
+        status, body = request(server, "GET", "/jobs")
+        assert [job["id"] for job in json.loads(body)["jobs"]] == [str(task.uid)]
+
+    def test_invalid_job(self, server):
+        status, body = post_job(server, {"file_path": "missing.mp3"})
+
+        assert status == 400
+        assert "missing.mp3" in body["error"]
+        assert server.submitted_tasks == []
+
+    def test_unknown_job(self, server):
+        status, _ = request(
+            server, "GET", "/jobs/00000000-0000-0000-0000-000000000000"
+        )
+
+        assert status == 404
+
+    def test_malformed_job_id(self, server):
+        status, _ = request(server, "GET", f"/jobs/{'-' * 36}")
+
+        assert status == 404
+
+    def test_writes_token_only_user_can_read(self, server):
+        with open(server.token_path) as file:
+            assert file.read() == server.token
+        if os.name == "posix":
+            assert os.stat(server.token_path).st_mode & 0o777 == 0o600
+
+    @pytest.mark.parametrize(
+        "headers,expected_status",
+        [
+            ({"Authorization": "Bearer wrong"}, 401),
+            ({"Host": "attacker.example:80"}, 403),
+            ({"Origin": "http://attacker.example"}, 403),
+        ],
+    )
+    def test_rejects_requests(self, server, audio_file, headers, expected_status):
+        status, _ = request(
+            server,
+            "POST",
+            "/jobs",
+            json.dumps({**OPENAI_OPTIONS, "file_path": audio_file}).encode(),
+            headers=headers,
+        )
+
+        assert status == expected_status
+        assert server.submitted_tasks == []
+
+    def test_upload(self, qtbot, server):
+        query = urllib.parse.urlencode(
+            {"filename": "upload.mp3", "options": json.dumps(OPENAI_OPTIONS)}
+        )
+        status, _ = request(
+            server,
+            "POST",
+            f"/jobs?{query}",
+            b"uploaded audio",
+            content_type="application/octet-stream",
+        )
+
+        assert status == 201
+        task = wait_for_submitted_task(qtbot, server)
+        assert task.file_path.endswith("_upload.mp3")
+        with open(task.file_path, "rb") as file:
+            assert file.read() == b"uploaded audio"
+
+        server.on_task_completed(task, [])
+        assert not os.path.exists(task.file_path)
+
+    def test_upload_needs_content_type(self, server):
+        query = urllib.parse.urlencode({"filename": "upload.mp3"})
+        status, _ = request(
+            server, "POST", f"/jobs?{query}", b"audio", content_type="text/plain"
+        )
+
+        assert status == 415
+        assert server.submitted_tasks == []
+
+    def test_upload_too_large(self, server):
+        query = urllib.parse.urlencode({"filename": "upload.mp3"})
+        status, _ = request(
+            server,
+            "POST",
+            f"/jobs?{query}",
+            b"a" * 2048,
+            content_type="application/octet-stream",
+        )
+
+        assert status == 413
+        assert not os.path.exists(server.upload_dir) or os.listdir(server.upload_dir) == []
+
+    def test_upload_needs_body(self, server):
+        query = urllib.parse.urlencode({"filename": "upload.mp3"})
+        status, _ = request(
+            server,
+            "POST",
+            f"/jobs?{query}",
+            b"",
+            content_type="application/octet-stream",
+        )
+
+        assert status == 400
+        assert server.submitted_tasks == []
+
+    def test_truncated_upload(self, server):
+        query = urllib.parse.urlencode(
+            {"filename": "upload.mp3", "options": json.dumps(OPENAI_OPTIONS)}
+        )
+        with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+            sock.sendall(
+                (
+                    f"POST /jobs?{query} HTTP/1.1\r\n"
+                    f"Host: 127.0.0.1:{server.port}\r\n"
+                    f"Authorization: Bearer {server.token}\r\n"
+                    "Content-Type: application/octet-stream\r\n"
+                    "Content-Length: 100\r\n\r\n"
+                    "only part of the audio"
+                ).encode()
+            )
+            # The client disconnects before sending the rest of the body
+            sock.shutdown(socket.SHUT_WR)
+            response = sock.makefile("rb").readline()
+
+        assert response.split()[1] == b"400"
+        assert server.submitted_tasks == []
+        assert os.listdir(server.upload_dir) == []
+
+    def test_cancel(self, qtbot, server, audio_file):
+        _, job = post_job(server, {**OPENAI_OPTIONS, "file_path": audio_file})
+        task = wait_for_submitted_task(qtbot, server)
+
+        status, body = request(server, "DELETE", f"/jobs/{task.uid}")
+
+        assert status == 200
+        assert json.loads(body)["status"] == "canceled"
+        qtbot.waitUntil(lambda: server.canceled_ids == [task.uid])
+
+        # Events of the stopped transcriber come after the cancellation
+        server.on_task_error(task, "Stopped")
+        _, body = request(server, "GET", f"/jobs/{task.uid}")
+        assert json.loads(body)["status"] == "canceled"
+
+    def test_events(self, qtbot, server, audio_file):
+        post_job(server, {**OPENAI_OPTIONS, "file_path": audio_file})
+        task = wait_for_submitted_task(qtbot, server)
+
+        server.on_task_started(task)
+        server.on_task_segments(task, [Segment(0, 1000, " Bonjour")])
+        server.on_task_progress(task, 0.5)
+        server.on_task_completed(
+            task, [Segment(0, 1000, " Bonjour"), Segment(1000, 2000, " le monde")]
+        )
+
+        status, body = request(server, "GET", f"/jobs/{task.uid}/events")
+
+        assert status == 200
+        events = [
+            (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+            for lines in (event.split("\n") for event in body.decode().strip().split("\n\n"))
+        ]
+        assert [event for event, _ in events] == [
+            "started",
+            "segments",
+            "progress",
+            "completed",
+        ]
+        assert events[1][1]["segments"] == [{"start": 0, "end": 1000, "text": "Bonjour"}]
+        assert len(events[3][1]["segments"]) == 2
@@ -0,0 +1,91 @@
+import os
+import uuid
+from unittest.mock import patch
+
+from buzz.media_probe import (
+    probe_media,
+    get_media_info,
+    get_media_key,
+    MediaProbeService,
+)
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+)
+
+TESTDATA = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../testdata")
+MP3_FILE = os.path.join(TESTDATA, "whisper-french.mp3")
+WAV_FILE = os.path.join(TESTDATA, "whisper-latvian.wav")
+
+
+def create_task(file_path: str) -> FileTranscriptionTask:
+    return FileTranscriptionTask(
+        file_path=file_path,
+        transcription_options=TranscriptionOptions(),
+        file_transcription_options=FileTranscriptionOptions(file_paths=[file_path]),
+        model_path="",
+    )
+
+
+class TestProbeMedia:
+    def test_probe_mp3(self):
+        info = probe_media(MP3_FILE)
+
+        assert info.has_audio is True
+        assert info.format_name == "mp3"
+        assert info.audio_codec == "mp3"
+        assert info.sample_rate == 44100
+        assert info.channels == 2
+        assert abs(info.duration_ms - 8540) < 50
+
+    def test_probe_wav(self):
+        info = probe_media(WAV_FILE)
+
+        assert info.audio_codec == "pcm_s16le"
+        assert info.sample_rate == 16000
+        assert info.channels == 1
+        assert abs(info.duration_ms - 7190) < 50
+
+    def test_get_media_info_probes_once(self):
+        with patch("buzz.media_probe._cache", {}), patch(
+            "buzz.media_probe.probe_media", wraps=probe_media
+        ) as mock_probe:
+            get_media_info(WAV_FILE)
+            get_media_info(WAV_FILE)
+
+        assert mock_probe.call_count == 1
+
+
+class TestMediaProbeService:
+    def test_probes_and_stores_duration(self, qtbot, transcription_service):
+        task = create_task(MP3_FILE)
+        transcription_service.create_transcription(task)
+        service = MediaProbeService(transcription_service)
+
+        with qtbot.waitSignal(service.probed, timeout=10_000) as blocker:
+            service.probe(task.uid, MP3_FILE)
+
+        assert blocker.args[0] == task.uid
+        transcription = transcription_service.transcription_dao.find_by_id(str(task.uid))
+        assert abs(transcription.duration_ms - 8540) < 50
+
+        info = transcription_service.get_media_info(*get_media_key(MP3_FILE))
+        assert info.sample_rate == 44100
+        assert info.channels == 2
+
+        # A file that was probed before is read from the database
+        with patch("buzz.media_probe.probe_media") as mock_probe, qtbot.waitSignal(
+            service.probed, timeout=1000
+        ):
+            service.probe(uuid.uuid4(), MP3_FILE)
+        mock_probe.assert_not_called()
+
+        service.shutdown()
+
+    def test_changed_file_is_probed_again(self, transcription_service):
+        path, size, mtime = get_media_key(WAV_FILE)
+        transcription_service.save_media_info(path, size, mtime, probe_media(WAV_FILE))
+
+        assert transcription_service.get_media_info(path, size, mtime) is not None
+        assert transcription_service.get_media_info(path, size, mtime + 1) is None
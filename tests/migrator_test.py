@@ -0,0 +1,72 @@
+import sqlite3
+
+from buzz.db.migrator import dumb_migrate_db
+
+SCHEMA = """
+CREATE TABLE segment (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL
+);
+"""
+
+FTS_SCHEMA = (
+    SCHEMA
+    + """
+CREATE VIRTUAL TABLE segment_fts USING fts5(
+    text,
+    content='segment',
+    content_rowid='id'
+);
+CREATE TRIGGER segment_fts_insert AFTER INSERT ON segment BEGIN
+    INSERT INTO segment_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+)
+
+
+def search(db, text):
+    return [
+        row[0]
+        for row in db.execute(
+            "SELECT rowid FROM segment_fts WHERE segment_fts MATCH ? ORDER BY rowid",
+            (text,),
+        )
+    ]
+
+
+class TestDumbMigrateDb:
+    def test_creates_and_rebuilds_full_text_index(self):
+        db = sqlite3.connect(":memory:")
+        db.executescript(SCHEMA)
+        db.execute("INSERT INTO segment (text) VALUES ('hello world')")
+        db.commit()
+
+        assert dumb_migrate_db(db, FTS_SCHEMA)
+        db.execute("INSERT INTO segment (text) VALUES ('hello again')")
+        db.commit()
+
+        assert search(db, "hello") == [1, 2]
+        assert not dumb_migrate_db(db, FTS_SCHEMA)
+
+    def test_keeps_index_when_content_table_changes(self):
+        db = sqlite3.connect(":memory:")
+        db.executescript(FTS_SCHEMA)
+        db.execute("INSERT INTO segment (text) VALUES ('hello world')")
+        db.commit()
+
+        schema = FTS_SCHEMA.replace(
+            "text TEXT NOT NULL\n", "text TEXT NOT NULL,\n    extra TEXT\n", 1
+        )
+        assert dumb_migrate_db(db, schema)
+        db.execute("INSERT INTO segment (text) VALUES ('hello again')")
+
+        # The trigger is created again after the table
+        assert search(db, "hello") == [1, 2]
+
+    def test_drops_obsolete_trigger(self):
+        db = sqlite3.connect(":memory:")
+        db.executescript(FTS_SCHEMA)
+
+        dumb_migrate_db(db, FTS_SCHEMA.split("CREATE TRIGGER")[0])
+
+        assert db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall() == []
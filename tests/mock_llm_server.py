@@ -0,0 +1,186 @@
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+
+
+@dataclass
+class MockLLMServerOptions:
+    # Seconds before the first token is sent
+    latency: float = 0.0
+    # Tokens streamed per second after the first one, 0 sends them all at once
+    token_rate: float = 0.0
+    # Probability that a chat request fails with error_status
+    error_rate: float = 0.0
+    # Number of chat requests that fail with error_status before any succeed
+    fail_first: int = 0
+    error_status: int = 503
+    # Models reported as loaded by /api/ps
+    loaded_models: List[str] = field(default_factory=list)
+    seed: Optional[int] = None
+
+
+class MockLLMServer:
+    """
+    Local stand-in for the parts of the Ollama and OpenAI chat APIs that Buzz uses:
+    Ollama /api/chat, /api/ps and /, OpenAI /v1/chat/completions and /v1/models.
+
+    Replies are "translated: <last user message>", streamed one word per token.
+
+    Usage:
+        with MockLLMServer(MockLLMServerOptions(latency=0.05)) as server:
+            os.environ["OLLAMA_BASE_URL"] = server.url
+    """
+
+    def __init__(self, options: Optional[MockLLMServerOptions] = None):
+        self.options = options or MockLLMServerOptions()
+        self.requests: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self.random = random.Random(self.options.seed)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.create_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockLLMServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def chat_requests(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [request for request in self.requests if request.get("messages")]
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            if self.options.fail_first > 0:
+                self.options.fail_first -= 1
+                return True
+            return self.random.random() < self.options.error_rate
+
+    def create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive with chunked responses, like the real servers
+            protocol_version = "HTTP/1.1"
+            # Small streamed chunks would otherwise wait for delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/":
+                    self.send_body(200, b"Ollama is running", "text/plain")
+                elif self.path == "/api/ps":
+                    models = [{"name": name} for name in server.options.loaded_models]
+                    self.send_json(200, {"models": models})
+                elif self.path == "/v1/models":
+                    self.send_json(200, {"data": [{"id": "mock"}]})
+                else:
+                    self.send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server.lock:
+                    server.requests.append(body)
+
+                if self.path not in ("/api/chat", "/v1/chat/completions"):
+                    self.send_json(404, {"error": "not found"})
+                    return
+
+                messages = body.get("messages", [])
+                if len(messages) == 0:
+                    # Ollama loads the model for a request without messages
+                    if body.get("model") not in server.options.loaded_models:
+                        server.options.loaded_models.append(body.get("model"))
+                    self.send_json(200, {"model": body.get("model"), "done": True})
+                    return
+
+                if server.should_fail():
+                    self.send_json(server.options.error_status, {"error": "injected error"})
+                    return
+
+                tokens = self.reply_tokens(messages)
+                if self.path == "/api/chat":
+                    self.stream_ollama(tokens)
+                else:
+                    self.stream_openai(tokens)
+
+            @staticmethod
+            def reply_tokens(messages: List[Dict[str, str]]) -> List[str]:
+                reply = f"translated: {messages[-1]['content']}"
+                words = reply.split(" ")
+                return [words[0]] + [f" {word}" for word in words[1:]]
+
+            def wait_for_token(self, index: int):
+                if index == 0:
+                    time.sleep(server.options.latency)
+                elif server.options.token_rate > 0:
+                    time.sleep(1 / server.options.token_rate)
+
+            def stream_ollama(self, tokens: List[str]):
+                self.start_chunked("application/x-ndjson")
+                for i, token in enumerate(tokens):
+                    self.wait_for_token(i)
+                    self.write_chunk({"message": {"role": "assistant", "content": token}, "done": False})
+                self.write_chunk(
+                    {
+                        "message": {"role": "assistant", "content": ""},
+                        "done": True,
+                        "prompt_eval_count": 1,
+                        "eval_count": len(tokens),
+                    }
+                )
+                self.end_chunked()
+
+            def stream_openai(self, tokens: List[str]):
+                self.start_chunked("text/event-stream")
+                for i, token in enumerate(tokens):
+                    self.wait_for_token(i)
+                    self.write_chunk(
+                        {"choices": [{"delta": {"content": token}}]}, prefix="data: ", end="\n\n"
+                    )
+                self.write_raw(b"data: [DONE]\n\n")
+                self.end_chunked()
+
+            def start_chunked(self, content_type: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def write_chunk(self, data: Dict[str, Any], prefix: str = "", end: str = "\n"):
+                self.write_raw(f"{prefix}{json.dumps(data)}{end}".encode("utf-8"))
+
+            def write_raw(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def end_chunked(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def send_json(self, status: int, data: Dict[str, Any]):
+                self.send_body(status, json.dumps(data).encode("utf-8"), "application/json")
+
+            def send_body(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,136 @@
+import os
+from unittest.mock import patch
+
+from buzz.ollama_translator import ConversationHistory, OllamaTranslator, estimate_tokens
+from buzz.transcriber.transcriber import TranscriptionOptions
+from buzz.widgets.transcriber.advanced_settings_dialog import AdvancedSettingsDialog
+from tests.mock_llm_server import MockLLMServer, MockLLMServerOptions
+
+
+class TestConversationHistory:
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+        assert estimate_tokens("你好") == 2
+
+    def test_build_messages(self):
+        history = ConversationHistory(token_budget=100, max_exchanges=10)
+        history.add_exchange("Hello", "Hola")
+
+        messages = history.build_messages("Translate to Spanish", "Goodbye")
+
+        assert messages == [
+            {"role": "system", "content": "Translate to Spanish"},
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "Hola"},
+            {"role": "user", "content": "Goodbye"},
+        ]
+
+    def test_prefix_is_stable_until_budget_is_exceeded(self):
+        history = ConversationHistory(token_budget=20, max_exchanges=50)
+
+        previous_messages = history.build_messages("prompt", "x")[:-1]
+        for i in range(4):
+            assert history.add_exchange(f"text {i}", f"texto {i}") == []
+            messages = history.build_messages("prompt", "x")
+            assert messages[: len(previous_messages)] == previous_messages
+            previous_messages = messages[:-1]
+
+    def test_compacts_to_low_watermark(self):
+        history = ConversationHistory(token_budget=20, max_exchanges=50)
+
+        dropped = []
+        for i in range(10):
+            dropped = history.add_exchange("aaaaaaaa", "bbbbbbbb")
+            if dropped:
+                break
+
+        assert len(dropped) > 0
+        assert len(dropped) % 2 == 0
+        assert history.tokens() <= 10
+
+    def test_max_exchanges(self):
+        history = ConversationHistory(token_budget=10_000, max_exchanges=4)
+
+        for i in range(4):
+            assert history.add_exchange(f"{i}", f"{i}") == []
+
+        dropped = history.add_exchange("4", "4")
+
+        assert len(dropped) == 6
+        assert len(history) == 4
+
+    def test_summary_is_sent_after_system_prompt(self):
+        history = ConversationHistory(token_budget=100, max_exchanges=10)
+        history.summary = "Talked about cats"
+
+        messages = history.build_messages("prompt", "text")
+
+        assert messages[1]["role"] == "system"
+        assert "Talked about cats" in messages[1]["content"]
+
+    def test_reset(self):
+        history = ConversationHistory(token_budget=100, max_exchanges=10)
+        history.add_exchange("a", "b")
+        history.summary = "summary"
+
+        history.reset()
+
+        assert not history
+        assert history.tokens() == 0
+
+
+class TestOllamaTranslator:
+    def test_strip_think_tags(self):
+        assert OllamaTranslator.strip_think_tags("<think>hmm</think> Hola ") == "Hola"
+
+    def test_translates_with_history(self, qtbot):
+        transcription_options = TranscriptionOptions(
+            enable_llm_translation=True, llm_prompt="Translate to Spanish"
+        )
+        options = MockLLMServerOptions(fail_first=1)
+
+        with MockLLMServer(options) as server, patch.dict(
+            os.environ, {"OLLAMA_BASE_URL": server.url, "OLLAMA_MODEL": "mock"}
+        ):
+            translator = OllamaTranslator(
+                transcription_options,
+                AdvancedSettingsDialog(transcription_options=transcription_options),
+            )
+            translations = []
+            translator.translation.connect(
+                lambda text, transcript_id: translations.append((text, transcript_id))
+            )
+
+            translator.enqueue("Hello", 1)
+            translator.enqueue("Goodbye", 2)
+            translator.stop()
+            translator.start()
+
+            chat_requests = server.chat_requests()
+
+        # The first request fails with an injected error and is retried
+        assert translations == [("translated: Hello", 1), ("translated: Goodbye", 2)]
+        assert len(chat_requests) == 3
+        assert chat_requests[-1]["messages"] == [
+            {"role": "system", "content": "Translate to Spanish"},
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "translated: Hello"},
+            {"role": "user", "content": "Goodbye"},
+        ]
+
+    def test_does_not_load_model_when_built(self, qtbot):
+        transcription_options = TranscriptionOptions()
+
+        with MockLLMServer(MockLLMServerOptions()) as server, patch.dict(
+            os.environ, {"OLLAMA_BASE_URL": server.url, "OLLAMA_MODEL": "mock"}
+        ):
+            OllamaTranslator(
+                transcription_options,
+                AdvancedSettingsDialog(transcription_options=transcription_options),
+            )
+            qtbot.wait(200)
+
+            # Warm-up requests are POSTs without messages
+            assert server.requests == []
@@ -0,0 +1,66 @@
+import json
+import sqlite3
+
+import pytest
+
+from buzz import search
+from buzz.batch import EXIT_OK, EXIT_FAILED, EXIT_USAGE
+from buzz.search import main
+from buzz.transcriber.transcriber import Segment
+from tests.transcription_service_test import create_task
+
+
+class TestSearch:
+    @pytest.fixture(autouse=True)
+    def transcription(self, qapp, db, transcription_service, monkeypatch):
+        monkeypatch.setattr(search, "get_app_db_path", lambda: db.databaseName())
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(61000, 62500, "The quick brown fox", "Le renard")]
+        )
+        return task
+
+    def test_prints_matching_segments(self, transcription, capsys):
+        assert main(["quick", "bro"]) == EXIT_OK
+
+        assert capsys.readouterr().out == (
+            f"{transcription.uid}  00:01:01.000  a.mp3: The quick brown fox / Le renard\n"
+        )
+
+    def test_json(self, transcription, capsys):
+        assert main(["renard", "--json"]) == EXIT_OK
+
+        result = json.loads(capsys.readouterr().out)
+        assert result["transcription_id"] == str(transcription.uid)
+        assert result["start"] == 61000
+        assert result["end"] == 62500
+
+    def test_no_match(self, capsys):
+        assert main(["wolf"]) == EXIT_FAILED
+        assert capsys.readouterr().out == ""
+
+    def test_invalid_limit(self, capsys):
+        assert main(["fox", "--limit", "0"]) == EXIT_USAGE
+        assert "Invalid value for --limit option" in capsys.readouterr().err
+
+    def test_does_not_change_running_tasks(
+        self, transcription_service, transcription_dao
+    ):
+        task = create_task("/b.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_started(task.uid)
+
+        assert main(["fox"]) == EXIT_OK
+
+        assert transcription_dao.find_by_id(str(task.uid)).status == "in_progress"
+
+    def test_no_search_index(self, tmp_path, monkeypatch, capsys):
+        path = str(tmp_path / "old.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE transcription (id TEXT PRIMARY KEY)")
+        conn.close()
+        monkeypatch.setattr(search, "get_app_db_path", lambda: path)
+
+        assert main(["fox"]) == EXIT_FAILED
+        assert "no search index" in capsys.readouterr().err
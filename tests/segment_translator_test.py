@@ -0,0 +1,102 @@
+import json
+import os
+from unittest.mock import patch
+
+import httpx
+
+from buzz.segment_translator import SegmentTranslator
+from buzz.transcriber.transcriber import TranscriptionOptions, Segment
+from buzz.translation_client import OllamaTranslationClient, RetryPolicy
+
+
+def create_translator(handler) -> SegmentTranslator:
+    translator = SegmentTranslator(
+        transcription_options=TranscriptionOptions(
+            enable_llm_translation=True, llm_prompt="Translate to Spanish"
+        )
+    )
+    translator.client = OllamaTranslationClient(
+        base_url="http://ollama",
+        transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+    return translator
+
+
+def translate_handler(requests):
+    def handler(request: httpx.Request):
+        text = json.loads(request.content)["messages"][-1]["content"]
+        requests.append(text)
+        return httpx.Response(
+            200,
+            text=json.dumps({"message": {"content": f"es: {text}"}, "done": True}),
+        )
+
+    return handler
+
+
+@patch.dict(os.environ, {"TRANSLATION_PROVIDER": "OLLAMA"})
+class TestSegmentTranslator:
+    def test_translates_segments_before_completion(self):
+        requests = []
+        translator = create_translator(translate_handler(requests))
+        emitted = []
+        translator.translations.connect(emitted.extend)
+
+        translator.add_segments([Segment(0, 1000, " Hello"), Segment(1000, 2000, "world")])
+        # Drain the queued segments before the transcription completes
+        translator.queue.put(None)
+        translator.run()
+
+        segments = [
+            Segment(0, 1000, "Hello"),
+            Segment(1000, 2000, "world"),
+            Segment(2000, 3000, "again"),
+        ]
+        translator.complete(segments)
+
+        assert segments[0].translation == "es: Hello"
+        assert segments[1].translation == "es: world"
+        assert segments[2].translation == ""
+
+        translator.run()
+
+        assert emitted == [(2, "es: again")]
+        assert sorted(requests) == ["Hello", "again", "world"]
+
+    def test_emits_translations_in_batches(self):
+        requests = []
+        translator = create_translator(translate_handler(requests))
+        translator.batch_size = 2
+        batches = []
+        translator.translations.connect(batches.append)
+
+        segments = [Segment(i * 1000, (i + 1) * 1000, f"text {i}") for i in range(5)]
+        translator.complete(segments)
+        translator.run()
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [index for batch in batches for index, _ in batch] == [0, 1, 2, 3, 4]
+        assert batches[0][1] == (1, "es: text 1")
+
+    def test_failed_translation_is_retried_on_completion(self):
+        requests = []
+
+        def handler(request: httpx.Request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(400, text="bad request")
+            return httpx.Response(
+                200, text=json.dumps({"message": {"content": "Hola"}, "done": True})
+            )
+
+        translator = create_translator(handler)
+        emitted = []
+        translator.translations.connect(emitted.extend)
+
+        translator.add_segments([Segment(0, 1000, "Hello")])
+        translator.complete([Segment(0, 1000, "Hello")])
+        translator.run()
+
+        assert len(requests) == 2
+        assert emitted == [(0, "Hola")]
@@ -0,0 +1,207 @@
+import os
+import multiprocessing
+import time
+
+from buzz import spool as spool_module
+from buzz.spool import Spool, work, main, INCOMING, CLAIMED, DONE, FAILED
+from buzz.batch import EXIT_OK, EXIT_USAGE
+
+
+def create_file(tmp_path, name="audio.mp3") -> str:
+    path = os.path.join(tmp_path, name)
+    with open(path, "wb") as file:
+        file.write(b"audio")
+    return path
+
+
+def fake_transcribe(job: dict) -> dict:
+    return {
+        "status": "completed",
+        "segments": [{"start": 0, "end": 1000, "text": os.path.basename(job["file_path"])}],
+        "outputs": [],
+        "pid": os.getpid(),
+    }
+
+
+def run_fake_worker(directory: str):
+    work(
+        Spool(directory),
+        poll_secs=0.01,
+        exit_when_empty=True,
+        transcribe=lambda job: (time.sleep(0.05), fake_transcribe(job))[1],
+    )
+
+
+class TestSpool:
+    def test_claims_in_submission_order(self, tmp_path):
+        spool = Spool(str(tmp_path / "spool"))
+        first = spool.submit(create_file(tmp_path, "a.mp3"), {})
+        second = spool.submit(create_file(tmp_path, "b.mp3"), {})
+
+        assert spool.claim()["id"] == first
+        assert spool.claim()["id"] == second
+        assert spool.claim() is None
+        assert spool.list(CLAIMED) == [first, second]
+
+    def test_finish(self, tmp_path):
+        spool = Spool(str(tmp_path / "spool"))
+        completed_id = spool.submit(create_file(tmp_path, "a.mp3"), {})
+        failed_id = spool.submit(create_file(tmp_path, "b.mp3"), {})
+
+        spool.finish(spool.claim(), {"status": "completed", "segments": []})
+        spool.finish(spool.claim(), {"status": "failed", "error": "Bad audio"})
+
+        assert spool.list(DONE) == [completed_id]
+        assert spool.read(FAILED, failed_id)["error"] == "Bad audio"
+        assert spool.is_empty()
+
+    def test_reclaims_expired_lease(self, tmp_path):
+        now = [1000.0]
+        spool = Spool(str(tmp_path / "spool"), lease_secs=60, clock=lambda: now[0])
+        job_id = spool.submit(create_file(tmp_path), {})
+        job = spool.claim()
+
+        now[0] += 30
+        assert spool.reclaim_expired() == []
+
+        # The worker died without renewing its lease
+        now[0] += 31
+        assert spool.reclaim_expired() == [job_id]
+        assert spool.list(INCOMING) == [job_id]
+        assert spool.read(INCOMING, job_id)["attempts"] == 1
+
+        # The dead worker's result is dropped
+        assert spool.finish(job, {"status": "completed"}) is False
+        assert spool.list(DONE) == []
+
+    def test_fails_after_max_attempts(self, tmp_path):
+        now = [1000.0]
+        spool = Spool(
+            str(tmp_path / "spool"), lease_secs=60, max_attempts=2, clock=lambda: now[0]
+        )
+        job_id = spool.submit(create_file(tmp_path), {})
+
+        for _ in range(2):
+            spool.claim()
+            now[0] += 61
+            spool.reclaim_expired()
+
+        assert spool.is_empty()
+        assert spool.read(FAILED, job_id)["error"] == "Lease expired 2 times"
+
+    def test_requeues_job_of_worker_that_died_while_reclaiming(self, tmp_path):
+        now = [1000.0]
+        spool = Spool(str(tmp_path / "spool"), lease_secs=60, clock=lambda: now[0])
+        job_id = spool.submit(create_file(tmp_path), {})
+        spool.claim()
+
+        # The reclaiming worker died after renaming the expired job
+        reclaim_path = spool.path(CLAIMED, job_id) + ".reclaim-0123abcd"
+        os.rename(spool.path(CLAIMED, job_id), reclaim_path)
+        os.utime(reclaim_path, (now[0], now[0]))
+        assert not spool.is_empty()
+
+        now[0] += 30
+        assert spool.reclaim_expired() == []
+        assert spool.list(INCOMING) == []
+
+        now[0] += 31
+        assert spool.reclaim_expired() == [job_id]
+        assert spool.list(INCOMING) == [job_id]
+        assert spool.list_reclaims() == []
+
+    def test_heartbeat_renews_lease(self, tmp_path):
+        now = [1000.0]
+        spool = Spool(str(tmp_path / "spool"), lease_secs=60, clock=lambda: now[0])
+        job_id = spool.submit(create_file(tmp_path), {})
+        spool.claim()
+
+        now[0] += 50
+        assert spool.heartbeat(job_id)
+        now[0] += 50
+
+        assert spool.reclaim_expired() == []
+
+
+class TestWork:
+    def test_worker_processes(self, tmp_path):
+        directory = str(tmp_path / "spool")
+        spool = Spool(directory)
+        job_ids = [
+            spool.submit(create_file(tmp_path, f"{index}.mp3"), {}) for index in range(8)
+        ]
+
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_fake_worker, args=(directory,)) for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+
+        assert [process.exitcode for process in processes] == [0, 0, 0]
+        assert spool.list(DONE) == job_ids
+        assert spool.is_empty()
+        for index, job_id in enumerate(job_ids):
+            job = spool.read(DONE, job_id)
+            assert job["segments"][0]["text"] == f"{index}.mp3"
+            assert job["metrics"]["attempt"] == 1
+
+    def test_reclaims_job_of_dead_worker(self, tmp_path):
+        spool = Spool(str(tmp_path / "spool"), lease_secs=0.2)
+        job_id = spool.submit(create_file(tmp_path), {})
+        # Claimed by a worker that exits without finishing it
+        spool.claim()
+
+        work(spool, poll_secs=0.05, exit_when_empty=True, transcribe=fake_transcribe)
+
+        job = spool.read(DONE, job_id)
+        assert job["attempts"] == 1
+        assert job["metrics"]["attempt"] == 2
+
+
+class TestMain:
+    def test_submit(self, tmp_path, capsys):
+        create_file(tmp_path, "a.mp3")
+        create_file(tmp_path, "b.mp3")
+        directory = str(tmp_path / "spool")
+
+        assert (
+            main(
+                [
+                    "submit",
+                    directory,
+                    os.path.join(tmp_path, "*.mp3"),
+                    "--model-type",
+                    "fasterwhisper",
+                    "--srt",
+                ]
+            )
+            == EXIT_OK
+        )
+
+        spool = Spool(directory)
+        jobs = [spool.read(INCOMING, job_id) for job_id in spool.list(INCOMING)]
+        assert [os.path.basename(job["file_path"]) for job in jobs] == ["a.mp3", "b.mp3"]
+        assert jobs[0]["options"]["model_type"] == "fasterwhisper"
+        assert jobs[0]["options"]["output_formats"] == ["srt"]
+        assert "openai_token" not in jobs[0]["options"]
+
+    def test_submit_invalid_options(self, tmp_path, capsys):
+        create_file(tmp_path, "a.mp3")
+
+        assert (
+            main(["submit", str(tmp_path / "spool"), os.path.join(tmp_path, "a.mp3"), "-l", "xx"])
+            == EXIT_USAGE
+        )
+        assert "Invalid language option" in capsys.readouterr().err
+
+
+class TestTranscribeJob:
+    def test_invalid_options(self, tmp_path):
+        job = {"file_path": create_file(tmp_path), "options": {"model_type": "unknown"}}
+
+        result = spool_module.transcribe_job(job)
+
+        assert result["status"] == "failed"
@@ -0,0 +1,127 @@
+import os
+from unittest.mock import patch
+
+from buzz import task_coalescer
+from buzz.model_loader import TranscriptionModel, ModelType
+from buzz.task_coalescer import TaskCoalescer
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+    Segment,
+)
+
+
+def create_file(tmp_path, name: str, content: bytes = b"audio") -> str:
+    path = os.path.join(tmp_path, name)
+    with open(path, "wb") as file:
+        file.write(content)
+    return path
+
+
+def create_task(file_path: str, **options) -> FileTranscriptionTask:
+    return FileTranscriptionTask(
+        file_path=file_path,
+        transcription_options=TranscriptionOptions(**options),
+        file_transcription_options=FileTranscriptionOptions(file_paths=[file_path]),
+        model_path="",
+    )
+
+
+class TestTaskCoalescer:
+    def test_same_content_and_options(self, tmp_path):
+        coalescer = TaskCoalescer()
+        coalescer.add_result(
+            create_task(create_file(tmp_path, "a.mp3")), [Segment(0, 1000, "Bonjour")]
+        )
+
+        segments = coalescer.get_result(create_task(create_file(tmp_path, "copy.mp3")))
+
+        assert segments == [Segment(0, 1000, "Bonjour")]
+
+    def test_different_content_or_options(self, tmp_path):
+        coalescer = TaskCoalescer()
+        file_path = create_file(tmp_path, "a.mp3")
+        coalescer.add_result(create_task(file_path), [Segment(0, 1000, "Bonjour")])
+
+        assert coalescer.get_result(create_task(file_path, language="fr")) is None
+        assert (
+            coalescer.get_result(
+                create_task(
+                    file_path,
+                    model=TranscriptionModel(model_type=ModelType.FASTER_WHISPER),
+                )
+            )
+            is None
+        )
+        assert coalescer.get_result(create_task(create_file(tmp_path, "b.mp3", b"other"))) is None
+
+    def test_only_hashes_files_of_the_same_size(self, tmp_path):
+        coalescer = TaskCoalescer()
+
+        with patch.object(
+            task_coalescer, "get_file_hash", wraps=task_coalescer.get_file_hash
+        ) as get_file_hash:
+            task = create_task(create_file(tmp_path, "a.mp3"))
+            coalescer.add_file(task)
+            coalescer.add_result(task, [])
+            assert get_file_hash.call_count == 0
+
+            coalescer.get_result(create_task(create_file(tmp_path, "b.mp3", b"longer audio")))
+            assert get_file_hash.call_count == 0
+
+            # Hashes c.mp3 and a.mp3, once each
+            coalescer.get_result(create_task(create_file(tmp_path, "c.mp3", b"other")))
+            coalescer.get_result(create_task(create_file(tmp_path, "d.mp3", b"again")))
+            assert get_file_hash.call_count == 3
+
+    def test_file_moved_after_transcription(self, tmp_path):
+        coalescer = TaskCoalescer()
+        file_path = create_file(tmp_path, "watched.mp3")
+        task = create_task(file_path)
+        queued_duplicate = create_task(create_file(tmp_path, "copy.mp3"))
+        coalescer.add_file(task, [queued_duplicate])
+
+        # The folder watch moves the file once it is transcribed
+        os.rename(file_path, os.path.join(tmp_path, "done.mp3"))
+        coalescer.add_result(task, [Segment(0, 1000, "Bonjour")])
+
+        assert coalescer.get_result(queued_duplicate) == [Segment(0, 1000, "Bonjour")]
+
+    def test_does_not_hash_file_without_queued_task_of_same_size(self, tmp_path):
+        coalescer = TaskCoalescer()
+        task = create_task(create_file(tmp_path, "a.mp3"))
+
+        with patch.object(task_coalescer, "get_file_hash") as get_file_hash:
+            coalescer.add_file(
+                task, [create_task(create_file(tmp_path, "b.mp3", b"longer audio"))]
+            )
+
+        get_file_hash.assert_not_called()
+
+    def test_skips_url_imports_and_translations(self, tmp_path):
+        coalescer = TaskCoalescer()
+        file_path = create_file(tmp_path, "a.mp3")
+        coalescer.add_result(create_task(file_path), [])
+
+        assert coalescer.get_result(create_task(None)) is None
+        assert coalescer.get_result(create_task(file_path, enable_llm_translation=True)) is None
+
+    def test_returns_copies(self, tmp_path):
+        coalescer = TaskCoalescer()
+        task = create_task(create_file(tmp_path, "a.mp3"))
+        coalescer.add_result(task, [Segment(0, 1000, "Bonjour")])
+
+        coalescer.get_result(task)[0].text = "Edited"
+
+        assert coalescer.get_result(task)[0].text == "Bonjour"
+
+    def test_keeps_latest_results(self, tmp_path):
+        coalescer = TaskCoalescer(max_results=1)
+        first = create_task(create_file(tmp_path, "a.mp3", b"first"))
+        second = create_task(create_file(tmp_path, "b.mp3", b"second"))
+        coalescer.add_result(first, [])
+        coalescer.add_result(second, [])
+
+        assert coalescer.get_result(first) is None
+        assert coalescer.get_result(second) == []
@@ -0,0 +1,34 @@
+import uuid
+
+from buzz.task_progress import TaskProgressModel
+
+
+class TestTaskProgressModel:
+    def test_saves_progress_at_intervals(self, qapp):
+        model = TaskProgressModel(persist_interval_secs=60)
+        id = uuid.uuid4()
+
+        assert model.set_progress(id, 0.1)
+        assert not model.set_progress(id, 0.2)
+        assert not model.set_progress(id, 0.2)
+        assert model.get(id) == 0.2
+
+        model.remove(id)
+        assert model.get(id) is None
+        assert model.set_progress(id, 0.3)
+
+    def test_coalesces_changes(self, qtbot):
+        model = TaskProgressModel(repaint_interval_ms=50)
+        first, second = uuid.uuid4(), uuid.uuid4()
+        emitted = []
+        model.changed.connect(emitted.append)
+
+        for i in range(100):
+            model.set_progress(first, i / 100)
+            model.set_progress(second, i / 100)
+
+        qtbot.waitUntil(lambda: len(emitted) == 1)
+        assert set(emitted[0]) == {first, second}
+
+        qtbot.wait(100)
+        assert len(emitted) == 1
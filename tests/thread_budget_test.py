@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from buzz import thread_budget
+from buzz.thread_budget import ThreadBudget, get_total_threads, limit_process_threads
+
+
+class TestThreadBudget:
+    def test_splits_threads_between_jobs(self):
+        budget = ThreadBudget(total=8)
+
+        assert budget.acquire("file") == 8
+        assert budget.acquire("recording") == 4
+        assert budget.acquire("batch") == 2
+
+    def test_at_least_one_thread(self):
+        budget = ThreadBudget(total=2)
+        for job_id in range(3):
+            budget.acquire(job_id)
+
+        assert budget.share() == 1
+
+    def test_release_returns_threads(self):
+        budget = ThreadBudget(total=8)
+        budget.acquire("file")
+        budget.acquire("recording")
+
+        budget.release("recording")
+        budget.release("unknown")
+
+        assert budget.share() == 8
+
+
+class TestGetTotalThreads:
+    def test_env(self, monkeypatch):
+        monkeypatch.setenv("BUZZ_THREAD_BUDGET", "6")
+
+        assert get_total_threads() == 6
+
+    def test_default(self, monkeypatch):
+        monkeypatch.delenv("BUZZ_THREAD_BUDGET", raising=False)
+
+        assert get_total_threads() == os.cpu_count()
+
+
+class TestLimitProcessThreads:
+    @pytest.fixture(autouse=True)
+    def restore(self, monkeypatch):
+        for name in thread_budget.THREAD_ENV_VARIABLES:
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(thread_budget, "process_threads", 0)
+        torch = pytest.importorskip("torch")
+        threads = torch.get_num_threads()
+        yield
+        torch.set_num_threads(threads)
+
+    def test_limits_engines(self):
+        import torch
+
+        limit_process_threads(2)
+
+        assert os.environ["OMP_NUM_THREADS"] == "2"
+        assert os.environ["MKL_NUM_THREADS"] == "2"
+        assert torch.get_num_threads() == 2
+        assert thread_budget.get_ffmpeg_threads() == "2"
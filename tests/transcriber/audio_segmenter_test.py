@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from buzz.transcriber.audio_segmenter import AudioSegmenter
+
+AUDIO_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../../testdata/whisper-french.mp3"
+)
+
+
+class TestAudioSegmenter:
+    def test_find_cut_points_snaps_to_silence(self):
+        cut_points = AudioSegmenter.find_cut_points(
+            silences=[(100, 102), (550, 552), (590, 592), (1150, 1152)],
+            duration=1500,
+            max_chunk_duration=600,
+        )
+
+        # The last silence before the maximum duration is used
+        assert cut_points == [591, 1151]
+
+    def test_find_cut_points_without_silence(self):
+        cut_points = AudioSegmenter.find_cut_points(
+            silences=[(10, 11)], duration=1300, max_chunk_duration=600
+        )
+
+        assert cut_points == [600, 1200]
+
+    def test_find_cut_points_short_file(self):
+        assert AudioSegmenter.find_cut_points([], duration=10, max_chunk_duration=600) == []
+
+    def test_detect_silences(self):
+        silences, duration = AudioSegmenter().detect_silences(AUDIO_FILE)
+
+        assert duration == pytest.approx(8.5, abs=0.1)
+        assert len(silences) == 2
+        assert silences[0][0] == pytest.approx(1.55, abs=0.05)
+
+    def test_split(self, tmp_path):
+        chunks = AudioSegmenter(max_chunk_duration=6).split(AUDIO_FILE, str(tmp_path))
+
+        assert len(chunks) == 2
+        assert chunks[0].start == 0
+        assert chunks[1].start == pytest.approx(5.29, abs=0.05)
+        assert chunks[1].end == pytest.approx(8.5, abs=0.1)
+        assert all(os.path.isfile(chunk.file_path) for chunk in chunks)
+        assert all(chunk.file_path.endswith(".ogg") for chunk in chunks)
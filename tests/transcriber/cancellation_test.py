@@ -0,0 +1,81 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from buzz.transcriber.cancellation import (
+    CancellationToken,
+    CancellableFile,
+    CANCEL_TIMEOUT_SECS,
+)
+from buzz.transcriber.transcriber import Stopped
+
+
+class TestCancellationToken:
+    def test_calls_callbacks_once(self):
+        token = CancellationToken()
+        callback = Mock()
+        token.on_cancel(callback)
+
+        token.cancel()
+        token.cancel()
+
+        callback.assert_called_once()
+        assert token.is_canceled
+
+    def test_on_cancel_after_cancel(self):
+        token = CancellationToken()
+        token.cancel()
+        callback = Mock()
+
+        token.on_cancel(callback)
+
+        callback.assert_called_once()
+
+    def test_sleep_stops_on_cancel(self):
+        token = CancellationToken()
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        with pytest.raises(Stopped):
+            token.sleep(30)
+
+        assert time.monotonic() - started < CANCEL_TIMEOUT_SECS
+
+    def test_run_returns_result(self):
+        assert CancellationToken().run(lambda a, b: a + b, 1, b=2) == 3
+
+    def test_run_raises_error(self):
+        def fail():
+            raise ValueError("bad chunk")
+
+        with pytest.raises(ValueError, match="bad chunk"):
+            CancellationToken().run(fail)
+
+    def test_run_stops_waiting_on_cancel(self):
+        token = CancellationToken()
+        response = threading.Event()
+        threading.Timer(0.05, token.cancel).start()
+
+        started = time.monotonic()
+        with pytest.raises(Stopped):
+            token.run(response.wait, 30)
+
+        assert time.monotonic() - started < CANCEL_TIMEOUT_SECS
+        response.set()
+
+
+class TestCancellableFile:
+    def test_stops_reading_on_cancel(self, tmp_path):
+        path = tmp_path / "chunk.ogg"
+        path.write_bytes(b"0123456789")
+        token = CancellationToken()
+
+        with open(path, "rb") as file:
+            cancellable_file = CancellableFile(file, token)
+            assert cancellable_file.read(4) == b"0123"
+
+            token.cancel()
+            with pytest.raises(Stopped):
+                cancellable_file.read(4)
@@ -0,0 +1,90 @@
+import os
+
+from buzz.transcriber.checkpoint import TranscriptionCheckpoint, get_task_cache_directory
+from buzz.transcriber.transcriber import Segment
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_audio_file(tmp_path) -> str:
+    file_path = os.path.join(tmp_path, "audio.mp3")
+    with open(file_path, "wb") as file:
+        file.write(b"audio")
+    return file_path
+
+
+class TestTranscriptionCheckpoint:
+    def test_load_without_checkpoint(self, tmp_path):
+        file_path = create_audio_file(tmp_path)
+        checkpoint = TranscriptionCheckpoint(file_path, {}, cache_dir=str(tmp_path))
+
+        assert checkpoint.load() == ([], 0)
+
+    def test_saves_after_interval(self, tmp_path):
+        file_path = create_audio_file(tmp_path)
+        clock = FakeClock()
+        checkpoint = TranscriptionCheckpoint(
+            file_path, {"model": "tiny"}, cache_dir=str(tmp_path), interval=30, clock=clock
+        )
+
+        checkpoint.add_segments([Segment(0, 1000, "Bonjour")], offset_ms=1000)
+        assert not os.path.exists(checkpoint.path)
+
+        clock.now = 31
+        checkpoint.add_segments([Segment(1000, 2500, "le monde")], offset_ms=2500)
+        assert os.path.exists(checkpoint.path)
+
+        resumed = TranscriptionCheckpoint(
+            file_path, {"model": "tiny"}, cache_dir=str(tmp_path)
+        )
+        assert resumed.load() == (
+            [Segment(0, 1000, "Bonjour"), Segment(1000, 2500, "le monde")],
+            2500,
+        )
+
+    def test_resumes_and_merges_segments(self, tmp_path):
+        file_path = create_audio_file(tmp_path)
+        checkpoint = TranscriptionCheckpoint(file_path, {}, cache_dir=str(tmp_path))
+        checkpoint.add_segments([Segment(0, 1000, "Bonjour")], offset_ms=1000)
+        checkpoint.save()
+
+        resumed = TranscriptionCheckpoint(file_path, {}, cache_dir=str(tmp_path))
+        resumed.load()
+        resumed.add_segments([Segment(1000, 2000, "le monde")], offset_ms=2000)
+        resumed.save()
+
+        assert TranscriptionCheckpoint(file_path, {}, cache_dir=str(tmp_path)).load() == (
+            [Segment(0, 1000, "Bonjour"), Segment(1000, 2000, "le monde")],
+            2000,
+        )
+
+    def test_clear(self, tmp_path):
+        file_path = create_audio_file(tmp_path)
+        checkpoint = TranscriptionCheckpoint(file_path, {}, cache_dir=str(tmp_path))
+        checkpoint.add_segments([Segment(0, 1000, "Bonjour")], offset_ms=1000)
+        checkpoint.save()
+
+        checkpoint.clear()
+
+        assert not os.path.exists(checkpoint.directory)
+        assert checkpoint.load() == ([], 0)
+
+    def test_directory_changes_with_options_and_file(self, tmp_path):
+        file_path = create_audio_file(tmp_path)
+        directory = get_task_cache_directory("checkpoints", file_path, {"model": "tiny"})
+
+        assert directory != get_task_cache_directory(
+            "checkpoints", file_path, {"model": "small"}
+        )
+
+        with open(file_path, "ab") as file:
+            file.write(b"more audio")
+        assert directory != get_task_cache_directory(
+            "checkpoints", file_path, {"model": "tiny"}
+        )
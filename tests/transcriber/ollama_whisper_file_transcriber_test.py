@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from unittest.mock import patch, Mock
+
+import httpx
+import pytest
+
+from buzz.transcriber.audio_segmenter import AudioSegmenter
+from buzz.transcriber.cancellation import CANCEL_TIMEOUT_SECS
+from buzz.transcriber.ollama_whisper_file_transcriber import (
+    OllamaWhisperFileTranscriber,
+)
+from buzz.transcriber.remote_client import RemoteBackendClient
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+)
+
+
+def segments_response():
+    return httpx.Response(
+        200, json={"segments": [{"start": 0, "end": 1.5, "text": "Bonjour"}]}
+    )
+
+
+def mock_server(transcriber: OllamaWhisperFileTranscriber, responses):
+    """Replies to uploads with the given responses, or raises them if they are exceptions"""
+    uploads = []
+    responses = iter(responses)
+
+    def handler(request: httpx.Request):
+        if request.url.path == "/":
+            return httpx.Response(200, text="Ollama is running")
+
+        uploads.append(request)
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    transcriber.client = RemoteBackendClient(
+        "http://ollama", transport=httpx.MockTransport(handler)
+    )
+    return uploads
+
+
+class TestOllamaWhisperFileTranscriber:
+    @pytest.fixture(autouse=True)
+    def clear_health_cache(self):
+        with patch.dict("buzz.transcriber.remote_client._health", clear=True):
+            yield
+
+    @pytest.fixture(autouse=True)
+    def chunks_cache_dir(self, tmp_path):
+        with patch("buzz.transcriber.checkpoint.get_cache_path", return_value=str(tmp_path)):
+            yield tmp_path / "remote_chunks"
+
+    @pytest.fixture
+    def transcriber(self):
+        file_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "../../testdata/whisper-french.mp3",
+        )
+        return OllamaWhisperFileTranscriber(
+            task=FileTranscriptionTask(
+                file_path=file_path,
+                transcription_options=TranscriptionOptions(),
+                file_transcription_options=FileTranscriptionOptions(
+                    file_paths=[file_path]
+                ),
+                model_path="",
+            )
+        )
+
+    def test_transcribe(self, transcriber, chunks_cache_dir):
+        mock_completed = Mock()
+        transcriber.completed.connect(mock_completed)
+
+        uploads = mock_server(transcriber, [segments_response()])
+        transcriber.run()
+
+        assert uploads[0].url.path == "/api/audio"
+        assert b'filename="chunk_0000.ogg"' in uploads[0].content
+        called_segments = mock_completed.call_args[0][0]
+        assert len(called_segments) == 1
+        assert called_segments[0].end == 1500
+        assert called_segments[0].text == "Bonjour"
+        # Results are discarded once the transcription completes
+        assert list(chunks_cache_dir.iterdir()) == []
+
+    def test_error_response_fails_task(self, transcriber):
+        mock_completed = Mock()
+        mock_error = Mock()
+        transcriber.completed.connect(mock_completed)
+        transcriber.error.connect(mock_error)
+
+        mock_server(transcriber, [httpx.Response(400, text="bad model")])
+        transcriber.run()
+
+        mock_completed.assert_not_called()
+        mock_error.assert_called_with("Ollama API error: 400 - bad model")
+
+    def test_fails_when_server_is_not_available(self, transcriber):
+        mock_error = Mock()
+        transcriber.error.connect(mock_error)
+        transcriber.client = RemoteBackendClient(
+            "http://ollama",
+            transport=httpx.MockTransport(lambda request: httpx.Response(502)),
+        )
+
+        transcriber.run()
+
+        mock_error.assert_called_with(
+            "Ollama server is not available at http://localhost:11434"
+        )
+
+    def test_retries_transient_errors(self, transcriber):
+        mock_completed = Mock()
+        transcriber.completed.connect(mock_completed)
+
+        uploads = mock_server(
+            transcriber,
+            [
+                httpx.ConnectError("connection refused"),
+                httpx.Response(503, text="loading model"),
+                segments_response(),
+            ],
+        )
+        with patch(
+            "buzz.transcriber.cancellation.CancellationToken.sleep"
+        ) as mock_sleep:
+            transcriber.run()
+
+        assert len(uploads) == 3
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [2, 4]
+        assert mock_completed.call_args[0][0][0].text == "Bonjour"
+
+    def test_resumes_from_saved_chunks(self, transcriber):
+        mock_completed = Mock()
+        mock_error = Mock()
+        transcriber.completed.connect(mock_completed)
+        transcriber.error.connect(mock_error)
+
+        # Split the file into two chunks, the upload of the second one fails
+        with patch(
+            "buzz.transcriber.ollama_whisper_file_transcriber.AudioSegmenter",
+            return_value=AudioSegmenter(max_chunk_duration=6),
+        ):
+            mock_server(
+                transcriber, [segments_response(), httpx.Response(400, text="bad chunk")]
+            )
+            transcriber.run()
+
+            mock_error.assert_called_once()
+
+            uploads = mock_server(transcriber, [segments_response()])
+            transcriber.run()
+
+        # Only the failed chunk is uploaded again
+        assert len(uploads) == 1
+        called_segments = mock_completed.call_args[0][0]
+        assert len(called_segments) == 2
+        assert called_segments[0].start == 0
+        assert called_segments[1].start == pytest.approx(5290, abs=50)
+
+    def test_stop_while_waiting_for_server(self, transcriber, qtbot):
+        mock_error = Mock()
+        transcriber.error.connect(mock_error)
+        uploading = threading.Event()
+        response = threading.Event()
+
+        def handler(request: httpx.Request):
+            if request.url.path == "/":
+                return httpx.Response(200, text="Ollama is running")
+            uploading.set()
+            response.wait(timeout=30)
+            return segments_response()
+
+        transcriber.client = RemoteBackendClient(
+            "http://ollama", transport=httpx.MockTransport(handler)
+        )
+        thread = threading.Thread(target=transcriber.run)
+        thread.start()
+        assert uploading.wait(timeout=30)
+
+        stopped_at = time.monotonic()
+        transcriber.stop()
+        thread.join(timeout=30)
+
+        assert time.monotonic() - stopped_at < CANCEL_TIMEOUT_SECS
+        response.set()
+        qtbot.waitUntil(lambda: mock_error.call_args == (("Stopped",),))
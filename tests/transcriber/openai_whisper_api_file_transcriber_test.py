@@ -1,21 +1,33 @@
 import os
+import threading
+import time
 from unittest.mock import patch, Mock
 
+import httpx
 import pytest
 
 from buzz.transcriber.openai_whisper_api_file_transcriber import (
     OpenAIWhisperAPIFileTranscriber,
+    AdaptiveConcurrencyLimiter,
 )
+from buzz.transcriber.cancellation import CANCEL_TIMEOUT_SECS, CancellationToken
 from buzz.transcriber.transcriber import (
     FileTranscriptionTask,
     TranscriptionOptions,
     FileTranscriptionOptions,
+    Segment,
 )
 
+from openai import RateLimitError
 from openai.types.audio import Transcription, Translation
 
 
 class TestOpenAIWhisperAPIFileTranscriber:
+    @pytest.fixture(autouse=True)
+    def chunks_cache_dir(self, tmp_path):
+        with patch("buzz.transcriber.checkpoint.get_cache_path", return_value=str(tmp_path)):
+            yield tmp_path / "remote_chunks"
+
     @pytest.fixture
     def mock_openai_client(self):
         with patch(
@@ -64,3 +76,204 @@ class TestOpenAIWhisperAPIFileTranscriber:
         assert called_segments[0].start == 0
         assert called_segments[0].end == 6560
         assert called_segments[0].text == "Hello"
+
+    def test_transcribe_large_file_in_parallel_chunks(self, mock_openai_client, qtbot):
+        file_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "../../testdata/whisper-french.mp3",
+        )
+        transcriber = OpenAIWhisperAPIFileTranscriber(
+            task=FileTranscriptionTask(
+                file_path=file_path,
+                transcription_options=TranscriptionOptions(),
+                file_transcription_options=FileTranscriptionOptions(
+                    file_paths=[file_path]
+                ),
+                model_path="",
+            )
+        )
+        mock_completed = Mock()
+        mock_progress = Mock()
+        transcriber.completed.connect(mock_completed)
+        transcriber.progress.connect(mock_progress)
+
+        # Split the 8.5 second file into chunks of at most 3 seconds
+        transcriber.max_chunk_duration = 3
+        transcriber.run()
+
+        assert mock_openai_client.return_value.audio.transcriptions.create.call_count == 4
+
+        called_segments = mock_completed.call_args[0][0]
+        starts = [segment.start for segment in called_segments]
+        assert len(called_segments) == 4
+        assert starts == sorted(starts)
+        assert starts[0] == 0
+        # The first cut is in the middle of the silence at 1.55s - 2.12s
+        assert starts[1] == 1840
+
+        # Progress is emitted from the upload threads
+        qtbot.waitUntil(lambda: mock_progress.call_args == (((4, 4),),))
+
+    def test_resumes_failed_transcription(self, mock_openai_client, qtbot, chunks_cache_dir):
+        file_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "../../testdata/whisper-french.mp3",
+        )
+        transcriber = OpenAIWhisperAPIFileTranscriber(
+            task=FileTranscriptionTask(
+                file_path=file_path,
+                transcription_options=TranscriptionOptions(),
+                file_transcription_options=FileTranscriptionOptions(
+                    file_paths=[file_path]
+                ),
+                model_path="",
+            )
+        )
+        transcriber.max_concurrency = 1
+        transcriber.max_chunk_duration = 3
+        mock_completed = Mock()
+        mock_error = Mock()
+        transcriber.completed.connect(mock_completed)
+        transcriber.error.connect(mock_error)
+
+        create = mock_openai_client.return_value.audio.transcriptions.create
+        transcription = create.return_value
+        create.side_effect = [transcription, transcription, Exception("Invalid file")]
+        transcriber.run()
+
+        mock_error.assert_called_with("Invalid file")
+        mock_completed.assert_not_called()
+
+        create.reset_mock()
+        create.side_effect = None
+        transcriber.run()
+
+        # The two chunks that were transcribed before the error are not uploaded again
+        assert create.call_count == 2
+        assert len(mock_completed.call_args[0][0]) == 4
+        assert list(chunks_cache_dir.iterdir()) == []
+
+    def test_stop_while_uploading_chunks(self, mock_openai_client, qtbot, chunks_cache_dir):
+        file_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "../../testdata/whisper-french.mp3",
+        )
+        transcriber = OpenAIWhisperAPIFileTranscriber(
+            task=FileTranscriptionTask(
+                file_path=file_path,
+                transcription_options=TranscriptionOptions(),
+                file_transcription_options=FileTranscriptionOptions(
+                    file_paths=[file_path]
+                ),
+                model_path="",
+            )
+        )
+        transcriber.max_chunk_duration = 3
+        mock_error = Mock()
+        transcriber.error.connect(mock_error)
+
+        create = mock_openai_client.return_value.audio.transcriptions.create
+        transcription = create.return_value
+        uploading = threading.Event()
+        response = threading.Event()
+
+        def slow_create(**kwargs):
+            uploading.set()
+            response.wait(timeout=30)
+            return transcription
+
+        create.side_effect = slow_create
+        thread = threading.Thread(target=transcriber.run)
+        thread.start()
+        assert uploading.wait(timeout=30)
+
+        stopped_at = time.monotonic()
+        transcriber.stop()
+        thread.join(timeout=30)
+
+        assert time.monotonic() - stopped_at < CANCEL_TIMEOUT_SECS
+        response.set()
+        qtbot.waitUntil(lambda: mock_error.call_args == (("Stopped",),))
+
+    def test_releases_upload_slot_while_backing_off(self, mock_openai_client):
+        file_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "../../testdata/whisper-french.mp3",
+        )
+        transcriber = OpenAIWhisperAPIFileTranscriber(
+            task=FileTranscriptionTask(
+                file_path=file_path,
+                transcription_options=TranscriptionOptions(),
+                file_transcription_options=FileTranscriptionOptions(
+                    file_paths=[file_path]
+                ),
+                model_path="",
+            )
+        )
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=2)
+        cancellation = CancellationToken()
+        active_while_uploading = []
+        active_while_sleeping = []
+        cancellation.sleep = lambda delay: active_while_sleeping.append(limiter.active)
+        rate_limited = RateLimitError(
+            "Rate limited",
+            response=httpx.Response(
+                429, request=httpx.Request("POST", "https://api.openai.com")
+            ),
+            body=None,
+        )
+
+        responses = iter([rate_limited, [Segment(0, 1000, "Hello")]])
+
+        def get_segments_for_file(*args, **kwargs):
+            active_while_uploading.append(limiter.active)
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        with patch.object(
+            transcriber, "get_segments_for_file", side_effect=get_segments_for_file
+        ):
+            segments = transcriber.get_segments_for_chunk(
+                file_path, offset_ms=0, limiter=limiter, cancellation=cancellation
+            )
+
+        assert segments == [Segment(0, 1000, "Hello")]
+        assert active_while_uploading == [1, 1]
+        assert active_while_sleeping == [0]
+        assert limiter.active == 0
+
+
+class TestAdaptiveConcurrencyLimiter:
+    def test_halves_limit_when_rate_limited(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=4, increase_after=2)
+
+        limiter.on_rate_limited()
+        assert limiter.limit == 2
+        limiter.on_rate_limited()
+        limiter.on_rate_limited()
+        assert limiter.limit == 1
+
+        limiter.on_success()
+        limiter.on_success()
+        assert limiter.limit == 2
+
+    def test_limits_active_uploads(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=2)
+        active = []
+        lock = threading.Lock()
+
+        def upload():
+            with limiter:
+                with lock:
+                    active.append(limiter.active)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=upload) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(active) <= 2
@@ -0,0 +1,147 @@
+import os
+import socket
+import threading
+from unittest.mock import patch, Mock
+
+import httpx
+import pytest
+
+from buzz.transcriber.cancellation import CancellationToken, CANCEL_TIMEOUT_SECS
+from buzz.transcriber.remote_client import (
+    RemoteBackendClient,
+    get_http_client,
+    get_request_metrics,
+)
+from buzz.transcriber.transcriber import Stopped
+
+AUDIO_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "../../testdata/whisper-french.mp3"
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    with patch.dict("buzz.transcriber.remote_client._health", clear=True), patch.dict(
+        "buzz.transcriber.remote_client._metrics", clear=True
+    ):
+        yield
+
+
+class TestRemoteBackendClient:
+    def test_shares_pool_per_host(self):
+        assert get_http_client("http://server:11434") is get_http_client(
+            "http://server:11434/api/audio"
+        )
+        assert get_http_client("http://server:11434") is not get_http_client(
+            "http://other:11434"
+        )
+
+    def test_caches_health_status(self):
+        requests = []
+
+        def handler(request: httpx.Request):
+            requests.append(request)
+            return httpx.Response(200, text="Ollama is running")
+
+        client = RemoteBackendClient(
+            "http://ollama", transport=httpx.MockTransport(handler)
+        )
+
+        assert client.is_healthy() is True
+        assert client.is_healthy() is True
+        assert len(requests) == 1
+
+        assert client.is_healthy(ttl=0) is True
+        assert len(requests) == 2
+
+    def test_failed_upload_marks_server_unhealthy(self):
+        def handler(request: httpx.Request):
+            raise httpx.ConnectError("connection refused")
+
+        client = RemoteBackendClient(
+            "http://ollama", transport=httpx.MockTransport(handler)
+        )
+
+        with pytest.raises(httpx.ConnectError):
+            client.post_file("/api/audio", AUDIO_FILE)
+
+        assert client.is_healthy() is False
+
+    def test_post_file_records_metrics(self):
+        def handler(request: httpx.Request):
+            body = request.read()
+            assert b'filename="whisper-french.mp3"' in body
+            assert b'name="model"' in body
+            return httpx.Response(200, json={"text": "Bonjour"})
+
+        client = RemoteBackendClient(
+            "http://ollama", transport=httpx.MockTransport(handler)
+        )
+        response = client.post_file(
+            "/api/audio", AUDIO_FILE, content_type="audio/mpeg", data={"model": "whisper"}
+        )
+
+        assert response.json() == {"text": "Bonjour"}
+
+        metrics = get_request_metrics("http://ollama")
+        assert metrics.requests == 1
+        assert metrics.bytes_sent > os.path.getsize(AUDIO_FILE)
+        assert metrics.bytes_received == len(response.content)
+
+    def test_post_file_aborts_canceled_upload(self):
+        handler = Mock(return_value=httpx.Response(200))
+        client = RemoteBackendClient(
+            "http://ollama", transport=httpx.MockTransport(handler)
+        )
+        cancellation = CancellationToken()
+        cancellation.cancel()
+
+        with pytest.raises(Stopped):
+            client.post_file("/api/audio", AUDIO_FILE, cancellation=cancellation)
+
+        handler.assert_not_called()
+
+    def test_post_file_releases_connection_when_canceled_waiting(self):
+        # A server that receives the upload and never replies
+        server = socket.create_server(("127.0.0.1", 0))
+        received = threading.Event()
+        closed = threading.Event()
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                conn.settimeout(30)
+                request = b""
+                while True:
+                    data = conn.recv(65536)
+                    if data == b"":
+                        closed.set()
+                        return
+                    request += data
+                    # The last boundary of the multipart body
+                    if request.endswith(b"--\r\n"):
+                        received.set()
+
+        threading.Thread(target=serve, daemon=True).start()
+        client = RemoteBackendClient(f"http://127.0.0.1:{server.getsockname()[1]}")
+        cancellation = CancellationToken()
+        errors = []
+
+        def upload():
+            try:
+                client.post_file("/api/audio", AUDIO_FILE, cancellation=cancellation)
+            except Exception as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=upload, daemon=True)
+        thread.start()
+        # The whole file has been uploaded, the request waits for the response
+        assert received.wait(timeout=30)
+
+        cancellation.cancel()
+        thread.join(timeout=CANCEL_TIMEOUT_SECS)
+
+        assert not thread.is_alive()
+        assert [type(error) for error in errors] == [Stopped]
+        assert closed.wait(timeout=CANCEL_TIMEOUT_SECS)
+        server.close()
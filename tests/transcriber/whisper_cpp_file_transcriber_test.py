@@ -1,3 +1,4 @@
+import ctypes
 from typing import List
 from unittest.mock import Mock
 
@@ -135,3 +136,12 @@ class TestWhisperCppFileTranscriber:
             assert expected_segment.start == segments[i].start
             assert expected_segment.end == segments[i].end
             assert expected_segment.text in segments[i].text
+
+    def test_abort_callback(self):
+        state = WhisperCppFileTranscriber.State()
+        user_data = ctypes.c_void_p(id(state))
+
+        assert WhisperCppFileTranscriber.abort_callback(user_data) is False
+
+        state.running = False
+        assert WhisperCppFileTranscriber.abort_callback(user_data) is True
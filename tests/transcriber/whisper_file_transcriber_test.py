@@ -1,18 +1,21 @@
 import glob
 import logging
+import multiprocessing
 import os
 import platform
 import shutil
 import sys
 import tempfile
 import time
+from types import SimpleNamespace
 from typing import List
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 from pytestqt.qtbot import QtBot
 
 from buzz.model_loader import TranscriptionModel, ModelType, WhisperModelSize
+from buzz.transcriber.cancellation import CancellationToken, CANCEL_TIMEOUT_SECS
 from buzz.transcriber.transcriber import (
     OutputFormat,
     get_output_file_path,
@@ -21,6 +24,7 @@ from buzz.transcriber.transcriber import (
     Task,
     FileTranscriptionOptions,
     Segment,
+    Stopped,
 )
 from buzz.transcriber.whisper_file_transcriber import WhisperFileTranscriber
 from tests.audio import test_audio_path
@@ -329,3 +333,64 @@ class TestWhisperFileTranscriber:
 
         # Assert that file was not created
         assert os.path.isfile(output_file_path) is False
+
+
+class TestWhisperFileTranscriberCancellation:
+    @pytest.fixture
+    def task(self):
+        return FileTranscriptionTask(
+            file_path=test_audio_path,
+            transcription_options=TranscriptionOptions(
+                model=TranscriptionModel(
+                    model_type=ModelType.FASTER_WHISPER,
+                    whisper_model_size=WhisperModelSize.TINY,
+                )
+            ),
+            file_transcription_options=FileTranscriptionOptions(
+                file_paths=[test_audio_path]
+            ),
+            model_path="",
+        )
+
+    def test_faster_whisper_saves_checkpoint_when_canceled(self, task, tmp_path):
+        cancellation = CancellationToken()
+
+        def decode_segments():
+            yield SimpleNamespace(start=0.0, end=1.5, text="Bienvenue", words=None)
+            cancellation.cancel()
+            yield SimpleNamespace(start=1.5, end=3.0, text="dans", words=None)
+
+        model = Mock()
+        model.transcribe.return_value = (
+            decode_segments(),
+            SimpleNamespace(duration=8.5),
+        )
+
+        with patch(
+            "buzz.transcriber.checkpoint.get_cache_path", return_value=str(tmp_path)
+        ):
+            with pytest.raises(Stopped):
+                WhisperFileTranscriber.transcribe_faster_whisper(
+                    task, model=model, cancellation=cancellation
+                )
+
+            # The next run continues after the first segment
+            model.transcribe.return_value = (iter([]), SimpleNamespace(duration=8.5))
+            segments = WhisperFileTranscriber.transcribe_faster_whisper(task, model=model)
+
+        assert model.transcribe.call_args.kwargs["clip_timestamps"] == [1.5]
+        assert [segment.text for segment in segments] == ["Bienvenue"]
+
+    def test_terminates_busy_process_when_canceled(self, task):
+        transcriber = WhisperFileTranscriber(task=task)
+        transcriber.current_process = multiprocessing.get_context("spawn").Process(
+            target=time.sleep, args=(30,)
+        )
+        transcriber.current_process.start()
+
+        stopped_at = time.monotonic()
+        transcriber.stop()
+        transcriber.join_process()
+
+        assert time.monotonic() - stopped_at < 2 * CANCEL_TIMEOUT_SECS
+        assert transcriber.current_process.exitcode != 0
@@ -0,0 +1,112 @@
+import threading
+from typing import Optional
+
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+)
+from buzz.transcription_scheduler import TaskScheduler, SchedulingPolicy
+
+
+def create_task(
+    name: str, priority: int = 0, duration_ms: Optional[int] = None
+) -> FileTranscriptionTask:
+    return FileTranscriptionTask(
+        file_path=name,
+        transcription_options=TranscriptionOptions(),
+        file_transcription_options=FileTranscriptionOptions(file_paths=[name]),
+        model_path="",
+        priority=priority,
+        duration_ms=duration_ms,
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+def drain(scheduler: TaskScheduler):
+    return [scheduler.get().file_path for _ in range(scheduler.qsize())]
+
+
+class TestTaskScheduler:
+    def test_fifo_within_priority(self):
+        scheduler = TaskScheduler(policy=SchedulingPolicy.FIFO)
+        scheduler.put(create_task("a"))
+        scheduler.put(create_task("b", priority=1))
+        scheduler.put(create_task("c"))
+        scheduler.put(create_task("d", priority=1))
+
+        assert drain(scheduler) == ["b", "d", "a", "c"]
+
+    def test_shortest_first(self):
+        scheduler = TaskScheduler(policy=SchedulingPolicy.SHORTEST_FIRST)
+        scheduler.put(create_task("lecture", duration_ms=6 * 60 * 60 * 1000))
+        scheduler.put(create_task("unknown"))
+        scheduler.put(create_task("voicemail", duration_ms=30_000))
+        scheduler.put(create_task("urgent", priority=1, duration_ms=60 * 60 * 1000))
+
+        assert drain(scheduler) == ["urgent", "voicemail", "lecture", "unknown"]
+
+    def test_aging_prevents_starvation(self):
+        clock = FakeClock()
+        scheduler = TaskScheduler(
+            policy=SchedulingPolicy.SHORTEST_FIRST, aging_interval=600, clock=clock
+        )
+        scheduler.put(create_task("lecture", duration_ms=6 * 60 * 60 * 1000))
+
+        clock.time = 300
+        scheduler.put(create_task("voicemail-1", duration_ms=30_000))
+        assert scheduler.get().file_path == "voicemail-1"
+
+        # After waiting for an aging interval the lecture is ahead of new short files
+        clock.time = 700
+        scheduler.put(create_task("voicemail-2", duration_ms=30_000))
+        assert scheduler.get().file_path == "lecture"
+
+    def test_move_to_front(self):
+        scheduler = TaskScheduler(policy=SchedulingPolicy.FIFO)
+        tasks = [create_task(name) for name in ["a", "b", "c"]]
+        tasks[1].priority = 2
+        for task in tasks:
+            scheduler.put(task)
+
+        assert scheduler.move_to_front(tasks[2].uid) is True
+        assert tasks[2].priority == 3
+        assert drain(scheduler) == ["c", "b", "a"]
+
+    def test_remove(self):
+        scheduler = TaskScheduler()
+        tasks = [create_task(name) for name in ["a", "b"]]
+        for task in tasks:
+            scheduler.put(task)
+
+        assert scheduler.remove(tasks[0].uid) is tasks[0]
+        assert scheduler.remove(tasks[0].uid) is None
+        assert drain(scheduler) == ["b"]
+
+    def test_set_duration(self):
+        scheduler = TaskScheduler(policy=SchedulingPolicy.SHORTEST_FIRST)
+        tasks = [create_task("a", duration_ms=60_000), create_task("b")]
+        for task in tasks:
+            scheduler.put(task)
+
+        scheduler.set_duration(tasks[1].uid, 1000)
+
+        assert [task.file_path for task in scheduler.tasks()] == ["b", "a"]
+
+    def test_get_waits_for_task(self):
+        scheduler = TaskScheduler()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(scheduler.get()))
+        thread.start()
+
+        scheduler.put(None)
+        thread.join(timeout=5)
+
+        assert results == [None]
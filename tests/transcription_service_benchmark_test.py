@@ -0,0 +1,45 @@
+from buzz.transcriber.transcriber import Segment
+from tests.transcription_service_test import create_task
+
+# Word-level timings of a few hours of speech
+NUM_SEGMENTS = 100_000
+
+
+def create_segments() -> list:
+    return [
+        Segment(start=index * 300, end=(index + 1) * 300, text=f" word{index}")
+        for index in range(NUM_SEGMENTS)
+    ]
+
+
+class TestTranscriptionServiceBenchmark:
+    def test_update_transcription_as_completed(self, benchmark, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        segments = create_segments()
+
+        benchmark.pedantic(
+            transcription_service.update_transcription_as_completed,
+            args=(task.uid, segments),
+            rounds=1,
+            iterations=1,
+        )
+
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert len(saved) == NUM_SEGMENTS
+        assert saved[-1].text == f" word{NUM_SEGMENTS - 1}"
+
+    def test_replace_transcription_segments(self, benchmark, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(task.uid, create_segments())
+        segments = create_segments()
+
+        benchmark.pedantic(
+            transcription_service.replace_transcription_segments,
+            args=(task.uid, segments),
+            rounds=1,
+            iterations=1,
+        )
+
+        assert len(transcription_service.get_transcription_segments(task.uid)) == NUM_SEGMENTS
@@ -0,0 +1,305 @@
+import sqlite3
+import uuid
+
+import pytest
+
+from buzz.db.helpers import requeue_interrupted_transcriptions, pack_word_level_segments
+from buzz.db.service.transcription_service import to_match_query
+from buzz.db.entity.transcription import Transcription
+from buzz.db.entity.transcription_segment import TranscriptionSegment
+from buzz.model_loader import TranscriptionModel, ModelType, WhisperModelSize
+from buzz.transcriber.transcriber import (
+    FileTranscriptionTask,
+    TranscriptionOptions,
+    FileTranscriptionOptions,
+    OutputFormat,
+    Task,
+    Segment,
+)
+
+
+def create_task(file_path: str, **kwargs) -> FileTranscriptionTask:
+    return FileTranscriptionTask(
+        file_path=file_path,
+        transcription_options=TranscriptionOptions(
+            language="fr",
+            task=Task.TRANSLATE,
+            model=TranscriptionModel(
+                model_type=ModelType.WHISPER_CPP,
+                whisper_model_size=WhisperModelSize.SMALL,
+            ),
+            word_level_timings=True,
+            temperature=(0.0, 0.4),
+            initial_prompt="Bonjour",
+            openai_access_token="secret",
+        ),
+        file_transcription_options=FileTranscriptionOptions(
+            file_paths=[file_path],
+            output_formats={OutputFormat.SRT, OutputFormat.TXT},
+        ),
+        model_path="",
+        output_directory="/tmp/output",
+        **kwargs,
+    )
+
+
+class TestTranscriptionService:
+    def test_get_queued_tasks(self, qapp, transcription_service):
+        first = create_task("/a.mp3", priority=2, duration_ms=1000)
+        second = create_task("/b.mp3")
+        transcription_service.create_transcription(first)
+        transcription_service.create_transcription(second)
+
+        tasks = transcription_service.get_queued_tasks(openai_access_token="token")
+
+        assert [task.uid for task in tasks] == [first.uid, second.uid]
+        task = tasks[0]
+        assert task.file_path == "/a.mp3"
+        assert task.output_directory == "/tmp/output"
+        assert task.priority == 2
+        assert task.duration_ms == 1000
+        assert task.file_transcription_options.file_paths == ["/a.mp3"]
+        assert task.file_transcription_options.output_formats == {
+            OutputFormat.SRT,
+            OutputFormat.TXT,
+        }
+
+        options = task.transcription_options
+        assert options.language == "fr"
+        assert options.task == Task.TRANSLATE
+        assert options.model.model_type == ModelType.WHISPER_CPP
+        assert options.model.whisper_model_size == WhisperModelSize.SMALL
+        assert options.word_level_timings is True
+        assert options.temperature == (0.0, 0.4)
+        assert options.initial_prompt == "Bonjour"
+        assert options.openai_access_token == "token"
+
+    def test_get_queued_tasks_skips_started_tasks(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_started(task.uid)
+
+        assert transcription_service.get_queued_tasks() == []
+
+    def test_update_transcription_priority(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_priority(task.uid, 5)
+
+        assert transcription_service.get_queued_tasks()[0].priority == 5
+
+    def test_update_transcription_as_completed(self, qapp, transcription_service, transcription_dao):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        segments = [Segment(i * 1000, (i + 1) * 1000, f"segment {i}", "") for i in range(3)]
+
+        transcription_service.update_transcription_as_completed(task.uid, segments)
+
+        assert transcription_dao.find_by_id(str(task.uid)).status == "completed"
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert [(segment.start_time, segment.end_time, segment.text) for segment in saved] == [
+            (0, 1000, "segment 0"),
+            (1000, 2000, "segment 1"),
+            (2000, 3000, "segment 2"),
+        ]
+
+    def test_replace_transcription_segments(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(0, 1000, "Bonjour", "Hello")]
+        )
+
+        transcription_service.replace_transcription_segments(
+            task.uid, [Segment(0, 500, "Bon"), Segment(500, 1000, "jour")]
+        )
+
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert [(segment.text, segment.translation) for segment in saved] == [
+            ("Bon", ""),
+            ("jour", ""),
+        ]
+
+    def test_failed_write_is_rolled_back(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(0, 1000, "Bonjour")]
+        )
+
+        # The text column is NOT NULL
+        with pytest.raises(Exception):
+            transcription_service.replace_transcription_segments(
+                task.uid, [Segment(0, 500, "Bon"), Segment(500, 1000, None)]
+            )
+
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert [segment.text for segment in saved] == ["Bonjour"]
+
+
+class TestWordLevelTimings:
+    def test_saves_words_packed_in_sentences(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        words = [
+            Segment(i * 100, (i + 1) * 100, text)
+            for i, text in enumerate([" Hello", " there.", " How", " are", " you?"])
+        ]
+
+        transcription_service.update_transcription_as_completed(
+            task.uid, words, word_level_timings=True
+        )
+
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert [(segment.start_time, segment.end_time, segment.text) for segment in saved] == [
+            (0, 200, "Hello there."),
+            (200, 500, "How are you?"),
+        ]
+        assert transcription_service.get_transcription_words(task.uid) == words
+        assert len(transcription_service.search_segments("there")) == 1
+
+    def test_updates_translations_of_words(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        words = [
+            Segment(i * 100, (i + 1) * 100, text)
+            for i, text in enumerate(["Bonjour.", "Au", "revoir."])
+        ]
+        transcription_service.update_transcription_as_completed(
+            task.uid, words, word_level_timings=True
+        )
+
+        transcription_service.update_segment_translations(
+            task.uid, [(0, "Hello."), (2, "bye.")]
+        )
+        transcription_service.update_segment_translations(task.uid, [(1, "Good")])
+
+        saved = transcription_service.get_transcription_segments(task.uid)
+        assert [segment.translation for segment in saved] == ["Hello.", "Good bye."]
+        assert [
+            word.translation
+            for word in transcription_service.get_transcription_words(task.uid)
+        ] == ["Hello.", "Good", "bye."]
+
+    def test_packs_words_saved_a_row_each(
+        self, qapp, db, transcription_dao, transcription_service
+    ):
+        word_level = create_task("/a.mp3")
+        sentence_level = create_task("/b.mp3")
+        transcription_service.create_transcription(word_level)
+        transcription_service.create_transcription(sentence_level)
+        # Saved by a version without the transcription options
+        legacy_id = str(uuid.uuid4())
+        transcription_dao.insert(Transcription(id=legacy_id, status="completed"))
+        words = [
+            Segment(i * 100, (i + 1) * 100, text, "")
+            for i, text in enumerate(["Hi.", "Bye", "now."])
+        ]
+        transcription_service.update_transcription_as_completed(word_level.uid, words)
+        transcription_service.update_transcription_as_completed(
+            sentence_level.uid, [Segment(0, 100, "Hi."), Segment(100, 300, "Bye now.")]
+        )
+        db.exec(f"UPDATE transcription SET transcription_options = NULL WHERE id = '{sentence_level.uid}'")
+        transcription_service.transcription_segment_dao.insert_all(
+            [
+                TranscriptionSegment(word.start, word.end, word.text, "", legacy_id)
+                for word in words
+            ]
+        )
+
+        conn = sqlite3.connect(db.databaseName())
+        pack_word_level_segments(conn)
+        conn.close()
+
+        for id in [word_level.uid, uuid.UUID(legacy_id)]:
+            saved = transcription_service.get_transcription_segments(id)
+            assert [segment.text for segment in saved] == ["Hi.", "Bye now."]
+            assert transcription_service.get_transcription_words(id) == words
+        saved = transcription_service.get_transcription_segments(sentence_level.uid)
+        assert [segment.words for segment in saved] == [None, None]
+
+
+class TestSearchSegments:
+    def test_finds_text_and_translations(self, qapp, transcription_service):
+        first = create_task("/a.mp3")
+        second = create_task("/b.mp3")
+        transcription_service.create_transcription(first)
+        transcription_service.create_transcription(second)
+        transcription_service.update_transcription_as_completed(
+            first.uid,
+            [Segment(0, 1000, "The quick brown fox"), Segment(1000, 2000, "jumps")],
+        )
+        transcription_service.update_transcription_as_completed(
+            second.uid, [Segment(500, 1500, "Un renard brun", "A brown fox")]
+        )
+
+        results = transcription_service.search_segments("brown fo")
+
+        # Newest first
+        assert [(result.transcription_id, result.start_time) for result in results] == [
+            (str(second.uid), 500),
+            (str(first.uid), 0),
+        ]
+        assert results[0].file == "/b.mp3"
+        assert results[0].translation == "A brown fox"
+        assert transcription_service.search_segments("brown", limit=1) == results[:1]
+        assert transcription_service.search_segments("wolf") == []
+        assert transcription_service.search_segments("  ") == []
+
+    def test_updates_index(self, qapp, db, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(0, 1000, "Bonjour")]
+        )
+
+        transcription_service.update_segment_translations(task.uid, [(0, "Hello")])
+        assert len(transcription_service.search_segments("hello")) == 1
+
+        transcription_service.replace_transcription_segments(
+            task.uid, [Segment(0, 1000, "Salut")]
+        )
+        assert transcription_service.search_segments("bonjour") == []
+        assert len(transcription_service.search_segments("salut")) == 1
+
+        # Deleted from the history, the segments are deleted by the foreign key
+        db.exec(f"DELETE FROM transcription WHERE id = '{task.uid}'")
+        assert transcription_service.search_segments("salut") == []
+
+    def test_search_text_is_not_query_syntax(self, qapp, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(0, 1000, 'He said "don\'t" OR NOT')]
+        )
+
+        assert len(transcription_service.search_segments('"don\'t" OR')) == 1
+        assert to_match_query('a "b"') == '"a" """b"""*'
+
+
+class TestRequeueInterruptedTranscriptions:
+    def test_requeues_in_progress_transcriptions(
+        self, qapp, db, transcription_dao, transcription_service
+    ):
+        in_progress = create_task("/a.mp3")
+        transcription_service.create_transcription(in_progress)
+        transcription_service.update_transcription_progress(in_progress.uid, 0.5)
+        queued = create_task("/b.mp3")
+        transcription_service.create_transcription(queued)
+        # Saved by a version without the transcription options
+        legacy_id = str(uuid.uuid4())
+        transcription_dao.insert(Transcription(id=legacy_id, status="in_progress"))
+
+        conn = sqlite3.connect(db.databaseName())
+        requeue_interrupted_transcriptions(conn)
+        conn.close()
+
+        restarted = transcription_dao.find_by_id(str(in_progress.uid))
+        assert restarted.status == "queued"
+        assert restarted.progress == 0.0
+        assert transcription_dao.find_by_id(str(queued.uid)).status == "queued"
+        assert transcription_dao.find_by_id(legacy_id).status == "canceled"
+        assert [task.uid for task in transcription_service.get_queued_tasks()] == [
+            in_progress.uid,
+            queued.uid,
+        ]
@@ -0,0 +1,214 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from buzz.translation_client import (
+    OllamaTranslationClient,
+    OpenAICompatibleTranslationClient,
+    RetryPolicy,
+    TranslationClientError,
+)
+
+NO_DELAY_RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+class TestOllamaTranslationClient:
+    def test_chat_streams_partial_content(self):
+        def handler(request: httpx.Request):
+            assert request.url.path == "/api/chat"
+            body = json.loads(request.content)
+            assert body["stream"] is True
+            assert body["keep_alive"] == "5m"
+            lines = [
+                {"message": {"content": "Hola"}, "done": False},
+                {"message": {"content": " mundo"}, "done": False},
+                {"message": {"content": ""}, "done": True, "prompt_eval_count": 12},
+            ]
+            return httpx.Response(
+                200, text="\n".join(json.dumps(line) for line in lines)
+            )
+
+        client = OllamaTranslationClient(
+            base_url="http://ollama", transport=httpx.MockTransport(handler)
+        )
+        partials = []
+
+        response = asyncio.run(
+            client.chat(
+                model="llama3",
+                messages=[{"role": "user", "content": "Hello world"}],
+                on_partial=partials.append,
+                keep_alive="5m",
+            )
+        )
+
+        assert response.content == "Hola mundo"
+        assert response.metrics["prompt_eval_count"] == 12
+        assert response.metrics["first_token_latency"] >= 0
+        assert partials == ["Hola", "Hola mundo"]
+        assert client.is_available is True
+
+    def test_retries_transient_errors(self):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503, text="busy")
+            return httpx.Response(
+                200, text=json.dumps({"message": {"content": "ok"}, "done": True})
+            )
+
+        client = OllamaTranslationClient(
+            base_url="http://ollama",
+            transport=httpx.MockTransport(handler),
+            retry_policy=NO_DELAY_RETRY_POLICY,
+        )
+
+        response = asyncio.run(client.chat(model="llama3", messages=[]))
+
+        assert response.content == "ok"
+        assert len(calls) == 3
+
+    def test_does_not_retry_client_errors(self):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(request)
+            return httpx.Response(404, text="model not found")
+
+        client = OllamaTranslationClient(
+            base_url="http://ollama",
+            transport=httpx.MockTransport(handler),
+            retry_policy=NO_DELAY_RETRY_POLICY,
+        )
+
+        with pytest.raises(TranslationClientError):
+            asyncio.run(client.chat(model="missing", messages=[]))
+        assert len(calls) == 1
+
+    def test_is_model_loaded(self):
+        client = OllamaTranslationClient(base_url="http://ollama")
+        response = httpx.Response(
+            200,
+            json={"models": [{"name": "llama3:latest"}]},
+            request=httpx.Request("GET", "http://ollama/api/ps"),
+        )
+
+        with patch("buzz.translation_client.httpx.get", return_value=response):
+            assert client.is_model_loaded("llama3") is True
+            assert client.is_model_loaded("qwen3:14b") is False
+
+    def test_ensure_model_loaded_warms_up_missing_model(self):
+        client = OllamaTranslationClient(base_url="http://ollama")
+        ps_response = httpx.Response(
+            200,
+            json={"models": []},
+            request=httpx.Request("GET", "http://ollama/api/ps"),
+        )
+
+        with patch(
+            "buzz.translation_client.httpx.get", return_value=ps_response
+        ), patch(
+            "buzz.translation_client.httpx.post",
+            return_value=httpx.Response(200, json={"done": True}),
+        ) as mock_post:
+            assert client.ensure_model_loaded("llama3", keep_alive="10m") is True
+
+        body = mock_post.call_args.kwargs["json"]
+        assert body == {"model": "llama3", "messages": [], "keep_alive": "10m"}
+        assert client.model_loaded is True
+
+    def test_ensure_model_loaded_skips_resident_model(self):
+        client = OllamaTranslationClient(base_url="http://ollama")
+        ps_response = httpx.Response(
+            200,
+            json={"models": [{"name": "llama3:8b"}]},
+            request=httpx.Request("GET", "http://ollama/api/ps"),
+        )
+
+        with patch(
+            "buzz.translation_client.httpx.get", return_value=ps_response
+        ), patch("buzz.translation_client.httpx.post") as mock_post:
+            assert client.ensure_model_loaded("llama3:8b") is True
+
+        mock_post.assert_not_called()
+
+
+class TestOpenAICompatibleTranslationClient:
+    def test_chat_parses_server_sent_events(self):
+        def handler(request: httpx.Request):
+            assert request.url.path == "/v1/chat/completions"
+            assert request.headers["Authorization"] == "Bearer key"
+            events = [
+                {"choices": [{"delta": {"content": "Bon"}}]},
+                {"choices": [{"delta": {"content": "jour"}}]},
+            ]
+            body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+            return httpx.Response(200, text=body + "data: [DONE]\n\n")
+
+        client = OpenAICompatibleTranslationClient(
+            base_url="http://localhost/v1",
+            api_key="key",
+            transport=httpx.MockTransport(handler),
+        )
+        partials = []
+
+        response = asyncio.run(
+            client.chat(model="gpt", messages=[], on_partial=partials.append)
+        )
+
+        assert response.content == "Bonjour"
+        assert partials == ["Bon", "Bonjour"]
+
+    def test_chat_parses_response_that_is_not_streamed(self):
+        def handler(request: httpx.Request):
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"message": {"content": "Bonjour"}}],
+                    "usage": {"completion_tokens": 2},
+                },
+            )
+
+        client = OpenAICompatibleTranslationClient(
+            base_url="http://localhost/v1",
+            api_key="key",
+            transport=httpx.MockTransport(handler),
+        )
+        partials = []
+
+        response = asyncio.run(
+            client.chat(model="gpt", messages=[], on_partial=partials.append)
+        )
+
+        assert response.content == "Bonjour"
+        assert response.metrics["completion_tokens"] == 2
+        assert partials == ["Bonjour"]
+
+    @pytest.mark.parametrize(
+        "response",
+        [
+            httpx.Response(200, text="data: [DONE]\n\n"),
+            httpx.Response(200, json={"choices": [{"message": {"content": ""}}]}),
+        ],
+    )
+    def test_chat_raises_without_content(self, response):
+        client = OpenAICompatibleTranslationClient(
+            base_url="http://localhost/v1",
+            api_key="key",
+            transport=httpx.MockTransport(lambda request: response),
+        )
+
+        with pytest.raises(TranslationClientError):
+            asyncio.run(client.chat(model="gpt", messages=[]))
+
+
+class TestRetryPolicy:
+    def test_delay_is_bounded(self):
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        for attempt in range(10):
+            assert 0 <= policy.delay(attempt) <= 4
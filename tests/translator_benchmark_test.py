@@ -0,0 +1,145 @@
+import os
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict
+from unittest.mock import patch
+
+import pytest
+
+from buzz.transcriber.transcriber import TranscriptionOptions
+from buzz.translation_client import OpenAICompatibleTranslationClient
+from buzz.translator import Translator
+from buzz.widgets.transcriber.advanced_settings_dialog import AdvancedSettingsDialog
+from tests.mock_llm_server import MockLLMServer, MockLLMServerOptions
+
+NUM_SEGMENTS = 40
+# Time between segments from a live recording, close to the real chunk
+# interval scaled down to keep the benchmark short
+LIVE_SEGMENT_INTERVAL = 0.02
+
+
+@dataclass
+class TranslatorRun:
+    enqueued_at: Dict[int, float] = field(default_factory=dict)
+    translated_at: Dict[int, float] = field(default_factory=dict)
+    translations: Dict[int, str] = field(default_factory=dict)
+    order: List[int] = field(default_factory=list)
+
+    def latencies(self) -> List[float]:
+        return [
+            self.translated_at[segment_id] - self.enqueued_at[segment_id]
+            for segment_id in self.translated_at
+        ]
+
+    def stats(self) -> Dict[str, float]:
+        latencies = self.latencies()
+        percentiles = statistics.quantiles(latencies, n=100)
+        duration = max(self.translated_at.values()) - min(self.enqueued_at.values())
+        return {
+            "segments_per_second": len(self.translated_at) / duration,
+            "latency_p50": percentiles[49],
+            "latency_p95": percentiles[94],
+            "latency_p99": percentiles[98],
+            "latency_max": max(latencies),
+        }
+
+
+def run_translator(
+    qtbot,
+    translation_provider: str,
+    server: MockLLMServer,
+    segment_interval: float,
+) -> TranslatorRun:
+    transcription_options = TranscriptionOptions(
+        enable_llm_translation=True,
+        llm_model="mock",
+        llm_prompt="Translate to Spanish",
+    )
+
+    def create_openai_client(base_url, api_key):
+        return OpenAICompatibleTranslationClient(base_url=f"{server.url}/v1", api_key="key")
+
+    with patch.dict(
+        os.environ,
+        {
+            "TRANSLATION_PROVIDER": translation_provider,
+            "OLLAMA_BASE_URL": server.url,
+            "OLLAMA_MODEL": "mock",
+        },
+    ), patch("buzz.translator.OpenAICompatibleTranslationClient", create_openai_client):
+        translator = Translator(
+            transcription_options,
+            AdvancedSettingsDialog(transcription_options=transcription_options),
+        )
+
+    run = TranslatorRun()
+
+    def on_translation(text: str, segment_id: int):
+        run.translated_at[segment_id] = time.perf_counter()
+        run.translations[segment_id] = text
+        run.order.append(segment_id)
+
+    def enqueue_segments():
+        for segment_id in range(NUM_SEGMENTS):
+            run.enqueued_at[segment_id] = time.perf_counter()
+            translator.enqueue(f"segment {segment_id}", segment_id)
+            if segment_interval > 0:
+                time.sleep(segment_interval)
+
+    # Translations are delivered through the Qt event loop, like in the app
+    translator.translation.connect(on_translation)
+    translation_thread = threading.Thread(target=translator.start)
+    translation_thread.start()
+    threading.Thread(target=enqueue_segments).start()
+
+    qtbot.waitUntil(lambda: len(run.order) == NUM_SEGMENTS, timeout=60_000)
+    translator.stop()
+    translation_thread.join(timeout=10)
+
+    return run
+
+
+@pytest.mark.parametrize("translation_provider", ["OLLAMA", "OPENAI"])
+@pytest.mark.parametrize(
+    "segment_interval", [LIVE_SEGMENT_INTERVAL, 0], ids=["live", "batch"]
+)
+class TestTranslatorBenchmark:
+    def test_throughput(self, benchmark, qtbot, translation_provider, segment_interval):
+        options = MockLLMServerOptions(latency=0.01, token_rate=1000)
+        with MockLLMServer(options) as server:
+            run = benchmark.pedantic(
+                run_translator,
+                args=(qtbot, translation_provider, server, segment_interval),
+                rounds=1,
+                iterations=1,
+            )
+
+        benchmark.extra_info.update(run.stats())
+
+        assert run.order == list(range(NUM_SEGMENTS))
+        assert run.translations[3] == "translated: segment 3"
+
+    def test_throughput_with_errors(
+        self, benchmark, qtbot, translation_provider, segment_interval
+    ):
+        options = MockLLMServerOptions(
+            latency=0.01, token_rate=1000, error_rate=0.1, seed=1
+        )
+        with MockLLMServer(options) as server:
+            run = benchmark.pedantic(
+                run_translator,
+                args=(qtbot, translation_provider, server, segment_interval),
+                rounds=1,
+                iterations=1,
+            )
+
+        benchmark.extra_info.update(run.stats())
+
+        # Failed requests are retried, or the segment falls back to the original text
+        assert run.order == list(range(NUM_SEGMENTS))
+        assert all(
+            run.translations[segment_id] in (f"translated: segment {segment_id}", f"segment {segment_id}")
+            for segment_id in range(NUM_SEGMENTS)
+        )
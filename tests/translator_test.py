@@ -1,37 +1,37 @@
+import os
 import time
 import pytest
-from queue import Empty
-from unittest.mock import Mock, patch, create_autospec
+from unittest.mock import Mock, AsyncMock, patch, create_autospec
 
 from PyQt6.QtCore import QThread
 
 from buzz.translator import Translator
+from buzz.translation_client import ChatResponse
 from buzz.transcriber.transcriber import TranscriptionOptions
 from buzz.widgets.transcriber.advanced_settings_dialog import AdvancedSettingsDialog
 
 
+@patch.dict(os.environ, {"TRANSLATION_PROVIDER": "OPENAI"})
 class TestTranslator:
-    @patch('buzz.translator.OpenAI', autospec=True)
+    @patch('buzz.translator.OpenAICompatibleTranslationClient', autospec=True)
     @patch('buzz.translator.queue.Queue', autospec=True)
-    def test_start(self, mock_queue, mock_openai):
+    def test_start(self, mock_queue, mock_client):
         def side_effect(*args, **kwargs):
             side_effect.call_count += 1
 
-            if side_effect.call_count >= 5:
-                translator.is_running = False
-
-            if side_effect.call_count < 3:
-                raise Empty
+            # stop() puts None on the queue
+            if side_effect.call_count >= 3:
+                return None
             return "Hello, how are you?", None
 
         side_effect.call_count = 0
 
         mock_queue.get.side_effect = side_effect
-        mock_chat = Mock()
-        mock_openai.return_value.chat = mock_chat
-        mock_chat.completions.create.return_value = Mock(
-            choices=[Mock(message=Mock(content="AI Translated: Hello, how are you?"))]
+        mock_chat = AsyncMock(
+            return_value=ChatResponse(content="AI Translated: Hello, how are you?")
         )
+        mock_client.return_value.chat = mock_chat
+        mock_client.return_value.aclose = AsyncMock()
 
         transcription_options = TranscriptionOptions(
             enable_llm_translation=False,
@@ -48,11 +48,11 @@ class TestTranslator:
 
         translator.start()
 
-        mock_queue.get.assert_called()
-        mock_chat.completions.create.assert_called()
+        assert mock_queue.get.call_count == 3
+        assert mock_chat.call_count == 2
 
-    @patch('buzz.translator.OpenAI', autospec=True)
-    def test_translator(self, mock_openai, qtbot):
+    @patch('buzz.translator.OpenAICompatibleTranslationClient', autospec=True)
+    def test_translator(self, mock_client, qtbot):
 
         self.on_next_translation_called = False
 
@@ -60,11 +60,10 @@ class TestTranslator:
             self.on_next_translation_called = True
             assert text.startswith("AI Translated:")
 
-        mock_chat = Mock()
-        mock_openai.return_value.chat = mock_chat
-        mock_chat.completions.create.return_value = Mock(
-            choices=[Mock(message=Mock(content="AI Translated: Hello, how are you?"))]
+        mock_client.return_value.chat = AsyncMock(
+            return_value=ChatResponse(content="AI Translated: Hello, how are you?")
         )
+        mock_client.return_value.aclose = AsyncMock()
 
         self.translation_thread = QThread()
         self.transcription_options = TranscriptionOptions(
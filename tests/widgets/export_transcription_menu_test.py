@@ -7,7 +7,8 @@ from pytestqt.qtbot import QtBot
 from buzz.db.entity.transcription import Transcription
 from buzz.db.entity.transcription_segment import TranscriptionSegment
 from buzz.model_loader import ModelType, WhisperModelSize
-from buzz.transcriber.transcriber import Task
+from buzz.db.word_timings import to_sentence
+from buzz.transcriber.transcriber import Task, Segment
 from buzz.widgets.transcription_viewer.export_transcription_menu import (
     ExportTranscriptionMenu,
 )
@@ -62,3 +63,39 @@ class TestExportTranscriptionMenu:
 
         with open(output_file_path, encoding="utf-8") as output_file:
             assert "Bien venue dans" in output_file.read()
+
+    def test_should_export_words_of_word_level_transcription(
+        self,
+        tmp_path: pathlib.Path,
+        qtbot: QtBot,
+        transcription_dao,
+        transcription_service,
+        shortcuts,
+        mocker,
+    ):
+        id = uuid.uuid4()
+        transcription_dao.insert(
+            Transcription(id=str(id), status="completed", file=test_audio_path)
+        )
+        transcription_service.transcription_segment_dao.insert_all(
+            [to_sentence([Segment(40, 299, "Bien"), Segment(299, 329, "venue.")], str(id))]
+        )
+        output_file_path = tmp_path / "whisper.srt"
+        mocker.patch(
+            "PyQt6.QtWidgets.QFileDialog.getSaveFileName",
+            return_value=(str(output_file_path), ""),
+        )
+
+        widget = ExportTranscriptionMenu(
+            transcription_dao.find_by_id(str(id)),
+            transcription_service,
+        )
+        qtbot.add_widget(widget)
+
+        next(action for action in widget.actions() if action.text() == "SRT").trigger()
+
+        with open(output_file_path, encoding="utf-8") as output_file:
+            assert output_file.read() == (
+                "1\n00:00:00,040 --> 00:00:00,299\nBien\n\n"
+                "2\n00:00:00,299 --> 00:00:00,329\nvenue.\n\n"
+            )
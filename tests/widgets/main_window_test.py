@@ -24,10 +24,11 @@ from buzz.widgets.transcription_viewer.transcription_viewer_widget import (
     TranscriptionViewerWidget,
 )
 
+# Listed newest first
 mock_transcriptions: List[Transcription] = [
-    Transcription(status="completed"),
-    Transcription(status="canceled"),
-    Transcription(status="failed", error_message=_("Error")),
+    Transcription(status="completed", time_queued="2024-01-01T10:00:03"),
+    Transcription(status="canceled", time_queued="2024-01-01T10:00:02"),
+    Transcription(status="failed", error_message=_("Error"), time_queued="2024-01-01T10:00:01"),
 ]
 
 
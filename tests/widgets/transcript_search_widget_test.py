@@ -0,0 +1,31 @@
+from buzz.transcriber.transcriber import Segment
+from buzz.widgets.transcript_search_widget import TranscriptSearchWidget
+from tests.transcription_service_test import create_task
+
+
+class TestTranscriptSearchWidget:
+    def test_searches_as_you_type(self, qtbot, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_completed(
+            task.uid, [Segment(1000, 2000, "Hello world")]
+        )
+        widget = TranscriptSearchWidget(transcription_service=transcription_service)
+        qtbot.add_widget(widget)
+        widget.show()
+
+        widget.search_line_edit.setText("wor")
+
+        qtbot.waitUntil(lambda: widget.results_table.rowCount() == 1)
+        assert widget.results_table.isVisible()
+        assert widget.results_table.item(0, 0).text() == "a.mp3"
+        assert widget.results_table.item(0, 1).text() == "00:00:01.000"
+        assert widget.results_table.item(0, 2).text() == "Hello world"
+
+        with qtbot.waitSignal(widget.result_activated) as blocker:
+            widget.results_table.cellActivated.emit(0, 2)
+        assert blocker.args[0].transcription_id == str(task.uid)
+
+        widget.search_line_edit.clear()
+        assert widget.results_table.rowCount() == 0
+        assert not widget.results_table.isVisible()
@@ -1,7 +1,78 @@
-from buzz.widgets.transcription_tasks_table_widget import TranscriptionTasksTableWidget
+from datetime import datetime, timedelta
+
+from buzz.task_progress import TaskProgressModel
+from buzz.widgets.transcription_tasks_table_widget import (
+    TranscriptionTasksTableWidget,
+    estimate_time_remaining,
+)
+from tests.transcription_service_test import create_task
 
 
 class TestTranscriptionTasksTableWidget:
     def test_can_create(self, qtbot, reset_settings):
         widget = TranscriptionTasksTableWidget()
         qtbot.add_widget(widget)
+
+    def test_shows_live_progress(self, qtbot, reset_settings, transcription_service):
+        task = create_task("/a.mp3")
+        transcription_service.create_transcription(task)
+        transcription_service.update_transcription_as_started(task.uid)
+        transcription_service.update_transcription_progress(task.uid, 0.1)
+        progress_model = TaskProgressModel()
+
+        widget = TranscriptionTasksTableWidget(progress_model=progress_model)
+        qtbot.add_widget(widget)
+        record = widget.model().record(widget.find_row(task.uid))
+
+        assert widget.format_status_text(record).startswith("In Progress (10%")
+
+        progress_model.set_progress(task.uid, 0.5)
+        assert widget.format_status_text(record).startswith("In Progress (50%")
+
+    def test_fetches_rows_in_pages(self, qtbot, reset_settings, transcription_service):
+        dao = transcription_service.transcription_dao
+        tasks = [create_task(f"/{i}.mp3") for i in range(600)]
+        with dao.transaction():
+            for task in tasks:
+                transcription_service.create_transcription(task)
+
+        widget = TranscriptionTasksTableWidget()
+        qtbot.add_widget(widget)
+        model = widget.model()
+
+        assert model.rowCount() < len(tasks)
+        assert widget.find_row(tasks[-1].uid) == 0
+        assert widget.find_row(tasks[0].uid) is None
+
+        while model.canFetchMore():
+            model.fetchMore()
+
+        row = widget.find_row(tasks[0].uid)
+        assert row == len(tasks) - 1
+        assert model.record(row).value("id") == str(tasks[0].uid)
+
+    def test_refresh_row(self, qtbot, reset_settings, transcription_service):
+        first = create_task("/a.mp3")
+        second = create_task("/b.mp3")
+        transcription_service.create_transcription(first)
+        transcription_service.create_transcription(second)
+
+        widget = TranscriptionTasksTableWidget()
+        qtbot.add_widget(widget)
+        transcription_service.update_transcription_as_started(first.uid)
+
+        with qtbot.waitSignal(widget.model().dataChanged) as blocker:
+            widget.refresh_row(first.uid)
+
+        row = widget.find_row(first.uid)
+        assert blocker.args[0].row() == row
+        assert widget.model().record(row).value("status") == "in_progress"
+
+    def test_estimate_time_remaining(self):
+        time_started = (datetime.now() - timedelta(minutes=1)).isoformat()
+
+        remaining = estimate_time_remaining(time_started, 0.25)
+
+        assert abs(remaining.total_seconds() - 180) < 5
+        assert estimate_time_remaining(time_started, 0.0) is None
+        assert estimate_time_remaining("", 0.5) is None
@@ -1,4 +1,5 @@
 import uuid
+from uuid import UUID
 
 import pytest
 from pytestqt.qtbot import QtBot
@@ -8,7 +9,8 @@ from buzz.locale import _
 from buzz.db.entity.transcription import Transcription
 from buzz.db.entity.transcription_segment import TranscriptionSegment
 from buzz.model_loader import ModelType, WhisperModelSize
-from buzz.transcriber.transcriber import Task
+from buzz.db.word_timings import to_sentence
+from buzz.transcriber.transcriber import Task, Segment
 from buzz.widgets.transcription_viewer.transcription_view_mode_tool_button import (
     TranscriptionViewModeToolButton,
     ViewMode
@@ -51,10 +53,10 @@ class TestTranscriptionViewerWidget:
         return transcription_dao.find_by_id(str(id))
 
     def test_should_display_segments(
-        self, qtbot: QtBot, transcription, transcription_service, shortcuts
+        self, qtbot: QtBot, transcription, transcription_service, db_writer, shortcuts
     ):
         widget = TranscriptionViewerWidget(
-            transcription, transcription_service, shortcuts
+            transcription, transcription_service, db_writer, shortcuts
         )
         qtbot.add_widget(widget)
 
@@ -69,10 +71,10 @@ class TestTranscriptionViewerWidget:
         widget.close()
 
     def test_should_update_segment_text(
-        self, qtbot, transcription, transcription_service, shortcuts
+        self, qtbot, transcription, transcription_service, db_writer, shortcuts
     ):
         widget = TranscriptionViewerWidget(
-            transcription, transcription_service, shortcuts
+            transcription, transcription_service, db_writer, shortcuts
         )
         qtbot.add_widget(widget)
 
@@ -80,15 +82,31 @@ class TestTranscriptionViewerWidget:
         assert isinstance(editor, TranscriptionSegmentsEditorWidget)
 
         editor.model().setData(editor.model().index(0, 3), "Biens")
+        editor.model().setData(editor.model().index(0, 4), "Well")
+
+        assert editor.model().index(0, 3).data() == "Biens"
+        # Saved by the database writer, the model does not write itself
+        qtbot.waitUntil(
+            lambda: [
+                (segment.text, segment.translation)
+                for segment in transcription_service.get_transcription_segments(
+                    UUID(hex=transcription.id)
+                )
+            ][0]
+            == ("Biens", "Well")
+        )
+        assert db_writer.commits > 0
         widget.close()
 
     @patch('buzz.widgets.transcription_viewer.transcription_viewer_widget.OkEnabledInputDialog')
-    def test_should_resize_segment_text(self, mock_dialog, qtbot, transcription, transcription_service, shortcuts):
+    def test_should_resize_segment_text(
+        self, mock_dialog, qtbot, transcription, transcription_service, db_writer, shortcuts
+    ):
         mock_dialog.return_value.exec.return_value = QInputDialog.DialogCode.Accepted
         mock_dialog.return_value.intValue.return_value = 5
 
         widget = TranscriptionViewerWidget(
-            transcription, transcription_service, shortcuts
+            transcription, transcription_service, db_writer, shortcuts
         )
         qtbot.add_widget(widget)
 
@@ -102,6 +120,7 @@ class TestTranscriptionViewerWidget:
             qtbot.mouseClick(widget.findChild(QToolButton, "resize_button"), Qt.MouseButton.LeftButton)
             widget.resize_button_clicked.emit()
 
+        qtbot.waitUntil(lambda: editor.model().rowCount() == 3)
         assert editor.model().index(0, 1).data() == 299
         assert editor.model().index(0, 2).data() == 40
         assert editor.model().index(0, 3).data() == "Bien"
@@ -117,10 +136,10 @@ class TestTranscriptionViewerWidget:
         widget.close()
 
     def test_text_button_changes_view_mode(
-            self, qtbot, transcription, transcription_service, shortcuts
+            self, qtbot, transcription, transcription_service, db_writer, shortcuts
     ):
         widget = TranscriptionViewerWidget(
-            transcription, transcription_service, shortcuts
+            transcription, transcription_service, db_writer, shortcuts
         )
         qtbot.add_widget(widget)
 
@@ -136,3 +155,44 @@ class TestTranscriptionViewerWidget:
         assert widget.view_mode == ViewMode.TRANSLATION
 
         widget.close()
+
+    def test_show_segment(
+        self, qtbot, transcription, transcription_service, db_writer, shortcuts
+    ):
+        widget = TranscriptionViewerWidget(
+            transcription, transcription_service, db_writer, shortcuts
+        )
+        qtbot.add_widget(widget)
+        editor = widget.findChild(TranscriptionSegmentsEditorWidget)
+        segment_id = editor.model().record(1).value("id")
+
+        widget.show_segment(segment_id, 299)
+
+        assert editor.selectionModel().selectedRows()[0].row() == 1
+        widget.close()
+
+    def test_highlights_current_word(
+        self,
+        qtbot,
+        transcription_dao,
+        transcription_segment_dao,
+        transcription_service,
+        db_writer,
+        shortcuts,
+    ):
+        id = uuid.uuid4()
+        transcription_dao.insert(
+            Transcription(id=str(id), status="completed", file=test_audio_path)
+        )
+        transcription_segment_dao.insert(
+            to_sentence([Segment(40, 299, " Bien"), Segment(299, 329, " venue.")], str(id))
+        )
+        widget = TranscriptionViewerWidget(
+            transcription_dao.find_by_id(str(id)), transcription_service, db_writer, shortcuts
+        )
+        qtbot.add_widget(widget)
+
+        widget.on_audio_player_position_ms_changed(300)
+
+        assert widget.current_segment_label.text() == "Bien <b>venue.</b>"
+        widget.close()
@@ -0,0 +1,88 @@
+from buzz.db.entity.transcription_segment import TranscriptionSegment
+from buzz.db.word_timings import (
+    pack_words,
+    unpack_words,
+    count_words,
+    join_words,
+    group_words,
+    to_sentence,
+    get_words,
+    expand_words,
+    MAX_PAUSE_MS,
+)
+from buzz.transcriber.transcriber import Segment
+
+
+def words_of(text: str, start: int = 0, duration: int = 300):
+    return [
+        Segment(start + i * duration, start + (i + 1) * duration, word)
+        for i, word in enumerate(text.split(" "))
+    ]
+
+
+class TestPackWords:
+    def test_round_trip(self):
+        words = [
+            Segment(0, 250, " Grüße", "Greetings"),
+            Segment(250, 600, " 世界", ""),
+            Segment(2_000_000_000, 2_000_000_100, "!", "!"),
+        ]
+
+        data = pack_words(words)
+
+        assert count_words(data) == 3
+        assert unpack_words(data) == words
+        assert unpack_words(None) == []
+        assert count_words(None) == 0
+
+    def test_is_smaller_than_a_row_per_word(self):
+        words = words_of("one two three four five six seven eight")
+
+        # Count, start, end and two offsets of 4 bytes each for every word
+        assert len(pack_words(words)) == 8 + 16 * len(words) + sum(
+            len(word.text) for word in words
+        )
+
+
+class TestGroupWords:
+    def test_groups_at_punctuation(self):
+        words = words_of("Hello there. How are you? Fine")
+
+        sentences = group_words(words)
+
+        assert [join_words([word.text for word in sentence]) for sentence in sentences] == [
+            "Hello there.",
+            "How are you?",
+            "Fine",
+        ]
+
+    def test_groups_at_pauses(self):
+        words = words_of("one two") + words_of("three", start=600 + MAX_PAUSE_MS)
+
+        assert [len(sentence) for sentence in group_words(words)] == [2, 1]
+
+    def test_join_words_keeps_spacing_of_engine(self):
+        assert join_words([" Hello", " world", "."]) == "Hello world."
+        assert join_words(["Hello", "world."]) == "Hello world."
+
+
+class TestGetWords:
+    def test_expands_sentences_to_words(self):
+        words = words_of("Hello there.")
+        sentence = to_sentence(words, "id")
+        plain = TranscriptionSegment(1000, 2000, "No words", "", "id")
+
+        assert (sentence.start_time, sentence.end_time, sentence.text) == (
+            0,
+            600,
+            "Hello there.",
+        )
+        assert expand_words([sentence, plain]) == words + [
+            Segment(1000, 2000, "No words", "")
+        ]
+
+    def test_ignores_words_of_edited_sentence(self):
+        sentence = to_sentence(words_of("Hello there."), "id")
+        sentence.text = "Hello you."
+
+        assert get_words(sentence) == [Segment(0, 600, "Hello you.", "")]